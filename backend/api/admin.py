@@ -3,9 +3,17 @@ from .models.teammodel import Team
 from .models.tournamentmodel import Tournament
 from .models.matchmodel import Match
 from .models.notificationmodel import Notification
+from .models.imagemodel import Image
+from .models.standingmodel import Standing
+from .models.teamstatsmodel import TeamStats
+from .models.notificationarchivemodel import NotificationArchive
 
 # Register your models here.
 admin.site.register(Team)
 admin.site.register(Tournament)
 admin.site.register(Match)
 admin.site.register(Notification)
+admin.site.register(Image)
+admin.site.register(Standing)
+admin.site.register(TeamStats)
+admin.site.register(NotificationArchive)
@@ -0,0 +1,117 @@
+"""
+    Token authentication resolving the tokens from a cache of this process
+    instead of querying the token and its user on every request.
+
+    A token is cached for TOKEN_TIMEOUT seconds at most, the least recently
+    used ones are evicted after TOKEN_MAX_ENTRIES. An entry is kept with
+    the version of its user in the shared cache (see cache.py), bumped when
+    a token of the user is deleted or the user is modified (deactivated,
+    deleted) : every process drops its entry at the next request.
+"""
+
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+from django.contrib.auth.models import User
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+
+from .cache import bumpversion, getversion
+
+TOKEN_TIMEOUT = 60  # seconds
+TOKEN_MAX_ENTRIES = 10000
+
+
+class TokenCache:
+    def __init__(self, timeout=TOKEN_TIMEOUT, maxEntries=TOKEN_MAX_ENTRIES):
+        self.timeout = timeout
+        self.maxEntries = maxEntries
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()  # token key -> (expiry, user, version of the user)
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] < time.monotonic():
+                del self.entries[key]
+                return None
+            self.entries.move_to_end(key)
+        expiry, user, version = entry
+        if getversion("tokenuser", user.id) != version:
+            # the token or the user changed, maybe in another process
+            self.discard(key)
+            return None
+        # every request gets its own user instance
+        return copy.copy(user)
+
+    def set(self, key, user):
+        version = getversion("tokenuser", user.id)
+        with self.lock:
+            self.entries[key] = (time.monotonic() + self.timeout, copy.copy(user), version)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.maxEntries:
+                self.entries.popitem(last=False)
+
+    def discard(self, key):
+        with self.lock:
+            self.entries.pop(key, None)
+
+    def discarduser(self, userId):
+        with self.lock:
+            for key in [key for key, (expiry, user, version) in self.entries.items() if user.id == userId]:
+                del self.entries[key]
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+tokens = TokenCache()
+
+
+def gettokenuser(key):
+    """
+        Get the active user of a token (cached), None if the token doesn't exist.
+    """
+    user = tokens.get(key)
+    if user is not None:
+        return user
+
+    token = Token.objects.select_related("user").filter(key=key).first()
+    if token is None or not token.user.is_active:
+        return None
+    tokens.set(key, token.user)
+    return token.user
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """
+        Drop-in replacement of TokenAuthentication (same header and errors).
+    """
+
+    def authenticate_credentials(self, key):
+        user = gettokenuser(key)
+        if user is None:
+            # the token doesn't exist or the user is inactive
+            return super().authenticate_credentials(key)
+        return (user, Token(key=key, user=user))
+
+
+@receiver(post_delete, sender=Token)
+def discardtoken(sender, instance, **kwargs):
+    tokens.discard(instance.key)
+    # the entries of the other processes
+    bumpversion("tokenuser", instance.user_id)
+
+
+@receiver([post_save, post_delete], sender=User)
+def discardusertokens(sender, instance, **kwargs):
+    # the cached user is outdated (e.g. deactivated or no longer staff)
+    tokens.discarduser(instance.id)
+    bumpversion("tokenuser", instance.id)
@@ -0,0 +1,129 @@
+"""
+    This file contains the helpers to version the cached data of the api app.
+
+    A cached value is stored under a key containing the version of what it
+    depends on (e.g. the bracket of a tournament). Bumping the version makes
+    every value built from the old version unreachable, they simply expire.
+    The versions are bumped by the model signals. The cached values are
+    built from the primary database, never from a replica which may not
+    have the changes of the current version yet.
+"""
+
+import hashlib
+import threading
+import time
+from functools import wraps
+
+from django.core.cache import cache
+from django.db import transaction
+from rest_framework import status
+from rest_framework.response import Response
+
+from .dbrouter import primaryreading
+
+RESPONSE_TIMEOUT = 10 * 60  # seconds, the versions make the responses outdated before
+
+def versionkey(name, id):
+    return f"{name}:{id}:version"
+
+
+def newversion():
+    # a version that was never used, even if the previous one has been evicted
+    return time.time_ns() // 1000
+
+
+def getversion(name, id):
+    """
+        Get the current version of the object "name" with the given id.
+    """
+    return cache.get_or_set(versionkey(name, id), newversion, timeout=None)
+
+
+def incrversion(name, id):
+    try:
+        cache.incr(versionkey(name, id))
+    except ValueError:
+        # the version isn't cached (yet or anymore)
+        cache.set(versionkey(name, id), newversion(), timeout=None)
+
+
+def bumpversion(name, id):
+    """
+        Invalidate every cached value of the object "name" with the given id.
+        The version is bumped again once the current transaction is committed,
+        so a value built from the uncommitted data isn't kept.
+    """
+    incrversion(name, id)
+    transaction.on_commit(lambda: incrversion(name, id))
+
+
+def versionedkey(name, id):
+    return f"{name}:{id}:{getversion(name, id)}"
+
+
+class CacheStats:
+    """
+        Hits and misses of the cached responses per endpoint, in this process.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.endpoints = {}
+
+    def add(self, endpoint, hit):
+        with self.lock:
+            stats = self.endpoints.setdefault(endpoint, {"hits": 0, "misses": 0})
+            stats["hits" if hit else "misses"] += 1
+
+    def report(self):
+        with self.lock:
+            return [{"endpoint": endpoint, **stats, "ratio": round(stats["hits"] / (stats["hits"] + stats["misses"]), 3)}
+                    for endpoint, stats in sorted(self.endpoints.items())]
+
+    def reset(self):
+        with self.lock:
+            self.endpoints = {}
+
+
+stats = CacheStats()
+
+
+def responsekey(endpoint, request, dependencies):
+    """
+        Key of the data of a response, per url (query included) and per
+        version of the (name, id) it depends on.
+    """
+    url = hashlib.md5(request.build_absolute_uri().encode()).hexdigest()
+    versions = ":".join(versionedkey(name, id) for name, id in dependencies)
+    return f"response:{endpoint}:{url}:{versions}"
+
+
+def cachedresponse(endpoint, dependencies):
+    """
+        Cache the data of the successful responses of a view method.
+
+        dependencies(request, *args, **kwargs) returns the (name, id) of the
+        versions the response depends on, e.g. [("tournamentteams", 3)].
+        The response is cached per url (query included) and per version,
+        it's built from the primary database.
+    """
+    def decorator(method):
+        @wraps(method)
+        def wrapper(self, request, *args, **kwargs):
+            key = responsekey(endpoint, request, dependencies(request, *args, **kwargs))
+
+            data = cache.get(key)
+            stats.add(endpoint, data is not None)
+            if data is not None:
+                response = Response(data, status=status.HTTP_200_OK)
+                response["X-Cache"] = "HIT"
+                return response
+
+            with primaryreading():
+                response = method(self, request, *args, **kwargs)
+            if response.status_code == status.HTTP_200_OK:
+                cache.set(key, response.data, RESPONSE_TIMEOUT)
+            response["X-Cache"] = "MISS"
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,235 @@
+"""
+    Read replicas : the reads of the safe requests (GET, HEAD, OPTIONS) go
+    to the replicas listed in the setting DATABASE_REPLICAS, everything else
+    goes to the primary database ("default").
+
+    - A client which has written (any other method) reads from the primary
+      for REPLICA_PIN_SECONDS, so it sees its own changes despite the
+      replication lag. The client is its Authorization header, or its
+      address, and the pin is kept in the cache shared by the processes.
+    - A viewset opts out with replica_reads = False, an action of a viewset
+      defining replica_reads with @action(..., replica_reads=False).
+    - The reads in a transaction of the primary stay on the primary.
+    - The async views (see views/asyncview.py) choose with replicareading().
+    - The values cached under a version (see cache.py) are read from the
+      primary with primaryreading() : a lagging replica would cache its old
+      rows under the new version.
+    - A replica which can't be reached, or lags more than REPLICA_MAX_LAG
+      seconds (MySQL), isn't used for REPLICA_RETRY_SECONDS.
+"""
+
+import asyncio
+import hashlib
+import itertools
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+
+REPLICA_PIN_SECONDS = 5
+REPLICA_RETRY_SECONDS = 10
+REPLICA_MAX_LAG = 30  # seconds
+
+PIN_KEY = "wtm:replica-pin:{}"
+
+# set by ReplicaMiddleware for the requests which can read from a replica
+replicareads = ContextVar("replicareads", default=False)
+
+
+class ReplicaHealth:
+    """
+        The replicas usable by this process, checked once every
+        REPLICA_RETRY_SECONDS at most.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.checks = {}  # alias -> (time of the check, healthy)
+
+    def check(self, alias):
+        connection = connections[alias]
+        try:
+            connection.ensure_connection()
+        except DatabaseError:
+            return False
+        if connection.vendor != "mysql":
+            return True
+
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute("SHOW SLAVE STATUS")
+                row = cursor.fetchone()
+                columns = [column[0] for column in cursor.description or []]
+        except DatabaseError:
+            # the lag is unknown without the privilege REPLICATION CLIENT
+            return True
+        if row is None:
+            return True
+        lag = dict(zip(columns, row)).get("Seconds_Behind_Master")
+        # no lag : the replication is stopped
+        return lag is not None and lag <= REPLICA_MAX_LAG
+
+    def healthy(self, alias):
+        now = time.monotonic()
+        with self.lock:
+            checked = self.checks.get(alias)
+            if checked is not None and now - checked[0] < REPLICA_RETRY_SECONDS:
+                return checked[1]
+        healthy = self.check(alias)
+        with self.lock:
+            self.checks[alias] = (now, healthy)
+        return healthy
+
+    def reset(self):
+        with self.lock:
+            self.checks = {}
+
+
+health = ReplicaHealth()
+
+
+class ReplicaRouter:
+    def __init__(self):
+        self.replicas = list(getattr(settings, "DATABASE_REPLICAS", []))
+        self.cycle = itertools.cycle(self.replicas) if self.replicas else None
+
+    def db_for_read(self, model, **hints):
+        if not self.replicas or not replicareads.get() or connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        # round robin on the healthy replicas
+        for _ in range(len(self.replicas)):
+            alias = next(self.cycle)
+            if health.healthy(alias):
+                return alias
+        return DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # the replicas hold the same data as the primary
+        return True
+
+
+def clientkey(request):
+    client = request.META.get("HTTP_AUTHORIZATION") or request.META.get("REMOTE_ADDR", "")
+    return PIN_KEY.format(hashlib.md5(client.encode()).hexdigest())
+
+
+def pinned(request):
+    """
+        Whether the client has written recently and must read from the primary.
+    """
+    return bool(cache.get(clientkey(request)))
+
+
+@contextmanager
+def replicareading(request):
+    """
+        Let the reads of the block go to a replica, unless the client is pinned.
+    """
+    token = replicareads.set(bool(getattr(settings, "DATABASE_REPLICAS", [])) and not pinned(request))
+    try:
+        yield
+    finally:
+        replicareads.reset(token)
+
+
+@contextmanager
+def primaryreading():
+    """
+        Send the reads of the block to the primary, whatever the request.
+    """
+    token = replicareads.set(False)
+    try:
+        yield
+    finally:
+        replicareads.reset(token)
+
+
+def usesreplica(view):
+    """
+        Whether the reads of a view (a viewset action) can go to a replica.
+    """
+    cls = getattr(view, "cls", None)
+    if cls is None:
+        # not an api view (admin, media...)
+        return False
+    return getattr(cls, "replica_reads", True)
+
+
+class ReplicaMiddleware:
+    """
+        Async capable, so under ASGI the async views aren't run in a thread
+        because of this middleware : only the writes and the synchronous
+        views hop to a thread.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not getattr(settings, "DATABASE_REPLICAS", []):
+            raise MiddlewareNotUsed()
+        self.get_response = get_response
+        if asyncio.iscoroutinefunction(get_response):
+            # seen as a coroutine function by Django (like MiddlewareMixin)
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+            self.process_view = self.aprocess_view
+
+    def pin(self, request):
+        if request.method not in ("GET", "HEAD", "OPTIONS"):
+            # the next reads of this client go to the primary
+            cache.set(clientkey(request), True, REPLICA_PIN_SECONDS)
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self.get_response):
+            return self.acall(request)
+        # process_view lets the reads of the view go to a replica until the response is returned
+        token = replicareads.set(False)
+        try:
+            response = self.get_response(request)
+        finally:
+            replicareads.reset(token)
+        self.pin(request)
+        return response
+
+    async def acall(self, request):
+        token = replicareads.set(False)
+        try:
+            response = await self.get_response(request)
+        finally:
+            replicareads.reset(token)
+        if request.method not in ("GET", "HEAD", "OPTIONS"):
+            await sync_to_async(self.pin)(request)
+        return response
+
+    async def aprocess_view(self, request, view, args, kwargs):
+        if asyncio.iscoroutinefunction(view):
+            # the async views route their reads themselves
+            return None
+        # the context variable set in the thread is copied back to this context
+        return await sync_to_async(ReplicaMiddleware.process_view)(self, request, view, args, kwargs)
+
+    def process_view(self, request, view, args, kwargs):
+        """
+            Let the reads of the view go to a replica, Django calls the view
+            after the process_view of the next middlewares.
+        """
+        if request.method not in ("GET", "HEAD", "OPTIONS") or not usesreplica(view):
+            return None
+
+        actions = getattr(view, "actions", None) or {}
+        action = getattr(getattr(view, "cls", None), actions.get(request.method.lower(), ""), None)
+        if not getattr(action, "kwargs", {}).get("replica_reads", True):
+            return None
+        if pinned(request):
+            return None
+
+        replicareads.set(True)
+        return None
@@ -0,0 +1,127 @@
+"""
+    Content-addressed storage of the images (team logos).
+
+    An image is stored once under the SHA-256 of its content with its
+    thumbnails, generated when it's stored :
+        images/ab/ab12...ef.png        the original
+        images/ab/ab12...ef-64.png     the thumbnails (THUMBNAIL_SIZES)
+    A file never changes once written, so its url can be cached forever.
+"""
+
+import base64
+import binascii
+import hashlib
+import re
+from io import BytesIO
+from urllib.parse import urlsplit
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image as PillowImage, UnidentifiedImageError
+
+from .models.imagemodel import Image
+
+THUMBNAIL_SIZES = (64, 256)
+MAX_SIZE = 5 * 1024 * 1024  # bytes
+MAX_PIXELS = 4096 * 4096
+FORMATS = {"PNG": "png", "JPEG": "jpeg", "GIF": "gif", "WEBP": "webp"}
+
+DATA_URL = re.compile(r"^data:(?P<type>[\w/+.-]*)(?P<params>(;[^;,]*)*?);base64,(?P<data>.*)$", re.DOTALL)
+# the url of a stored image (see imagepath) or its hash alone
+IMAGE_URL = re.compile(r"^(.*/images/[0-9a-f]{2}/)?(?P<hash>[0-9a-f]{64})(\.\w+)?$")
+
+
+def decodedataurl(value):
+    """
+        Return the content of a base64 data url ("data:image/png;base64,...").
+    """
+    match = DATA_URL.match(value.strip())
+    if match is None:
+        raise ValueError("the image must be a base64 data url")
+    try:
+        return base64.b64decode(match.group("data"), validate=False)
+    except (binascii.Error, ValueError):
+        raise ValueError("the image is not valid base64")
+
+
+def findimage(value):
+    """
+        Return the stored Image of an url returned by the api (absolute or
+        not) or of a hash, None if it isn't one.
+    """
+    match = IMAGE_URL.match(urlsplit(value.strip()).path)
+    if match is None:
+        return None
+    return Image.objects.filter(hash=match.group("hash")).first()
+
+
+def imagepath(hash, format, size=None):
+    name = hash if size is None else f"{hash}-{size}"
+    return f"images/{hash[:2]}/{name}.{format}"
+
+
+def thumbnailformat(format):
+    # the animated and paletted formats are resized as PNG
+    return "jpeg" if format == "jpeg" else "png"
+
+
+def imageurl(image, size=None):
+    if size is None:
+        return default_storage.url(imagepath(image.hash, image.format))
+    return default_storage.url(imagepath(image.hash, thumbnailformat(image.format), size))
+
+
+def save(path, content):
+    # the same path always has the same content
+    if not default_storage.exists(path):
+        default_storage.save(path, ContentFile(content))
+
+
+def writeimage(data):
+    """
+        Validate the image, write it and its thumbnails in the storage and
+        return the fields of its Image row.
+        Raise ValueError if the data isn't a supported image.
+    """
+    if len(data) > MAX_SIZE:
+        raise ValueError(f"the image is larger than {MAX_SIZE // (1024 * 1024)} MB")
+
+    try:
+        picture = PillowImage.open(BytesIO(data))
+        format = FORMATS.get(picture.format)
+        if format is None:
+            raise ValueError(f"unsupported image format {picture.format}")
+        if picture.width * picture.height > MAX_PIXELS:
+            raise ValueError("the image has too many pixels")
+        picture.load()
+    except (UnidentifiedImageError, OSError, PillowImage.DecompressionBombError):
+        raise ValueError("the file is not a valid image")
+
+    hash = hashlib.sha256(data).hexdigest()
+    save(imagepath(hash, format), data)
+
+    for size in THUMBNAIL_SIZES:
+        thumbnail = picture.copy()
+        thumbnail.thumbnail((size, size), PillowImage.LANCZOS)
+        output = BytesIO()
+        if thumbnailformat(format) == "jpeg":
+            thumbnail.convert("RGB").save(output, "JPEG", quality=85, optimize=True)
+        else:
+            thumbnail.convert("RGBA").save(output, "PNG", optimize=True)
+        save(imagepath(hash, thumbnailformat(format), size), output.getvalue())
+
+    return {"hash": hash, "format": format, "width": picture.width, "height": picture.height, "size": len(data)}
+
+
+def storeimage(data):
+    """
+        Store an image (bytes) and return its Image, the existing one if
+        the same image has already been stored.
+    """
+    image = Image.objects.filter(hash=hashlib.sha256(data).hexdigest()).first()
+    if image is not None:
+        return image
+
+    fields = writeimage(data)
+    image, created = Image.objects.get_or_create(hash=fields.pop("hash"), defaults=fields)
+    return image
@@ -0,0 +1,53 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from ...services import RETENTION_DAYS, FileArchive, TableArchive, archivenotifications, expired
+
+
+class Command(BaseCommand):
+    help = """
+        Move the seen notifications older than --days to the archive table
+        (or a gzipped NDJSON file with --file) and delete them, by batches.
+        The command can be interrupted and run again (--from-id skips the
+        ids already processed).
+    """
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=int, default=RETENTION_DAYS)
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument("--file", help="append to this gzipped NDJSON file instead of the archive table")
+        parser.add_argument("--from-id", type=int, default=0)
+        parser.add_argument("--max-batches", type=int, default=None, help="stop after this number of batches")
+        parser.add_argument("--pause", type=float, default=0, help="seconds between two batches")
+        parser.add_argument("--report-every", type=int, default=10, help="batches between two progress lines")
+
+    def handle(self, *args, **options):
+        total = expired(options["days"]).filter(id__gt=options["from_id"]).count()
+        self.stdout.write(f"{total} notifications to archive")
+
+        archive = FileArchive(options["file"]) if options["file"] else TableArchive()
+        started = time.perf_counter()
+        done = 0
+        lastId = options["from_id"]
+        try:
+            batches = archivenotifications(archive, days=options["days"], batchSize=options["batch_size"],
+                                           fromId=options["from_id"])
+            for number, (count, lastId) in enumerate(batches, start=1):
+                done += count
+                if number % options["report_every"] == 0:
+                    elapsed = time.perf_counter() - started
+                    self.stdout.write("  %d/%d (%.0f%%), %.0f rows/s, last id %d" % (
+                        done, total, 100 * done / max(total, 1), done / elapsed, lastId))
+                if options["max_batches"] is not None and number >= options["max_batches"]:
+                    break
+                if options["pause"]:
+                    time.sleep(options["pause"])
+        except KeyboardInterrupt:
+            self.stdout.write(self.style.WARNING(f"Interrupted, resume with --from-id {lastId}"))
+        finally:
+            archive.close()
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS("Archived %d notifications in %.1f s (%.0f rows/s), last id %d" % (
+            done, elapsed, done / max(elapsed, 1e-9), lastId)))
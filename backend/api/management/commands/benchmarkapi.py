@@ -0,0 +1,209 @@
+"""
+    Benchmark of the API endpoints registered in backend/urls.py.
+"""
+
+import json
+import random
+import subprocess
+import time
+from datetime import datetime, timezone
+from urllib.error import HTTPError
+from urllib.request import Request, urlopen
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from rest_framework.authtoken.models import Token
+
+from ...models.tournamentmodel import Tournament
+from ...services import seed
+
+# name, url (formatted with a random tournament "tid" and user "uid")
+ENDPOINTS = [
+    ("tournaments.list", "/api/tournaments/"),
+    ("tournaments.retrieve", "/api/tournaments/{tid}/"),
+    ("tournaments.tournamentsforhome", "/api/tournaments/tournamentsforhome/?uid={uid}"),
+    ("tournaments.bracket", "/api/tournaments/{tid}/bracket/"),
+    ("matchs.getmatchsbytournament", "/api/matchs/getmatchsbytournament/?tid={tid}"),
+    ("teams.getteamsbytournament", "/api/teams/getteamsbytournament/?tid={tid}"),
+    ("teams.getteamsbymember", "/api/teams/{uid}/getteamsbymember/"),
+    ("teams.getteamsbyleader", "/api/teams/{uid}/getteamsbyleader/"),
+    ("users.gettournamentreferees", "/api/users/{tid}/gettournamentreferees/"),
+    ("notifications.list", "/api/notifications/?uid={uid}"),
+    ("notifications.inbox", "/api/notifications/inbox/?uid={uid}"),
+    ("notifications.unreadcount", "/api/notifications/unreadcount/?uid={uid}"),
+    ("search", "/api/search/?q=seedteam{uid}"),
+]
+
+
+def percentile(values, ratio):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(ratio * (len(values) - 1))))]
+
+
+def gitcommit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class ClientRunner:
+    """
+        Run the requests in process with the Django test client.
+        The queries are counted with CaptureQueriesContext.
+    """
+
+    def __init__(self, token, host):
+        self.client = Client(HTTP_AUTHORIZATION=f"Token {token}", HTTP_HOST=host)
+
+    def get(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            started = time.perf_counter()
+            response = self.client.get(url)
+            elapsed = time.perf_counter() - started
+        return response.status_code, elapsed, len(queries.captured_queries)
+
+
+class ServerRunner:
+    """
+        Run the requests against a running server. The queries are only
+        counted if the profiling is enabled on the server (X-Queries header).
+    """
+
+    def __init__(self, token, server):
+        self.server = server.rstrip("/")
+        self.headers = {"Authorization": f"Token {token}"}
+
+    def get(self, url):
+        started = time.perf_counter()
+        try:
+            response = urlopen(Request(self.server + url, headers=self.headers))
+        except HTTPError as error:
+            # an error status (e.g. 429 of the throttling) is recorded, like in process
+            response = error
+        with response:
+            response.read()
+            elapsed = time.perf_counter() - started
+            queries = response.headers.get("X-Queries")
+            return response.getcode(), elapsed, int(queries) if queries is not None else None
+
+
+class Command(BaseCommand):
+    help = """
+        Benchmark the API endpoints : p50/p95/p99 latency, throughput and
+        queries per endpoint. By default a throwaway test database is seeded
+        (see seeddata for the dataset options), use --current-db to run on the
+        configured database or --server to run against a running server.
+        The results can be saved (--output) and compared with a previous run (--compare).
+    """
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=100, help="requests per endpoint")
+        parser.add_argument("--endpoints", nargs="*", help="names of the endpoints to run (all by default)")
+        parser.add_argument("--current-db", action="store_true", help="don't seed a test database")
+        parser.add_argument("--server", help="url of a running server (e.g. http://127.0.0.1:8000), "
+                            "its throttling must be disabled (THROTTLING = None)")
+        parser.add_argument("--host", default="localhost", help="Host header of the in process requests")
+        parser.add_argument("--output", help="JSON file to save the results")
+        parser.add_argument("--compare", help="JSON file of a previous run to compare with")
+        parser.add_argument("--random-seed", type=int, default=0)
+        parser.add_argument("--users", type=int, default=1000)
+        parser.add_argument("--teams", type=int, default=500)
+        parser.add_argument("--tournaments", type=int, default=100)
+        parser.add_argument("--teams-per-tournament", type=int, default=32)
+        parser.add_argument("--notifications", type=int, default=100000)
+
+    def handle(self, *args, **options):
+        testDatabase = not options["current_db"] and not options["server"]
+        oldName = connection.settings_dict["NAME"]
+        if testDatabase:
+            connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            if testDatabase:
+                seed(users=options["users"], teams=options["teams"], tournaments=options["tournaments"],
+                     teamsPerTournament=options["teams_per_tournament"],
+                     notifications=options["notifications"], randomSeed=options["random_seed"],
+                     progress=lambda message: self.stdout.write(f"  seeded {message}"))
+            # a single client : the in process requests would measure its budgets, not the endpoints
+            with override_settings(THROTTLING=None, LOAD_SHEDDING=None):
+                results = self.run(options)
+        finally:
+            if testDatabase:
+                connection.creation.destroy_test_db(oldName, verbosity=0)
+
+        self.report(results, options["compare"])
+        if options["output"]:
+            with open(options["output"], "w") as output:
+                json.dump(results, output, indent=2)
+            self.stdout.write(f"Results saved in {options['output']}")
+
+    def run(self, options):
+        rng = random.Random(options["random_seed"])
+        tournamentIds = list(Tournament.objects.values_list("id", flat=True))
+        token = Token.objects.select_related("user").order_by("user_id").first()
+        if not tournamentIds or token is None:
+            raise CommandError("The database has no tournament or no user with a token, run seeddata first.")
+        userIds = list(User.objects.values_list("id", flat=True))
+
+        if options["server"]:
+            runner = ServerRunner(token.key, options["server"])
+        else:
+            runner = ClientRunner(token.key, options["host"])
+
+        endpoints = [(name, url) for name, url in ENDPOINTS
+                     if not options["endpoints"] or name in options["endpoints"]]
+        results = {
+            "commit": gitcommit(),
+            "date": datetime.now(timezone.utc).isoformat(),
+            "requests": options["requests"],
+            "endpoints": {},
+        }
+
+        for name, url in endpoints:
+            latencies, queries, errors = [], [], 0
+            started = time.perf_counter()
+            for _ in range(options["requests"]):
+                status, elapsed, count = runner.get(url.format(
+                    tid=rng.choice(tournamentIds), uid=rng.choice(userIds)))
+                latencies.append(elapsed * 1000)
+                errors += status >= 400
+                if count is not None:
+                    queries.append(count)
+            duration = time.perf_counter() - started
+
+            results["endpoints"][name] = {
+                "p50": round(percentile(latencies, 0.50), 3),
+                "p95": round(percentile(latencies, 0.95), 3),
+                "p99": round(percentile(latencies, 0.99), 3),
+                "throughput": round(len(latencies) / duration, 1),
+                "queries": round(sum(queries) / len(queries), 2) if queries else None,
+                "errors": errors,
+            }
+
+        return results
+
+    def report(self, results, compare):
+        previous = {}
+        if compare:
+            with open(compare) as previousFile:
+                previous = json.load(previousFile)["endpoints"]
+
+        self.stdout.write("%-34s %9s %9s %9s %9s %8s %6s" % (
+            "endpoint", "p50 ms", "p95 ms", "p99 ms", "req/s", "queries", "errors"))
+        for name, result in results["endpoints"].items():
+            self.stdout.write("%-34s %9.2f %9.2f %9.2f %9.1f %8s %6d" % (
+                name, result["p50"], result["p95"], result["p99"], result["throughput"],
+                result["queries"] if result["queries"] is not None else "-", result["errors"]))
+
+            if name in previous:
+                before = previous[name]
+                self.stdout.write("%-34s %+8.0f%% %+8.0f%% %+8.0f%% %+8.0f%%" % (
+                    "  vs previous run",
+                    100 * (result["p50"] / before["p50"] - 1),
+                    100 * (result["p95"] / before["p95"] - 1),
+                    100 * (result["p99"] / before["p99"] - 1),
+                    100 * (result["throughput"] / before["throughput"] - 1)))
@@ -0,0 +1,287 @@
+"""
+    Benchmark of the concurrent connections served by a single process :
+    the read endpoints through the WSGI application, through the ASGI
+    application (the synchronous views) and their async versions through
+    the ASGI application (see views/asyncview.py). The throttling is
+    disabled, the load shedding is enabled with --shed-above.
+"""
+
+import asyncio
+import io
+import json
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+from django.contrib.auth.models import User
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.backends.signals import connection_created
+from django.test.utils import override_settings
+from rest_framework.authtoken.models import Token
+
+from ...models.tournamentmodel import Tournament
+from ...services import seed
+from .benchmarkapi import percentile
+
+# the read endpoints, formatted with a random tournament "tid" and user "uid",
+# the async versions are the same urls under /api/async/
+ENDPOINTS = [
+    "/api/tournaments/",
+    "/api/tournaments/{tid}/bracket/",
+    "/api/matchs/getmatchsbytournament/?tid={tid}",
+    "/api/notifications/inbox/?uid={uid}",
+]
+
+PATHS = ["wsgi", "asgi", "asgi-async"]
+
+
+class WSGIRunner:
+    """
+        The WSGI application called by a pool of threads (the worker threads
+        of a WSGI server), each thread serving a request at a time.
+    """
+
+    def __init__(self, threads, token):
+        self.application = WSGIHandler()
+        self.executor = ThreadPoolExecutor(threads)
+        self.token = token
+
+    def call(self, url):
+        parts = urlsplit(url)
+        environ = {
+            "REQUEST_METHOD": "GET",
+            "PATH_INFO": parts.path,
+            "QUERY_STRING": parts.query,
+            "SERVER_NAME": "localhost",
+            "SERVER_PORT": "80",
+            "SERVER_PROTOCOL": "HTTP/1.1",
+            "HTTP_HOST": "localhost",
+            "HTTP_AUTHORIZATION": f"Token {self.token}",
+            "REMOTE_ADDR": "127.0.0.1",
+            "wsgi.input": io.BytesIO(),
+            "wsgi.errors": io.StringIO(),
+            "wsgi.url_scheme": "http",
+            "wsgi.version": (1, 0),
+            "wsgi.multithread": True,
+            "wsgi.multiprocess": False,
+            "wsgi.run_once": False,
+        }
+        statuses = []
+        body = self.application(environ, lambda status, headers: statuses.append(int(status.split()[0])))
+        try:
+            b"".join(body)
+        finally:
+            body.close()
+        return statuses[0]
+
+    async def get(self, url):
+        return await asyncio.get_running_loop().run_in_executor(None, self.call, url)
+
+
+class ASGIRunner:
+    """
+        The ASGI application of backend/asgi.py called on the event loop,
+        its synchronous code running in a pool of threads.
+    """
+
+    def __init__(self, threads, token, prefix=""):
+        from backend.asgi import application
+
+        self.application = application
+        self.executor = ThreadPoolExecutor(threads)
+        self.token = token
+        self.prefix = prefix
+
+    async def get(self, url):
+        parts = urlsplit(url)
+        path = parts.path.replace("/api/", f"/api/{self.prefix}", 1)
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": "GET",
+            "scheme": "http",
+            "path": path,
+            "raw_path": path.encode(),
+            "query_string": parts.query.encode(),
+            "headers": [(b"host", b"localhost"), (b"authorization", f"Token {self.token}".encode())],
+            "client": ("127.0.0.1", 0),
+            "server": ("localhost", 80),
+        }
+        disconnected = asyncio.Event()
+        requested = False
+        statuses = []
+
+        async def receive():
+            nonlocal requested
+            if not requested:
+                requested = True
+                return {"type": "http.request", "body": b"", "more_body": False}
+            await disconnected.wait()
+            return {"type": "http.disconnect"}
+
+        async def send(message):
+            if message["type"] == "http.response.start":
+                statuses.append(message["status"])
+
+        try:
+            await self.application(scope, receive, send)
+        finally:
+            disconnected.set()
+        return statuses[0]
+
+
+class Command(BaseCommand):
+    help = """
+        Benchmark how many concurrent connections a single process serves
+        on the read endpoints through the WSGI application, the ASGI
+        application and the async views. Every connection sends its requests
+        one after the other, the latency of the database (a network round
+        trip, the test database being local) is added to every query.
+        By default a throwaway test database is seeded (see seeddata for the
+        dataset options), use --current-db to run on the configured database.
+    """
+
+    def add_arguments(self, parser):
+        parser.add_argument("--connections", type=int, nargs="+", default=[1, 10, 50, 200, 1000],
+                            help="numbers of concurrent connections")
+        parser.add_argument("--requests", type=int, default=2000, help="requests per number of connections")
+        parser.add_argument("--threads", type=int, default=16, help="threads of the process (both applications)")
+        parser.add_argument("--db-latency", type=float, default=2, help="milliseconds added to every query")
+        parser.add_argument("--max-p99", type=float, default=1000,
+                            help="p99 (ms) under which the connections are served")
+        parser.add_argument("--shed-above", type=int,
+                            help="concurrent requests above which the requests are shed (429, see LOAD_SHEDDING)")
+        parser.add_argument("--paths", nargs="*", choices=PATHS, default=PATHS)
+        parser.add_argument("--current-db", action="store_true", help="don't seed a test database")
+        parser.add_argument("--output", help="JSON file to save the results")
+        parser.add_argument("--random-seed", type=int, default=0)
+        parser.add_argument("--users", type=int, default=1000)
+        parser.add_argument("--teams", type=int, default=500)
+        parser.add_argument("--tournaments", type=int, default=100)
+        parser.add_argument("--teams-per-tournament", type=int, default=32)
+        parser.add_argument("--notifications", type=int, default=100000)
+
+    def handle(self, *args, **options):
+        testDatabase = not options["current_db"]
+        oldName = connection.settings_dict["NAME"]
+        if testDatabase:
+            connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            if testDatabase:
+                seed(users=options["users"], teams=options["teams"], tournaments=options["tournaments"],
+                     teamsPerTournament=options["teams_per_tournament"],
+                     notifications=options["notifications"], randomSeed=options["random_seed"],
+                     progress=lambda message: self.stdout.write(f"  seeded {message}"))
+            results = self.run(options)
+        finally:
+            if testDatabase:
+                connection.creation.destroy_test_db(oldName, verbosity=0)
+
+        self.report(results, options["max_p99"])
+        if options["output"]:
+            with open(options["output"], "w") as output:
+                json.dump(results, output, indent=2)
+            self.stdout.write(f"Results saved in {options['output']}")
+
+    def run(self, options):
+        rng = random.Random(options["random_seed"])
+        tournamentIds = list(Tournament.objects.values_list("id", flat=True))
+        token = Token.objects.select_related("user").order_by("user_id").first()
+        if not tournamentIds or token is None:
+            raise CommandError("The database has no tournament or no user with a token, run seeddata first.")
+        userIds = list(User.objects.values_list("id", flat=True))
+        urls = [url.format(tid=rng.choice(tournamentIds), uid=rng.choice(userIds))
+                for url in ENDPOINTS for _ in range(max(1, options["requests"] // len(ENDPOINTS)))]
+        rng.shuffle(urls)
+
+        latency = options["db_latency"] / 1000
+
+        def delay(execute, sql, params, many, context):
+            time.sleep(latency)
+            return execute(sql, params, many, context)
+
+        def addlatency(sender, connection, **kwargs):
+            # the connections of the threads serving the requests
+            connection.execute_wrappers.append(delay)
+
+        results = {"threads": options["threads"], "db_latency": options["db_latency"],
+                   "shed_above": options["shed_above"], "paths": {}}
+        loadShedding = {"MAX_CONCURRENT_REQUESTS": options["shed_above"]} if options["shed_above"] else None
+        connection_created.connect(addlatency)
+        # the connections share a token : the throttling would answer 429 to all of them
+        try:
+            with override_settings(THROTTLING=None, LOAD_SHEDDING=loadShedding):
+                for path in options["paths"]:
+                    results["paths"][path] = []
+                    for connections in options["connections"]:
+                        if path == "wsgi":
+                            runner = WSGIRunner(options["threads"], token.key)
+                        else:
+                            runner = ASGIRunner(options["threads"], token.key,
+                                                "async/" if path == "asgi-async" else "")
+                        result = asyncio.run(self.load(runner, urls, connections))
+                        result["connections"] = connections
+                        results["paths"][path].append(result)
+                        self.stdout.write(f"  {path} {connections} connections : {result['throughput']} req/s")
+        finally:
+            connection_created.disconnect(addlatency)
+        return results
+
+    async def load(self, runner, urls, connections):
+        """
+            Send the requests with the number of concurrent connections,
+            each connection sending its requests one after the other.
+        """
+        # the threads of the process (sync_to_async(thread_sensitive=False) runs in the default executor)
+        asyncio.get_running_loop().set_default_executor(runner.executor)
+        pending = iter(urls)
+        latencies, shedLatencies, errors = [], [], 0
+        peakThreads = threading.active_count()
+
+        async def client():
+            nonlocal errors, peakThreads
+            for url in pending:
+                started = time.perf_counter()
+                status = await runner.get(url)
+                elapsed = (time.perf_counter() - started) * 1000
+                if status == 429:
+                    # shed by LoadSheddingMiddleware
+                    shedLatencies.append(elapsed)
+                    continue
+                latencies.append(elapsed)
+                errors += status >= 400
+                peakThreads = max(peakThreads, threading.active_count())
+
+        started = time.perf_counter()
+        await asyncio.gather(*[client() for _ in range(connections)])
+        duration = time.perf_counter() - started
+
+        return {
+            "p50": round(percentile(latencies, 0.50), 3) if latencies else None,
+            "p99": round(percentile(latencies, 0.99), 3) if latencies else None,
+            "throughput": round(len(latencies) / duration, 1),
+            "threads": peakThreads,
+            "errors": errors,
+            "shed": len(shedLatencies),
+            "shed_p99": round(percentile(shedLatencies, 0.99), 3) if shedLatencies else None,
+        }
+
+    def report(self, results, maxP99):
+        self.stdout.write("%-12s %11s %9s %9s %9s %8s %6s %6s %12s" % (
+            "path", "connections", "p50 ms", "p99 ms", "req/s", "threads", "errors", "shed", "shed p99 ms"))
+        for path, rows in results["paths"].items():
+            for row in rows:
+                self.stdout.write("%-12s %11d %9.2f %9.2f %9.1f %8d %6d %6d %12.2f" % (
+                    path, row["connections"], row["p50"] or 0, row["p99"] or 0, row["throughput"],
+                    row["threads"], row["errors"], row["shed"], row["shed_p99"] or 0))
+
+        self.stdout.write(f"Concurrent connections served with a p99 under {maxP99:g} ms and no error :")
+        for path, rows in results["paths"].items():
+            served = [row["connections"] for row in rows
+                      if row["p99"] is not None and row["p99"] <= maxP99 and not row["errors"]]
+            self.stdout.write(self.style.SUCCESS(f"  {path} : {max(served) if served else 0}"))
@@ -0,0 +1,131 @@
+import random
+import time
+from contextlib import contextmanager
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from ...models.matchmodel import Match
+from ...models.notificationmodel import Notification
+from ...models.tournamentmodel import Tournament
+from ...services import seed
+
+
+class Command(BaseCommand):
+    help = """
+        Compare the query plans and the timings of the hot lookups with and
+        without the Match and Notification indexes.
+        Everything runs on a throwaway test database, the real one is not touched.
+    """
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=500)
+        parser.add_argument("--tournaments", type=int, default=200)
+        parser.add_argument("--teams", type=int, default=64, help="teams per tournament")
+        parser.add_argument("--notifications", type=int, default=200000)
+        parser.add_argument("--repeat", type=int, default=500, help="executions of each lookup")
+
+    def handle(self, *args, **options):
+        oldName = connection.settings_dict["NAME"]
+        connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            self.seed(options)
+            self.lookups = self.buildlookups(options)
+
+            self.removeindexes()
+            before = self.measure("without indexes", options["repeat"])
+            self.addindexes()
+            after = self.measure("with indexes", options["repeat"])
+
+            self.stdout.write("\nSummary (mean per lookup)")
+            for name in before:
+                self.stdout.write("  %-28s %8.3f ms -> %8.3f ms (x%.1f)" % (
+                    name, before[name], after[name], before[name] / max(after[name], 1e-9)))
+        finally:
+            connection.creation.destroy_test_db(oldName, verbosity=0)
+
+    def seed(self, options):
+        """
+            Create the users, the teams, one full bracket per tournament
+            and the notifications with bulk inserts.
+        """
+        started = time.perf_counter()
+        counts = seed(users=options["users"], teams=options["teams"], tournaments=options["tournaments"],
+                      teamsPerTournament=options["teams"], notifications=options["notifications"])
+
+        self.stdout.write("Seeded %d matches and %d notifications in %.1f s" % (
+            counts["matches"], counts["notifications"], time.perf_counter() - started))
+
+    def buildlookups(self, options):
+        """
+            The lookups done by the views : parent match, matches of a round
+            and the inbox of a user.
+        """
+        tournamentIds = list(Tournament.objects.values_list("id", flat=True))
+        userIds = list(User.objects.values_list("id", flat=True))
+        nbMatches = options["teams"] - 1
+        nbRounds = max(1, (options["teams"] - 1).bit_length())
+
+        return {
+            "match by idInTournament": lambda: Match.objects.filter(
+                tournament=random.choice(tournamentIds),
+                idInTournament=random.randint(1, nbMatches)),
+            "matches by round": lambda: Match.objects.filter(
+                tournament=random.choice(tournamentIds),
+                roundNb=random.randint(1, nbRounds)),
+            "notifications of a user": lambda: Notification.objects.filter(
+                user=random.choice(userIds)).order_by("seen", "-creationDate", "id")[:20],
+        }
+
+    def measure(self, title, repeat):
+        self.stdout.write(self.style.MIGRATE_HEADING(f"\n{title}"))
+        timings = {}
+        for name, lookup in self.lookups.items():
+            self.stdout.write(f"{name}\n  plan: " + lookup().explain().replace("\n", "\n        "))
+
+            started = time.perf_counter()
+            for _ in range(repeat):
+                list(lookup())
+            timings[name] = (time.perf_counter() - started) * 1000 / repeat
+            self.stdout.write("  mean: %.3f ms" % timings[name])
+
+        return timings
+
+    def indexes(self):
+        return [(Match, index) for index in Match._meta.indexes] + \
+               [(Notification, index) for index in Notification._meta.indexes]
+
+    def constraints(self):
+        return list(Match._meta.constraints)
+
+    @contextmanager
+    def options(self, model, indexes, constraints):
+        """
+            SQLite drops or adds a constraint by rebuilding the table from the
+            model options : make these options match the wanted schema.
+        """
+        saved = model._meta.indexes, model._meta.constraints
+        model._meta.indexes, model._meta.constraints = indexes, constraints
+        try:
+            yield
+        finally:
+            model._meta.indexes, model._meta.constraints = saved
+
+    def removeindexes(self):
+        with connection.schema_editor() as editor:
+            for model, index in self.indexes():
+                editor.remove_index(model, index)
+            constraints = self.constraints()
+            with self.options(Match, [], []):
+                for constraint in constraints:
+                    editor.remove_constraint(Match, constraint)
+
+    def addindexes(self):
+        with connection.schema_editor() as editor:
+            constraints = self.constraints()
+            with self.options(Match, [], constraints):
+                for constraint in constraints:
+                    editor.add_constraint(Match, constraint)
+            for model, index in self.indexes():
+                editor.add_index(model, index)
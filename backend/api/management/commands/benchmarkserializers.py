@@ -0,0 +1,74 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import RequestFactory
+from rest_framework.request import Request
+
+from ...models.matchmodel import Match
+from ...models.notificationmodel import Notification
+from ...models.teammodel import Team
+from ...models.tournamentmodel import Tournament
+from ...readserializers import (MatchReadSerializer, NotificationReadSerializer,
+                                TeamReadSerializer, TournamentReadSerializer)
+from ...services import seed
+
+
+class Command(BaseCommand):
+    help = """
+        Compare the ModelSerializer classes with the read serializers used by
+        the list endpoints : time to serialize the same rows (query included)
+        and check that both give the same output.
+        Everything runs on a seeded throwaway test database.
+    """
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=10000, help="rows serialized per model")
+        parser.add_argument("--repeat", type=int, default=5)
+        parser.add_argument("--fields", help="sparse fieldset also measured (e.g. id,name)")
+
+    def handle(self, *args, **options):
+        rows = options["rows"]
+        oldName = connection.settings_dict["NAME"]
+        connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            # enough 64 teams brackets (63 matches, most of the deadlines are over) for the matches
+            seed(users=max(rows // 10, 10), teams=max(rows, 64), members=2,
+                 tournaments=rows // 50 + 1, teamsPerTournament=64, referees=1, notifications=rows)
+
+            request = Request(RequestFactory().get("/", HTTP_HOST="localhost"))
+            for model, readSerializer in ((Match, MatchReadSerializer), (Team, TeamReadSerializer),
+                                          (Tournament, TournamentReadSerializer),
+                                          (Notification, NotificationReadSerializer)):
+                self.compare(model, readSerializer, request, options)
+        finally:
+            connection.creation.destroy_test_db(oldName, verbosity=0)
+
+    def measure(self, serialize, repeat):
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            data = serialize()
+            timings.append(time.perf_counter() - started)
+        return min(timings) * 1000, data
+
+    def compare(self, model, readSerializer, request, options):
+        queryset = model.objects.order_by("id")[:options["rows"]]
+        count = queryset.count()
+
+        modelTime, modelData = self.measure(lambda: readSerializer.serializer_class(
+            queryset, many=True, context={"request": request}).data, options["repeat"])
+        readTime, readData = self.measure(
+            lambda: readSerializer(request).serialize(queryset), options["repeat"])
+        if [dict(row) for row in modelData] != readData:
+            raise CommandError(f"{model.__name__} : the read serializer output is different")
+
+        self.stdout.write("%-13s %6d rows  ModelSerializer %8.1f ms  read serializer %8.1f ms (x%.1f)" % (
+            model.__name__, count, modelTime, readTime, modelTime / max(readTime, 1e-9)))
+
+        if options["fields"]:
+            fields = [name for name in options["fields"].split(",")
+                      if name in readSerializer.serializer_class.Meta.fields]
+            fieldsTime, _ = self.measure(
+                lambda: readSerializer(request, fields).serialize(queryset), options["repeat"])
+            self.stdout.write("%-13s %6s       ?fields=%-33s %8.1f ms" % ("", "", ",".join(fields), fieldsTime))
@@ -0,0 +1,49 @@
+import os
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from ...services import KINDS, ImportDataError, importrows, readcsv, readndjson, rebuildteamstats
+
+
+class Command(BaseCommand):
+    help = """
+        Import the files of the export (/api/export/) in a single transaction :
+        an NDJSON file with every kind of rows, or CSV files named after their
+        kind (users.csv, teams.csv...). The rows get new ids, the existing users
+        and teams (same username or name) are kept.
+    """
+
+    def add_arguments(self, parser):
+        parser.add_argument("files", nargs="+")
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument("--no-stats", action="store_true", help="don't rebuild the team statistics")
+
+    def rows(self, files):
+        # the CSV files are read in the import order of their kind
+        def kind(path):
+            return os.path.splitext(os.path.basename(path))[0]
+
+        for path in sorted(files, key=lambda path: list(KINDS).index(kind(path)) if kind(path) in KINDS else -1):
+            with open(path, newline="", encoding="utf-8") as file:
+                if path.endswith(".csv"):
+                    if kind(path) not in KINDS:
+                        raise CommandError(f"{path} : the name of a CSV file must be a kind ({', '.join(KINDS)})")
+                    yield from readcsv(file, kind(path))
+                else:
+                    yield from readndjson(file)
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        try:
+            counts = importrows(self.rows(options["files"]), batchSize=options["batch_size"])
+        except (ImportDataError, OSError) as error:
+            raise CommandError(str(error))
+
+        for kind, count in counts.items():
+            self.stdout.write(f"  {kind} : {count}")
+        if not options["no_stats"]:
+            rebuildteamstats()
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS("Imported %d rows in %.1f s" % (sum(counts.values()), elapsed)))
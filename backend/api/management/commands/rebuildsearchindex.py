@@ -0,0 +1,24 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from ...services import rebuildsearchindex
+
+
+class Command(BaseCommand):
+    help = """
+        Rebuild the search index of the teams, the tournaments and the users
+        (it's updated when they're saved, not when they're written with
+        bulk_create or update()).
+    """
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        counts = rebuildsearchindex(batchSize=options["batch_size"])
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS("Indexed %s in %.1f s" % (
+            ", ".join(f"{count} {kind}" for kind, count in counts.items()), elapsed)))
@@ -0,0 +1,22 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from ...services import rebuildteamstats
+
+
+class Command(BaseCommand):
+    help = """
+        Rebuild the statistics and the ratings of every team from the
+        results of every tournament (they're updated with every result).
+    """
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        count = rebuildteamstats(batchSize=options["batch_size"])
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS("Replayed %d results in %.1f s" % (count, elapsed)))
@@ -0,0 +1,40 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from ...services import seed
+
+
+class Command(BaseCommand):
+    help = """
+        Seed a synthetic dataset : users (password "password", with a token),
+        teams and members, tournaments with their brackets and notifications.
+    """
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=1000)
+        parser.add_argument("--teams", type=int, default=500)
+        parser.add_argument("--members", type=int, default=5, help="members per team")
+        parser.add_argument("--tournaments", type=int, default=100)
+        parser.add_argument("--teams-per-tournament", type=int, default=32)
+        parser.add_argument("--referees", type=int, default=3, help="referees per tournament")
+        parser.add_argument("--notifications", type=int, default=100000)
+        parser.add_argument("--prefix", default="seed", help="prefix of the names, to seed several datasets")
+        parser.add_argument("--random-seed", type=int, default=0)
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        counts = seed(users=options["users"],
+                      teams=options["teams"],
+                      members=options["members"],
+                      tournaments=options["tournaments"],
+                      teamsPerTournament=options["teams_per_tournament"],
+                      referees=options["referees"],
+                      notifications=options["notifications"],
+                      prefix=options["prefix"],
+                      randomSeed=options["random_seed"],
+                      progress=lambda message: self.stdout.write(f"  {message}"))
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS("Seeded %d rows in %.1f s (%.0f rows/s)" % (
+            sum(counts.values()), elapsed, sum(counts.values()) / elapsed)))
@@ -0,0 +1,69 @@
+# Generated by Django 3.1.7 on 2026-10-18 07:11
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Team',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=250, unique=True)),
+                ('image', models.TextField(blank=True)),
+                ('leader', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL, to_field='username')),
+                ('members', models.ManyToManyField(related_name='member', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Tournament',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=250)),
+                ('gameName', models.CharField(max_length=250)),
+                ('matchDuration', models.IntegerField()),
+                ('breakDuration', models.IntegerField()),
+                ('deadLineDate', models.DateField()),
+                ('nbTeam', models.IntegerField()),
+                ('streamURL', models.CharField(max_length=1000)),
+                ('organizer', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='organizer', to=settings.AUTH_USER_MODEL, to_field='username')),
+                ('referees', models.ManyToManyField(related_name='referees', to=settings.AUTH_USER_MODEL)),
+                ('teams', models.ManyToManyField(blank=True, to='api.Team')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Notification',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('message', models.CharField(max_length=1000)),
+                ('seen', models.BooleanField(default=False)),
+                ('notificationType', models.CharField(default='MESSAGE', max_length=20)),
+                ('creationDate', models.DateTimeField()),
+                ('team', models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, to='api.team')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Match',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('score1', models.IntegerField(blank=True, null=True)),
+                ('score2', models.IntegerField(blank=True, null=True)),
+                ('idInTournament', models.IntegerField()),
+                ('roundNb', models.IntegerField()),
+                ('idParent', models.IntegerField(blank=True, null=True)),
+                ('team1', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='team1', to='api.team')),
+                ('team2', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='team2', to='api.team')),
+                ('tournament', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='api.tournament')),
+            ],
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 3.1.7 on 2026-10-18 07:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0003_notification_inbox_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='match',
+            name='version',
+            field=models.IntegerField(default=0),
+        ),
+    ]
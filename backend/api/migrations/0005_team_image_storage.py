@@ -0,0 +1,71 @@
+import base64
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def converttoimages(apps, schema_editor):
+    """
+        Move the base64 data urls stored in the team rows to the image storage.
+        The data that isn't a valid image is dropped.
+    """
+    from backend.api.images import decodedataurl, writeimage
+
+    Team = apps.get_model("api", "Team")
+    Image = apps.get_model("api", "Image")
+
+    teams = Team.objects.exclude(imageData="").only("id", "imageData")
+    for team in teams.iterator(chunk_size=100):
+        try:
+            fields = writeimage(decodedataurl(team.imageData))
+        except ValueError:
+            continue
+        image, created = Image.objects.get_or_create(hash=fields.pop("hash"), defaults=fields)
+        Team.objects.filter(id=team.id).update(image=image)
+
+
+def converttodataurls(apps, schema_editor):
+    from django.core.files.storage import default_storage
+    from backend.api.images import imagepath
+
+    Team = apps.get_model("api", "Team")
+
+    for team in Team.objects.exclude(image=None).select_related("image").iterator(chunk_size=100):
+        with default_storage.open(imagepath(team.image.hash, team.image.format)) as file:
+            data = base64.b64encode(file.read()).decode()
+        Team.objects.filter(id=team.id).update(imageData=f"data:image/{team.image.format};base64,{data}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0004_match_version'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Image',
+            fields=[
+                ('hash', models.CharField(max_length=64, primary_key=True, serialize=False)),
+                ('format', models.CharField(max_length=10)),
+                ('width', models.PositiveIntegerField()),
+                ('height', models.PositiveIntegerField()),
+                ('size', models.PositiveIntegerField()),
+            ],
+        ),
+        migrations.RenameField(
+            model_name='team',
+            old_name='image',
+            new_name='imageData',
+        ),
+        migrations.AddField(
+            model_name='team',
+            name='image',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='api.image'),
+        ),
+        migrations.RunPython(converttoimages, converttodataurls),
+        migrations.RemoveField(
+            model_name='team',
+            name='imageData',
+        ),
+    ]
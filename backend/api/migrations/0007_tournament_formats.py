@@ -0,0 +1,62 @@
+# Generated by Django 3.1.7 on 2026-10-18 07:39
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0006_match_schedule'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='match',
+            name='idLoserParent',
+            field=models.IntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='match',
+            name='loserSide',
+            field=models.IntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='match',
+            name='parentSide',
+            field=models.IntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='match',
+            name='stage',
+            field=models.CharField(default='main', max_length=10),
+        ),
+        migrations.AddField(
+            model_name='tournament',
+            name='format',
+            field=models.CharField(choices=[('single', 'Single elimination'), ('double', 'Double elimination'), ('roundrobin', 'Round robin'), ('swiss', 'Swiss')], default='single', max_length=10),
+        ),
+        migrations.CreateModel(
+            name='Standing',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('played', models.IntegerField(default=0)),
+                ('wins', models.IntegerField(default=0)),
+                ('draws', models.IntegerField(default=0)),
+                ('losses', models.IntegerField(default=0)),
+                ('points', models.IntegerField(default=0)),
+                ('scoreFor', models.IntegerField(default=0)),
+                ('scoreAgainst', models.IntegerField(default=0)),
+                ('team', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='api.team')),
+                ('tournament', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='api.tournament')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='standing',
+            index=models.Index(fields=['tournament', '-points'], name='standing_tournament_points_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='standing',
+            constraint=models.UniqueConstraint(fields=('tournament', 'team'), name='unique_standing_team'),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 3.1.7 on 2026-10-18 07:41
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0007_tournament_formats'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TeamStats',
+            fields=[
+                ('team', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='api.team')),
+                ('played', models.IntegerField(default=0)),
+                ('wins', models.IntegerField(default=0)),
+                ('draws', models.IntegerField(default=0)),
+                ('losses', models.IntegerField(default=0)),
+                ('scoreFor', models.IntegerField(default=0)),
+                ('scoreAgainst', models.IntegerField(default=0)),
+                ('tournaments', models.IntegerField(default=0)),
+                ('rating', models.FloatField(default=1500.0)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='teamstats',
+            index=models.Index(fields=['-rating'], name='teamstats_rating_idx'),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 3.1.7 on 2026-10-18 07:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0008_team_stats'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NotificationArchive',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('userId', models.IntegerField()),
+                ('teamId', models.IntegerField(blank=True, null=True)),
+                ('notificationType', models.CharField(max_length=20)),
+                ('message', models.TextField()),
+                ('creationDate', models.DateTimeField()),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='notificationarchive',
+            index=models.Index(fields=['userId', '-creationDate'], name='archive_user_idx'),
+        ),
+    ]
@@ -0,0 +1,70 @@
+# Generated by Django 3.1.7 on 2026-10-18 08:00
+
+from django.db import migrations, models
+
+
+# the kinds in the order of SearchEntry.SOURCES : (kind, app, model, name column, detail column)
+SOURCES = [
+    ("teams", "api", "Team", "name", None),
+    ("tournaments", "api", "Tournament", "name", "gameName"),
+    ("users", "auth", "User", "username", None),
+]
+
+
+def createindex(apps, schema_editor):
+    """
+        Create the search index table of the database and index the
+        existing teams, tournaments and users.
+    """
+    connection = schema_editor.connection
+    if connection.vendor == "sqlite":
+        # the prefix indexes make the prefix queries of 2 to 4 characters fast
+        schema_editor.execute(
+            "CREATE VIRTUAL TABLE api_searchindex USING fts5("
+            "kind UNINDEXED, name, detail, tokenize='unicode61 remove_diacritics 2', prefix='2 3 4')")
+    elif connection.vendor == "mysql":
+        schema_editor.execute(
+            "CREATE TABLE api_searchindex ("
+            "rowid BIGINT NOT NULL PRIMARY KEY, kind VARCHAR(12) NOT NULL, "
+            "name VARCHAR(250) NOT NULL, detail VARCHAR(250) NOT NULL, "
+            "FULLTEXT INDEX api_searchindex_text (name, detail)) ENGINE=InnoDB")
+    else:
+        # no full-text index : searched with LIKE
+        schema_editor.create_model(apps.get_model("api", "SearchEntry"))
+
+    quote = schema_editor.quote_name
+    for index, (kind, app, model, name, detail) in enumerate(SOURCES):
+        detail = quote(detail) if detail else "''"
+        table = quote(apps.get_model(app, model)._meta.db_table)
+        schema_editor.execute(
+            f"INSERT INTO api_searchindex (rowid, kind, name, detail) "
+            f"SELECT id * {len(SOURCES)} + {index}, %s, {quote(name)}, {detail} FROM {table}", [kind])
+
+
+def dropindex(apps, schema_editor):
+    schema_editor.execute("DROP TABLE api_searchindex")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('api', '0009_notification_archive'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchEntry',
+            fields=[
+                ('id', models.BigIntegerField(db_column='rowid', primary_key=True, serialize=False)),
+                ('kind', models.CharField(max_length=12)),
+                ('name', models.CharField(max_length=250)),
+                ('detail', models.CharField(blank=True, default='', max_length=250)),
+            ],
+            options={
+                'db_table': 'api_searchindex',
+                'managed': False,
+            },
+        ),
+        migrations.RunPython(createindex, dropindex),
+    ]
@@ -1,3 +1,9 @@
+from .imagemodel import Image
 from .teammodel import Team
 from .matchmodel import Match
 from .tournamentmodel import Tournament
+from .notificationmodel import Notification
+from .standingmodel import Standing
+from .teamstatsmodel import TeamStats
+from .notificationarchivemodel import NotificationArchive
+from .searchentrymodel import SearchEntry
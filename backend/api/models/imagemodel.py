@@ -0,0 +1,17 @@
+from django.db import models
+
+
+class Image(models.Model):
+    """
+        An image stored in the media storage, identified by the SHA-256 of
+        its content : the same image uploaded twice is stored once.
+        The files themselves are never modified, see images.py.
+    """
+    hash = models.CharField(max_length=64, primary_key=True)
+    format = models.CharField(max_length=10)
+    width = models.PositiveIntegerField()
+    height = models.PositiveIntegerField()
+    size = models.PositiveIntegerField()
+
+    def __str__(self):
+        return f"{self.hash}.{self.format}"
@@ -1,8 +1,11 @@
 from django.db import models
+from django.contrib.auth.models import User
 from .teammodel import Team
 from .tournamentmodel import Tournament
 from django.db.models.signals import post_save, post_delete
-from .teammodel import Team
+from django.dispatch import receiver
+from ..cache import bumpversion
+from ..push import publishmatch
 
 
 class Match(models.Model):
@@ -14,9 +17,40 @@ class Match(models.Model):
     idInTournament = models.IntegerField()  # id of this match inside a tournament
     roundNb = models.IntegerField()  # id of this match inside a tournament
     idParent = models.IntegerField(blank=True, null=True) # idInTournament of the parent
+    parentSide = models.IntegerField(blank=True, null=True)  # team (1 or 2) of the winner in the parent, by parity if null
+    idLoserParent = models.IntegerField(blank=True, null=True)  # idInTournament of the next match of the loser
+    loserSide = models.IntegerField(blank=True, null=True)  # team (1 or 2) of the loser in this match
+    stage = models.CharField(max_length=10, default="main")  # main, losers (bracket) or final (see services/formatservice.py)
+    version = models.IntegerField(default=0)  # incremented on every result, for optimistic concurrency
+    startTime = models.DateTimeField(blank=True, null=True)  # planned start (see services/scheduleservice.py)
+    endTime = models.DateTimeField(blank=True, null=True)  # when the result was recorded
+    slot = models.IntegerField(blank=True, null=True)  # parallel slot (field, table, server...) of the match
+    referee = models.ForeignKey(User, related_name="refereedmatches", on_delete=models.SET_NULL, blank=True, null=True)
+
+    class Meta:
+        constraints = [
+            # a match is found by its tournament and its idInTournament (parent lookup)
+            models.UniqueConstraint(fields=["tournament", "idInTournament"],
+                                    name="unique_match_idintournament"),
+        ]
+        indexes = [
+            models.Index(fields=["tournament", "roundNb"], name="match_tournament_round_idx"),
+        ]
 
     def __str__(self):
         team1 = self.team1.name if self.team1 is not None else "tbd"  # to be defined
         team2 = self.team2.name if self.team2 is not None else "tbd"
 
         return team1 + " VS " + team2
+
+
+@receiver([post_save, post_delete], sender=Match)
+def invalidatebracket(sender, instance, **kwargs):
+    # the cached bracket of the tournament is outdated
+    bumpversion("bracket", instance.tournament_id)
+
+
+@receiver(post_save, sender=Match)
+def pushmatch(sender, instance, **kwargs):
+    # the clients following the tournament receive the new state of the match
+    publishmatch(instance)
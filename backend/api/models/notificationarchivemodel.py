@@ -0,0 +1,24 @@
+from django.db import models
+
+
+class NotificationArchive(models.Model):
+    """
+        A seen notification removed from Notification after the retention
+        delay (see services/retentionservice.py). It keeps the id of the
+        notification and the ids of its user and team without foreign keys,
+        so archiving doesn't depend on the users and teams still existing.
+    """
+    id = models.BigIntegerField(primary_key=True)
+    userId = models.IntegerField()
+    teamId = models.IntegerField(blank=True, null=True)
+    notificationType = models.CharField(max_length=20)
+    message = models.TextField()
+    creationDate = models.DateTimeField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["userId", "-creationDate"], name="archive_user_idx"),
+        ]
+
+    def __str__(self):
+        return self.message
@@ -1,7 +1,9 @@
 from django.db import models
 from django.contrib.auth.models import User
 from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
 from .teammodel import Team
+from ..push import publishnotification
 
 class Notification(models.Model):
 	message = models.CharField(max_length=1000)
@@ -11,5 +13,17 @@ class Notification(models.Model):
 	team = models.ForeignKey(Team, on_delete=models.CASCADE, null=True)
 	creationDate = models.DateTimeField()
 
+	class Meta:
+		indexes = [
+			# notifications of a user, unseen first then the most recent (inbox)
+			models.Index(fields=["user", "seen", "-creationDate"], name="notification_inbox_idx"),
+		]
+
 	def __str__(self):
-		return self.message
\ No newline at end of file
+		return self.message
+
+
+@receiver(post_save, sender=Notification)
+def pushnotification(sender, instance, **kwargs):
+	# the user receives the notification without polling
+	publishnotification(instance)
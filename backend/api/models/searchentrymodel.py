@@ -0,0 +1,66 @@
+from django.db import models
+from django.contrib.auth.models import User
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from .teammodel import Team
+from .tournamentmodel import Tournament
+
+
+class SearchEntry(models.Model):
+    """
+        A row of the search index (see services/searchservice.py). The table
+        is created by its migration for the database : a FTS5 table with
+        SQLite, a table with a FULLTEXT index with MySQL.
+        The id encodes the kind and the id of the indexed object.
+    """
+    # kind -> model, name field and detail field (or None), in the order of the ids
+    SOURCES = {
+        "teams": (Team, "name", None),
+        "tournaments": (Tournament, "name", "gameName"),
+        "users": (User, "username", None),
+    }
+
+    id = models.BigIntegerField(primary_key=True, db_column="rowid")
+    kind = models.CharField(max_length=12)
+    name = models.CharField(max_length=250)
+    detail = models.CharField(max_length=250, blank=True, default="")
+
+    class Meta:
+        managed = False
+        db_table = "api_searchindex"
+
+    @classmethod
+    def entryid(cls, kind, objectId):
+        return objectId * len(cls.SOURCES) + list(cls.SOURCES).index(kind)
+
+    @property
+    def objectId(self):
+        return self.id // len(self.SOURCES)
+
+    @classmethod
+    def build(cls, kind, objectId, name, detail=None):
+        return cls(id=cls.entryid(kind, objectId), kind=kind, name=name, detail=detail or "")
+
+
+def sourcekind(model):
+    return next(kind for kind, source in SearchEntry.SOURCES.items() if source[0] is model)
+
+
+@receiver(post_save, sender=Team)
+@receiver(post_save, sender=Tournament)
+@receiver(post_save, sender=User)
+def indexobject(sender, instance, update_fields=None, raw=False, **kwargs):
+    kind = sourcekind(sender)
+    model, name, detail = SearchEntry.SOURCES[kind]
+    # e.g. a login only saves the field last_login of the user
+    if raw or (update_fields is not None and not {name, detail} & set(update_fields)):
+        return
+    SearchEntry.build(kind, instance.pk, getattr(instance, name),
+                      getattr(instance, detail) if detail else None).save()
+
+
+@receiver(post_delete, sender=Team)
+@receiver(post_delete, sender=Tournament)
+@receiver(post_delete, sender=User)
+def unindexobject(sender, instance, **kwargs):
+    SearchEntry.objects.filter(pk=SearchEntry.entryid(sourcekind(sender), instance.pk)).delete()
@@ -0,0 +1,31 @@
+from django.db import models
+from .teammodel import Team
+from .tournamentmodel import Tournament
+
+
+class Standing(models.Model):
+    """
+        The standing of a team in a round robin or swiss tournament, updated
+        with every result (see services/formatservice.py).
+    """
+    tournament = models.ForeignKey(Tournament, on_delete=models.CASCADE)
+    team = models.ForeignKey(Team, on_delete=models.CASCADE)
+    played = models.IntegerField(default=0)
+    wins = models.IntegerField(default=0)
+    draws = models.IntegerField(default=0)
+    losses = models.IntegerField(default=0)
+    points = models.IntegerField(default=0)
+    scoreFor = models.IntegerField(default=0)
+    scoreAgainst = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["tournament", "team"], name="unique_standing_team"),
+        ]
+        indexes = [
+            # the ranking of a tournament
+            models.Index(fields=["tournament", "-points"], name="standing_tournament_points_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.team} : {self.points}"
@@ -1,14 +1,41 @@
 from django.db import models
 from django.contrib.auth.models import User
-from django.db.models.signals import post_save, post_delete
+from django.db.models.signals import post_save, post_delete, m2m_changed
+from django.dispatch import receiver
+from ..cache import bumpversion
+from .imagemodel import Image
 
 
 class Team(models.Model):
     name = models.CharField(max_length=250, unique=True)
-    image = models.TextField(blank=True)
+    image = models.ForeignKey(Image, null=True, blank=True, on_delete=models.SET_NULL, related_name="+")
     leader = models.ForeignKey(
         User, to_field="username", on_delete=models.CASCADE)
     members = models.ManyToManyField(User, related_name="member")
 
     def __str__(self):
         return self.name
+
+
+@receiver(post_save, sender=Team)
+def invalidatebrackets(sender, instance, created, **kwargs):
+    # the team name is inlined in the cached brackets of its tournaments
+    if not created:
+        for tournamentId in instance.tournament_set.values_list("id", flat=True):
+            bumpversion("bracket", tournamentId)
+
+
+@receiver([post_save, post_delete], sender=Team)
+def invalidateteams(sender, instance, **kwargs):
+    # every cached response listing teams (they're rarely modified)
+    bumpversion("teams", "all")
+
+
+@receiver(m2m_changed, sender=Team.members.through)
+def invalidatememberteams(sender, instance, action, reverse, pk_set, **kwargs):
+    if action in ("post_add", "post_remove", "post_clear"):
+        if not reverse and action == "post_clear":
+            # team.members.clear() doesn't give the members
+            bumpversion("teams", "all")
+        for userId in ((pk_set or []) if not reverse else [instance.pk]):
+            bumpversion("memberteams", userId)
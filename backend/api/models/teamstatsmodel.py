@@ -0,0 +1,30 @@
+from django.db import models
+from .teammodel import Team
+
+INITIAL_RATING = 1500.0
+
+
+class TeamStats(models.Model):
+    """
+        The results of a team over every tournament, updated with every
+        result and rebuilt by the command rebuildteamstats
+        (see services/statsservice.py).
+    """
+    team = models.OneToOneField(Team, primary_key=True, on_delete=models.CASCADE, related_name="stats")
+    played = models.IntegerField(default=0)
+    wins = models.IntegerField(default=0)
+    draws = models.IntegerField(default=0)
+    losses = models.IntegerField(default=0)
+    scoreFor = models.IntegerField(default=0)
+    scoreAgainst = models.IntegerField(default=0)
+    tournaments = models.IntegerField(default=0)  # tournaments with a result of the team
+    rating = models.FloatField(default=INITIAL_RATING)  # Elo rating
+
+    class Meta:
+        indexes = [
+            # the leaderboard
+            models.Index(fields=["-rating"], name="teamstats_rating_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.team} : {self.rating:.0f}"
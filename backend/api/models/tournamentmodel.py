@@ -1,10 +1,23 @@
 from django.db import models
 from django.contrib.auth.models import User
 from .teammodel import Team
-from django.db.models.signals import post_save, post_delete
+from django.db.models.signals import post_save, post_delete, m2m_changed
+from django.dispatch import receiver
+from ..cache import bumpversion
 
 
 class Tournament(models.Model):
+    SINGLE_ELIMINATION = "single"
+    DOUBLE_ELIMINATION = "double"
+    ROUND_ROBIN = "roundrobin"
+    SWISS = "swiss"
+    FORMATS = [
+        (SINGLE_ELIMINATION, "Single elimination"),
+        (DOUBLE_ELIMINATION, "Double elimination"),
+        (ROUND_ROBIN, "Round robin"),
+        (SWISS, "Swiss"),
+    ]
+
     organizer = models.ForeignKey(
         User, to_field="username", on_delete=models.CASCADE, related_name="organizer")
     name = models.CharField(max_length=250)
@@ -14,8 +27,61 @@ class Tournament(models.Model):
     deadLineDate = models.DateField()
     nbTeam = models.IntegerField()
     streamURL = models.CharField(max_length=1000)
+    nbSlots = models.IntegerField(default=1)  # matches played at the same time
+    format = models.CharField(max_length=10, choices=FORMATS, default=SINGLE_ELIMINATION)
     teams = models.ManyToManyField(Team, blank=True)
     referees = models.ManyToManyField(User, related_name="referees")
 
     def __str__(self):
         return self.name
+
+
+@receiver(m2m_changed, sender=Tournament.teams.through)
+@receiver(m2m_changed, sender=Tournament.referees.through)
+def invalidatebracket(sender, instance, action, reverse, pk_set, **kwargs):
+    # the teams and the referees are part of the cached bracket
+    if action in ("post_add", "post_remove", "post_clear"):
+        tournamentIds = (pk_set or []) if reverse else [instance.pk]
+        for tournamentId in tournamentIds:
+            bumpversion("bracket", tournamentId)
+
+
+@receiver([post_save, post_delete], sender=Tournament)
+def invalidatetournaments(sender, instance, **kwargs):
+    # the cached responses listing the tournaments, their teams or their referees
+    bumpversion("tournaments", "all")
+    bumpversion("tournamentteams", instance.pk)
+    bumpversion("referees", instance.pk)
+
+
+@receiver(m2m_changed, sender=Tournament.teams.through)
+def invalidatetournamentteams(sender, instance, action, reverse, pk_set, **kwargs):
+    if action in ("post_add", "post_remove", "post_clear"):
+        if reverse and action == "post_clear":
+            # team.tournament_set.clear() doesn't give the tournaments
+            bumpversion("teams", "all")
+        for tournamentId in ((pk_set or []) if reverse else [instance.pk]):
+            bumpversion("tournamentteams", tournamentId)
+
+
+@receiver(m2m_changed, sender=Tournament.referees.through)
+def invalidatereferees(sender, instance, action, reverse, pk_set, **kwargs):
+    if action in ("post_add", "post_remove", "post_clear"):
+        if reverse and action == "post_clear":
+            # user.referees.clear() doesn't give the tournaments
+            bumpversion("users", "all")
+        for tournamentId in ((pk_set or []) if reverse else [instance.pk]):
+            bumpversion("referees", tournamentId)
+
+
+# the fields of the users in the cached responses
+USER_FIELDS = {"username", "email"}
+
+
+@receiver([post_save, post_delete], sender=User)
+def invalidateusers(sender, instance, update_fields=None, **kwargs):
+    # the referees are serialized with their username and email, a login only
+    # saves the field last_login of the user
+    if update_fields is not None and not USER_FIELDS & set(update_fields):
+        return
+    bumpversion("users", "all")
@@ -0,0 +1,114 @@
+"""
+    This file contains the pagination classes of the api app.
+"""
+
+import base64
+import json
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class OptionalPageNumberPagination(PageNumberPagination):
+    """
+        Page number pagination enabled only when the client asks for it
+        with the "page_size" GET parameter, so the existing clients still
+        receive the full list.
+    """
+    page_size = None
+    page_size_query_param = "page_size"
+    max_page_size = 100
+
+
+class KeysetPagination(BasePagination):
+    """
+        Keyset (seek) pagination : the cursor holds the ordering values of the
+        last row of the page and the next page is read with a WHERE on these
+        values, so a page costs the same whatever its position.
+        The ordering must end with a unique field (the id).
+    """
+    ordering = ("-id",)
+    page_size = 20
+    page_size_query_param = "page_size"
+    max_page_size = 100
+    cursor_query_param = "cursor"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.pageSize = self.get_page_size(request)
+        queryset = queryset.order_by(*self.ordering)
+
+        cursor = request.query_params.get(self.cursor_query_param, None)
+        if cursor is not None:
+            try:
+                condition = self.after(queryset.model, self.decode_cursor(cursor))
+            except (TypeError, ValidationError):
+                # a value of the cursor which isn't a value of its field
+                raise NotFound("Invalid cursor")
+            queryset = queryset.filter(condition)
+
+        rows = list(queryset[:self.pageSize + 1])
+        self.hasNext = len(rows) > self.pageSize
+        rows = rows[:self.pageSize]
+        self.last = rows[-1] if rows else None
+        return rows
+
+    def get_page_size(self, request):
+        try:
+            pageSize = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return min(max(pageSize, 1), self.max_page_size)
+
+    def after(self, model, values):
+        """
+            Build the lexicographic condition "row > cursor" for the ordering :
+            (a > x) or (a = x and b > y) or (a = x and b = y and c > z) ...
+        """
+        condition = Q()
+        equal = Q()
+        for field, value in zip(self.ordering, values):
+            name = field.lstrip("-")
+            value = model._meta.get_field(name).to_python(value)
+            lookup = "lt" if field.startswith("-") else "gt"
+            condition |= equal & Q(**{f"{name}__{lookup}": value})
+            equal &= Q(**{name: value})
+        return condition
+
+    def encode_cursor(self, row):
+        values = [row._meta.get_field(field.lstrip("-")).value_to_string(row)
+                  for field in self.ordering]
+        data = json.dumps(values).encode()
+        return replace_query_param(self.request.build_absolute_uri(), self.cursor_query_param,
+                                   base64.urlsafe_b64encode(data).decode())
+
+    def decode_cursor(self, cursor):
+        try:
+            values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        except ValueError:
+            raise NotFound("Invalid cursor")
+        if not isinstance(values, list) or len(values) != len(self.ordering):
+            raise NotFound("Invalid cursor")
+        return values
+
+    def get_next_link(self):
+        if not self.hasNext:
+            return None
+        return self.encode_cursor(self.last)
+
+    def get_paginated_response(self, data):
+        return Response({
+            "next": self.get_next_link(),
+            "results": data,
+        })
+
+
+class NotificationPagination(KeysetPagination):
+    """
+        Notifications of a user : the unseen first, then the most recent.
+    """
+    ordering = ("seen", "-creationDate", "id")
@@ -0,0 +1,216 @@
+"""
+    Per-request profiling of the api : number of queries, duplicated queries
+    (the same SQL executed several times, usually a N+1 pattern), database
+    time, rendering time and total time. The rendering is the serialization
+    of the data by the view (the DRF serializers and the read serializers,
+    their queries excluded) and the rendering of the response to JSON.
+
+    Enabled with the setting PROFILING = True. When it's disabled, the
+    middleware removes itself from the middleware chain (no overhead).
+    The figures are sent in the response headers and aggregated per view
+    and action (see ProfilingView).
+"""
+
+import threading
+import time
+from collections import Counter
+from contextlib import ExitStack
+from contextvars import ContextVar
+from functools import wraps
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from rest_framework.serializers import BaseSerializer
+
+from .readserializers import ReadSerializer
+
+
+class ProfileStore:
+    """
+        Aggregated figures of the profiled requests, per endpoint.
+    """
+
+    METRICS = ("queries", "duplicates", "db", "render", "total")
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.endpoints = {}
+
+    def add(self, endpoint, profile):
+        with self.lock:
+            stats = self.endpoints.setdefault(endpoint, {
+                "requests": 0,
+                **{f"{metric}_sum": 0 for metric in self.METRICS},
+                **{f"{metric}_max": 0 for metric in self.METRICS},
+            })
+            stats["requests"] += 1
+            for metric in self.METRICS:
+                stats[f"{metric}_sum"] += profile[metric]
+                stats[f"{metric}_max"] = max(stats[f"{metric}_max"], profile[metric])
+
+    def report(self):
+        """
+            Return the mean and the max of every metric per endpoint,
+            the endpoints running the most queries first.
+        """
+        with self.lock:
+            endpoints = {endpoint: dict(stats) for endpoint, stats in self.endpoints.items()}
+
+        report = []
+        for endpoint, stats in endpoints.items():
+            row = {"endpoint": endpoint, "requests": stats["requests"]}
+            for metric in self.METRICS:
+                row[f"{metric}_mean"] = round(stats[f"{metric}_sum"] / stats["requests"], 3)
+                row[f"{metric}_max"] = round(stats[f"{metric}_max"], 3)
+            report.append(row)
+
+        return sorted(report, key=lambda row: row["queries_mean"], reverse=True)
+
+    def reset(self):
+        with self.lock:
+            self.endpoints = {}
+
+
+store = ProfileStore()
+
+
+class QueryRecorder:
+    """
+        Database execute wrapper counting the queries and their duration.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0
+        self.statements = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - started
+            self.count += 1
+            self.statements[sql] += 1
+
+    @property
+    def duplicates(self):
+        return sum(count - 1 for count in self.statements.values())
+
+
+class Profile:
+    """
+        The figures of the request being profiled.
+    """
+
+    def __init__(self):
+        self.recorder = QueryRecorder()
+        self.serialization = 0
+        self.serializing = False
+
+
+profile = ContextVar("profile", default=None)
+
+
+def timeserialization(function):
+    """
+        Add the duration of function, its queries excluded, to the
+        serialization time of the profiled request. The nested calls (a
+        serializer of a serializer) are counted once.
+    """
+    @wraps(function)
+    def wrapper(*args, **kwargs):
+        current = profile.get()
+        if current is None or current.serializing:
+            return function(*args, **kwargs)
+
+        current.serializing = True
+        started = time.perf_counter()
+        db = current.recorder.duration
+        try:
+            return function(*args, **kwargs)
+        finally:
+            current.serializing = False
+            current.serialization += time.perf_counter() - started - (current.recorder.duration - db)
+    return wrapper
+
+
+serializersTimed = False
+
+
+def timeserializers():
+    """
+        Time the evaluation of the data of the DRF serializers (Serializer
+        and ListSerializer call BaseSerializer.data) and the read serializers.
+        Only installed when the profiling is enabled.
+    """
+    global serializersTimed
+    if not serializersTimed:
+        BaseSerializer.data = property(timeserialization(BaseSerializer.data.fget))
+        ReadSerializer.serialize = timeserialization(ReadSerializer.serialize)
+        serializersTimed = True
+
+
+def getendpoint(request):
+    """
+        Name of the view and action handling the request (e.g. "TeamViewSet.getteamsbytournament").
+    """
+    match = request.resolver_match
+    if match is None:
+        return "unresolved"
+
+    view = match.func
+    name = getattr(getattr(view, "cls", None), "__name__", None) or match.view_name
+    actions = getattr(view, "actions", None)
+    if actions:
+        return f"{name}.{actions.get(request.method.lower(), request.method.lower())}"
+    return f"{name}.{request.method.lower()}"
+
+
+class ProfilingMiddleware:
+    def __init__(self, get_response):
+        if not getattr(settings, "PROFILING", False):
+            raise MiddlewareNotUsed()
+        self.get_response = get_response
+        timeserializers()
+
+    def __call__(self, request):
+        current = Profile()
+        token = profile.set(current)
+        request.profilingRender = 0
+        started = time.perf_counter()
+
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(current.recorder))
+                response = self.get_response(request)
+        finally:
+            profile.reset(token)
+
+        total = time.perf_counter() - started
+        figures = {
+            "queries": current.recorder.count,
+            "duplicates": current.recorder.duplicates,
+            "db": current.recorder.duration * 1000,
+            "render": (current.serialization + request.profilingRender) * 1000,
+            "total": total * 1000,
+        }
+        store.add(getendpoint(request), figures)
+
+        response["X-Queries"] = str(figures["queries"])
+        response["X-Duplicate-Queries"] = str(figures["duplicates"])
+        response["Server-Timing"] = "db;dur=%.2f, render;dur=%.2f, total;dur=%.2f" % (
+            figures["db"], figures["render"], figures["total"])
+        return response
+
+    def process_template_response(self, request, response):
+        # the DRF responses are rendered (serialized to JSON) after this hook
+        started = time.perf_counter()
+
+        def rendered(response):
+            request.profilingRender = time.perf_counter() - started
+
+        response.add_post_render_callback(rendered)
+        return response
@@ -0,0 +1,42 @@
+"""
+    Push the changes of the matches and the notifications to the clients
+    subscribed to a tournament or to a user (see events.py).
+"""
+
+import logging
+
+from django.db import transaction
+from django.forms.models import model_to_dict
+
+from .brokers import getbroker
+
+logger = logging.getLogger(__name__)
+
+
+def send(channel, message):
+    try:
+        getbroker().publish(channel, message)
+    except Exception:
+        # the push is best effort, the clients can still read the API
+        logger.exception("Unable to publish on %s", channel)
+
+
+def publish(channel, message):
+    """
+        Publish a message once the current transaction is committed.
+    """
+    transaction.on_commit(lambda: send(channel, message))
+
+
+def publishmatch(match):
+    publish(f"tournament.{match.tournament_id}", {
+        "type": "match",
+        "data": dict(model_to_dict(match), id=match.id),
+    })
+
+
+def publishnotification(notification):
+    publish(f"user.{notification.user_id}", {
+        "type": "notification",
+        "data": dict(model_to_dict(notification), id=notification.id),
+    })
@@ -0,0 +1,157 @@
+"""
+    Brokers delivering the published messages to the subscribers of a channel
+    (e.g. "tournament.3" or "user.12").
+
+    The broker is chosen with the setting PUSH_BROKER :
+      * InProcessBroker : the subscribers are in the same process as the
+                          publishers (a single process, local development) :
+                          with several workers, an event only reaches the
+                          clients connected to the worker publishing it
+      * RedisBroker : the messages go through Redis pub/sub, for several nodes
+"""
+
+import asyncio
+import json
+import threading
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils.module_loading import import_string
+
+QUEUE_SIZE = 100  # messages kept for a slow subscriber, the oldest are dropped
+
+
+class Subscription:
+    """
+        The messages of a channel received by one client.
+        The messages are queued in the event loop of the client.
+    """
+
+    def __init__(self, broker, channel):
+        self.broker = broker
+        self.channel = channel
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(maxsize=QUEUE_SIZE)
+
+    def put(self, message):
+        if self.queue.full():
+            self.queue.get_nowait()
+        self.queue.put_nowait(message)
+
+    def deliver(self, message):
+        """
+            Deliver a message from any thread.
+        """
+        try:
+            self.loop.call_soon_threadsafe(self.put, message)
+        except RuntimeError:
+            # the event loop of the client is closed
+            pass
+
+    async def get(self):
+        return await self.queue.get()
+
+    async def close(self):
+        await self.broker.unsubscribe(self)
+
+
+class Broker:
+    async def subscribe(self, channel):
+        raise NotImplementedError
+
+    async def unsubscribe(self, subscription):
+        raise NotImplementedError
+
+    def publish(self, channel, message):
+        """
+            Publish a message (a JSON serializable dict) on a channel.
+            Called from the synchronous code (views, signals).
+        """
+        raise NotImplementedError
+
+
+class InProcessBroker(Broker):
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.subscriptions = defaultdict(set)
+
+    async def subscribe(self, channel):
+        subscription = Subscription(self, channel)
+        with self.lock:
+            self.subscriptions[channel].add(subscription)
+        return subscription
+
+    async def unsubscribe(self, subscription):
+        with self.lock:
+            subscriptions = self.subscriptions.get(subscription.channel, set())
+            subscriptions.discard(subscription)
+            if not subscriptions:
+                self.subscriptions.pop(subscription.channel, None)
+
+    def publish(self, channel, message):
+        with self.lock:
+            subscriptions = list(self.subscriptions.get(channel, ()))
+        for subscription in subscriptions:
+            subscription.deliver(message)
+
+
+class RedisBroker(Broker):
+    """
+        Requires the redis package (redis >= 4.2 for redis.asyncio).
+    """
+
+    def __init__(self, url="redis://localhost:6379/0", prefix="wtm:"):
+        try:
+            import redis
+            import redis.asyncio
+        except ImportError:
+            raise ImproperlyConfigured("RedisBroker requires the redis package (pip install redis)")
+
+        self.url = url
+        self.prefix = prefix
+        self.client = redis.Redis.from_url(url)
+        self.asyncclient = None
+        self.asyncredis = redis.asyncio
+
+    async def subscribe(self, channel):
+        if self.asyncclient is None:
+            self.asyncclient = self.asyncredis.Redis.from_url(self.url)
+
+        subscription = Subscription(self, channel)
+        subscription.pubsub = self.asyncclient.pubsub()
+        await subscription.pubsub.subscribe(self.prefix + channel)
+        subscription.reader = asyncio.ensure_future(self.read(subscription))
+        return subscription
+
+    async def read(self, subscription):
+        async for message in subscription.pubsub.listen():
+            if message["type"] == "message":
+                subscription.put(json.loads(message["data"]))
+
+    async def unsubscribe(self, subscription):
+        subscription.reader.cancel()
+        await subscription.pubsub.unsubscribe()
+        await subscription.pubsub.close()
+
+    def publish(self, channel, message):
+        self.client.publish(self.prefix + channel, json.dumps(message, cls=DjangoJSONEncoder))
+
+
+broker = None
+brokerLock = threading.Lock()
+
+
+def getbroker():
+    """
+        Get the broker configured by the setting PUSH_BROKER
+        ({"BACKEND": dotted path, "OPTIONS": keyword arguments}).
+    """
+    global broker
+    with brokerLock:
+        if broker is None:
+            config = getattr(settings, "PUSH_BROKER", {})
+            backend = import_string(config.get("BACKEND", "backend.api.push.brokers.InProcessBroker"))
+            broker = backend(**config.get("OPTIONS", {}))
+    return broker
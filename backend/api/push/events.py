@@ -0,0 +1,106 @@
+"""
+    Server-Sent Events served by the ASGI application (see backend/asgi.py) :
+      * /api/events/tournaments/<id>/ : the matches of a tournament
+      * /api/events/users/<id>/?token=<token> : the notifications of a user
+
+    Each event has the type "match" or "notification" and the changed row
+    as data. A comment is sent regularly to keep the connection open.
+"""
+
+import asyncio
+import json
+import re
+from urllib.parse import parse_qs
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import close_old_connections
+
+from .brokers import getbroker
+
+HEARTBEAT = 15  # seconds
+
+ROUTES = [
+    (re.compile(r"^/api/events/tournaments/(?P<id>\d+)/?$"), "tournament"),
+    (re.compile(r"^/api/events/users/(?P<id>\d+)/?$"), "user"),
+]
+
+
+def gettokenuserid(key):
+    from ..authentication import gettokenuser
+
+    try:
+        user = gettokenuser(key)
+        return user.id if user is not None else None
+    finally:
+        close_old_connections()
+
+
+class EventsApplication:
+    """
+        ASGI application serving the events and passing every other
+        request to the Django application.
+    """
+
+    def __init__(self, application):
+        self.application = application
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and scope["method"] == "GET":
+            for pattern, name in ROUTES:
+                match = pattern.match(scope["path"])
+                if match is not None:
+                    return await self.events(scope, receive, send, name, int(match.group("id")))
+
+        return await self.application(scope, receive, send)
+
+    def headers(self, scope, contentType):
+        headers = [
+            (b"content-type", contentType),
+            (b"cache-control", b"no-cache"),
+        ]
+        origin = dict(scope["headers"]).get(b"origin", b"").decode()
+        if origin in getattr(settings, "CORS_ALLOWED_ORIGINS", []):
+            headers.append((b"access-control-allow-origin", origin.encode()))
+        return headers
+
+    async def refuse(self, scope, send, status, message):
+        await send({"type": "http.response.start", "status": status,
+                    "headers": self.headers(scope, b"application/json")})
+        await send({"type": "http.response.body", "body": json.dumps({"message": message}).encode()})
+
+    async def waitdisconnect(self, receive):
+        while (await receive())["type"] != "http.disconnect":
+            pass
+
+    async def events(self, scope, receive, send, name, id):
+        if name == "user":
+            token = parse_qs(scope["query_string"].decode()).get("token", [""])[0]
+            if await sync_to_async(gettokenuserid)(token) != id:
+                return await self.refuse(scope, send, 401, "invalid token")
+
+        subscription = await getbroker().subscribe(f"{name}.{id}")
+        disconnect = asyncio.ensure_future(self.waitdisconnect(receive))
+        try:
+            await send({"type": "http.response.start", "status": 200,
+                        "headers": self.headers(scope, b"text/event-stream")})
+            await send({"type": "http.response.body", "body": b": connected\n\n", "more_body": True})
+
+            while True:
+                message = asyncio.ensure_future(subscription.get())
+                done, _ = await asyncio.wait({message, disconnect}, timeout=HEARTBEAT,
+                                             return_when=asyncio.FIRST_COMPLETED)
+                if message in done:
+                    data = json.dumps(message.result()["data"], cls=DjangoJSONEncoder)
+                    body = f"event: {message.result()['type']}\ndata: {data}\n\n"
+                else:
+                    message.cancel()
+                    if disconnect in done:
+                        break
+                    body = ": heartbeat\n\n"
+
+                await send({"type": "http.response.body", "body": body.encode(), "more_body": True})
+        finally:
+            disconnect.cancel()
+            await subscription.close()
@@ -0,0 +1,224 @@
+"""
+    Read-only serializers for the list endpoints.
+
+    A ReadSerializer gives the same output as its ModelSerializer but reads
+    the rows with values_list() (no model instances) and converts each
+    column with a function prepared once per request : the urls are built
+    from a template instead of being reversed for every row.
+    The output can be restricted to some fields (sparse fieldsets).
+"""
+
+from datetime import date
+from operator import itemgetter
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from rest_framework import ISO_8601, serializers, status
+from rest_framework.response import Response
+from rest_framework.reverse import reverse
+from rest_framework.settings import api_settings
+
+from .images import THUMBNAIL_SIZES, imageurl
+from .models.imagemodel import Image
+from .serializers import (MatchSerializer, NotificationSerializer, StandingSerializer, TeamSerializer,
+                          TeamStatsSerializer, TournamentSerializer)
+
+PK_PLACEHOLDER = "__pk__"
+
+
+class ReadSerializer:
+    serializer_class = None
+    # fields computed from columns (replacing a field of the ModelSerializer or
+    # added after them) : name -> (columns, function(request, *values))
+    readers = {}
+
+    def __init__(self, request, fields=None):
+        """
+            fields : the names of the fields to output (all by default),
+            they're always in the order of the ModelSerializer.
+            Raise ValueError if a field doesn't exist.
+        """
+        self.request = request
+        serializer = self.serializer_class(context={"request": request})
+        names = list(serializer.fields) + [name for name in self.readers if name not in serializer.fields]
+        if fields is not None:
+            unknown = [name for name in fields if name not in names]
+            if unknown:
+                raise ValueError(f"unknown fields : {', '.join(unknown)}")
+            names = [name for name in names if name in fields]
+
+        self.columns = []
+        self.getters = []
+        for name in names:
+            if name in self.readers:
+                columns, function = self.readers[name]
+                self.getters.append((name, self.getter(columns, lambda *values, function=function:
+                                                       function(request, *values))))
+            else:
+                columns, function = self.reader(serializer.fields[name])
+                self.getters.append((name, self.getter(columns, function)))
+
+    def getter(self, columns, function):
+        """
+            Return the function reading the field from a values_list() row.
+        """
+        indexes = []
+        for column in columns:
+            if column not in self.columns:
+                self.columns.append(column)
+            indexes.append(self.columns.index(column))
+
+        if len(indexes) > 1:
+            get = itemgetter(*indexes)
+            return lambda row: function(*get(row))
+
+        index = indexes[0]
+        if function is None:
+            return itemgetter(index)
+
+        def read(row):
+            value = row[index]
+            return None if value is None else function(value)
+        return read
+
+    def reader(self, field):
+        """
+            Return the columns and the conversion of a ModelSerializer field.
+        """
+        model = self.serializer_class.Meta.model
+
+        if isinstance(field, serializers.HyperlinkedIdentityField):
+            prefix, suffix = reverse(field.view_name, args=[PK_PLACEHOLDER],
+                                     request=self.request).split(PK_PLACEHOLDER)
+            return ("pk",), lambda pk: f"{prefix}{pk}{suffix}"
+
+        if isinstance(field, (serializers.PrimaryKeyRelatedField, serializers.SlugRelatedField)):
+            # the foreign key column holds the id (or the to_field value)
+            modelField = model._meta.get_field(field.source)
+            slug = getattr(field, "slug_field", None)
+            if slug is not None and slug != modelField.target_field.name:
+                raise ImproperlyConfigured(f"{field.field_name} : the slug must be the to_field")
+            return (modelField.attname,), None
+
+        if isinstance(field, serializers.DateTimeField):
+            return (field.source,), self.datetime(field)
+
+        if isinstance(field, serializers.DateField):
+            return (field.source,), field.to_representation
+
+        if isinstance(field, (serializers.IntegerField, serializers.FloatField, serializers.CharField,
+                              serializers.ChoiceField, serializers.BooleanField)):
+            return (field.source,), None
+
+        raise ImproperlyConfigured(f"{field.field_name} : {type(field).__name__} isn't supported, add a reader")
+
+    def datetime(self, field):
+        """
+            DateTimeField.to_representation without looking up the timezone
+            for every value.
+        """
+        format = getattr(field, "format", api_settings.DATETIME_FORMAT)
+        if format is None or format.lower() != ISO_8601 or not settings.USE_TZ:
+            return field.to_representation
+
+        fieldTimezone = getattr(field, "timezone", field.default_timezone())
+
+        def convert(value):
+            value = value.astimezone(fieldTimezone).isoformat()
+            return value[:-6] + "Z" if value.endswith("+00:00") else value
+        return convert
+
+    def rows(self, queryset):
+        return queryset.values_list(*self.columns)
+
+    def serializerows(self, rows):
+        getters = self.getters
+        return [{name: get(row) for name, get in getters} for row in rows]
+
+    def serialize(self, queryset):
+        return self.serializerows(self.rows(queryset))
+
+
+def absoluteimageurl(request, hash, format, size=None):
+    if hash is None:
+        return None
+    return request.build_absolute_uri(imageurl(Image(hash=hash, format=format), size))
+
+
+class MatchReadSerializer(ReadSerializer):
+    serializer_class = MatchSerializer
+
+
+class TeamReadSerializer(ReadSerializer):
+    serializer_class = TeamSerializer
+    readers = {
+        "image": (("image__hash", "image__format"), absoluteimageurl),
+        "thumbnails": (("image__hash", "image__format"), lambda request, hash, format: None if hash is None else {
+            str(size): absoluteimageurl(request, hash, format, size) for size in THUMBNAIL_SIZES}),
+    }
+
+
+class TournamentReadSerializer(ReadSerializer):
+    serializer_class = TournamentSerializer
+
+
+class TournamentForHomeReadSerializer(TournamentReadSerializer):
+    """
+        The tournaments annotated by TournamentViewSet.tournamentsforhome.
+    """
+    readers = {
+        "isLeader": (("isLeader",), lambda request, isLeader: isLeader),
+        "isParticipating": (("nbRegisteredTeams", "nbTeam", "isMember"),
+                            lambda request, nbRegisteredTeams, nbTeam, isMember:
+                            nbRegisteredTeams >= nbTeam or isMember),
+        "isDeadLineOver": (("deadLineDate",), lambda request, deadLineDate: deadLineDate < date.today()),
+    }
+
+
+class NotificationReadSerializer(ReadSerializer):
+    serializer_class = NotificationSerializer
+
+
+class StandingReadSerializer(ReadSerializer):
+    serializer_class = StandingSerializer
+    readers = {
+        "teamName": (("team__name",), lambda request, name: name),
+    }
+
+
+class TeamStatsReadSerializer(ReadSerializer):
+    serializer_class = TeamStatsSerializer
+    readers = {
+        "teamName": (("team__name",), lambda request, name: name),
+    }
+
+
+class ReadSerializerMixin:
+    """
+        List actions of a viewset served by its read_serializer_class.
+        The fields can be selected with the GET parameter "fields"
+        (e.g. ?fields=id,name).
+    """
+    read_serializer_class = None
+
+    def readresponse(self, queryset, serializer_class=None):
+        fields = self.request.query_params.get("fields", None)
+        if fields is not None:
+            fields = [name.strip() for name in fields.split(",") if name.strip()]
+
+        try:
+            serializer = (serializer_class or self.read_serializer_class)(self.request, fields)
+        except ValueError as error:
+            return Response({"message": str(error)}, status=status.HTTP_400_BAD_REQUEST)
+
+        rows = serializer.rows(queryset)
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(serializer.serializerows(page))
+        return Response(serializer.serializerows(rows))
+
+    def list(self, request, *args, **kwargs):
+        """
+            Get every object (see ReadSerializerMixin for the fields).
+        """
+        return self.readresponse(self.filter_queryset(self.get_queryset()))
@@ -4,7 +4,10 @@ from .models.teammodel import Team
 from .models.matchmodel import Match
 from .models.tournamentmodel import Tournament
 from .models.notificationmodel import Notification
+from .models.standingmodel import Standing
+from .models.teamstatsmodel import TeamStats
 from rest_framework.authtoken.models import Token
+from .images import THUMBNAIL_SIZES, decodedataurl, findimage, imageurl, storeimage
 
 """
     This file contains serializers for all the api app models.
@@ -21,22 +24,86 @@ class UserSerializer(serializers.ModelSerializer):
         Token.objects.create(user=user)
         return user
 
+class ImageField(serializers.Field):
+    """
+        An image sent as a base64 data url or an uploaded file, and returned
+        as the url of the stored image. The url returned (or the hash of
+        the image) is accepted back and keeps the image unchanged.
+    """
+
+    def __init__(self, **kwargs):
+        kwargs.setdefault("required", False)
+        kwargs.setdefault("allow_null", True)
+        super().__init__(**kwargs)
+
+    def to_internal_value(self, data):
+        if data in ("", None):
+            return None
+        try:
+            if hasattr(data, "read"):
+                return storeimage(data.read())
+            if isinstance(data, str):
+                image = findimage(data)
+                if image is not None:
+                    return image
+                return storeimage(decodedataurl(data))
+        except ValueError as error:
+            raise serializers.ValidationError(str(error))
+        raise serializers.ValidationError("the image must be a base64 data url or a file")
+
+    def to_representation(self, image):
+        return absoluteurl(self.context, imageurl(image))
+
+
+class ThumbnailsField(serializers.ReadOnlyField):
+    """
+        The urls of the thumbnails of an image, by size (in pixels).
+    """
+
+    def to_representation(self, image):
+        return {str(size): absoluteurl(self.context, imageurl(image, size)) for size in THUMBNAIL_SIZES}
+
+
+def absoluteurl(context, url):
+    request = context.get("request")
+    return request.build_absolute_uri(url) if request is not None else url
+
+
 class TeamSerializer(serializers.ModelSerializer):
+    image = ImageField()
+    thumbnails = ThumbnailsField(source="image")
+
     class Meta:
         model = Team
-        fields = ['url', 'id', 'name', 'image', 'leader']
+        fields = ['url', 'id', 'name', 'image', 'thumbnails', 'leader']
 
 class MatchSerializer(serializers.ModelSerializer):
     class Meta:
         model = Match
         fields = ['url', 'id', 'team1', 'team2', 'tournament',
-                  'score1', 'score2', 'idInTournament', 'roundNb', 'idParent']
+                  'score1', 'score2', 'idInTournament', 'roundNb', 'idParent', 'version',
+                  'startTime', 'endTime', 'slot', 'referee',
+                  'parentSide', 'idLoserParent', 'loserSide', 'stage']
+        read_only_fields = ['version', 'startTime', 'endTime', 'slot', 'referee',
+                            'parentSide', 'idLoserParent', 'loserSide', 'stage']
 
 class TournamentSerializer(serializers.ModelSerializer):
     class Meta:
         model = Tournament
         fields = ['url', 'id', 'organizer', 'name', 'gameName',
-                  'matchDuration', 'breakDuration', 'deadLineDate', 'nbTeam', 'streamURL']
+                  'matchDuration', 'breakDuration', 'deadLineDate', 'nbTeam', 'streamURL', 'nbSlots', 'format']
+
+class StandingSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Standing
+        fields = ['id', 'tournament', 'team', 'played', 'wins', 'draws', 'losses',
+                  'points', 'scoreFor', 'scoreAgainst']
+
+class TeamStatsSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = TeamStats
+        fields = ['team', 'played', 'wins', 'draws', 'losses', 'scoreFor', 'scoreAgainst',
+                  'tournaments', 'rating']
 
 class NotificationSerializer(serializers.ModelSerializer):
     class Meta:
@@ -0,0 +1,11 @@
+from .bracketservice import buildbracket, getbracket
+from .notificationservice import notify, notifyteams
+from .matchservice import updatescores
+from .seedservice import seed
+from .registrationservice import RegistrationError, registerteams
+from .scheduleservice import scheduletournament
+from .formatservice import FormatError, creatematches, nextswissround, ranking
+from .statsservice import rebuildteamstats
+from .exportservice import KINDS, ImportDataError, exportcsv, exportndjson, importrows, readcsv, readndjson
+from .retentionservice import RETENTION_DAYS, FileArchive, TableArchive, archivenotifications, expired
+from .searchservice import SearchError, indexobjects, rebuildsearchindex, search
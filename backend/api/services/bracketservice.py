@@ -0,0 +1,139 @@
+"""
+    Build the single elimination bracket of a tournament (and assemble the
+    matches of every format for the client).
+
+    The matches are laid out as a binary heap : the final has the
+    idInTournament 1 and the children of the match n are the matches 2n
+    (its team1) and 2n + 1 (its team2). The round number is the depth of
+    the match in the tree, so the final is the round 1 and the leaf
+    matches are on the last round.
+
+    The assembled bracket (rounds, games and team names) is cached per
+    tournament under the version "bracket", bumped by the model signals.
+"""
+
+from django.core.cache import cache
+
+from ..cache import versionedkey
+from ..dbrouter import primaryreading
+from ..models.matchmodel import Match
+from ..models.teammodel import Team
+from ..models.tournamentmodel import Tournament
+from ..readserializers import MatchReadSerializer
+
+BRACKET_TIMEOUT = 60 * 60  # seconds
+
+
+def seedpositions(nbSlots):
+    """
+        Return the seeds (1 based) in the order they're placed on the
+        leaves of a bracket of nbSlots slots (a power of two).
+        The seed s always meets the seed nbSlots + 1 - s on the first round,
+        so the byes (the seeds greater than the number of teams) are
+        given to the best seeds and never meet each other.
+    """
+    positions = [1]
+    while len(positions) < nbSlots:
+        size = len(positions) * 2
+        positions = [seed for position in positions
+                     for seed in (position, size + 1 - position)]
+    return positions
+
+
+def buildbracket(tournament, teams):
+    """
+        Create (without saving them) every match of the tournament bracket.
+        The teams are seeded in the given order. A team without opponent on
+        the first round is directly placed in the next match.
+    """
+    nbTeams = len(teams)
+    nbRounds = max(1, (nbTeams - 1).bit_length())
+    nbSlots = 2 ** nbRounds
+    nbLeaves = nbSlots // 2
+
+    matches = [None] * nbSlots  # matches[idInTournament], index 0 unused
+    for idInTournament in range(1, nbSlots):
+        matches[idInTournament] = Match(
+            tournament=tournament,
+            idInTournament=idInTournament,
+            roundNb=idInTournament.bit_length(),
+            idParent=idInTournament // 2 if idInTournament > 1 else None)
+
+    positions = seedpositions(nbSlots)
+    for leaf in range(nbLeaves):
+        match = matches[nbLeaves + leaf]
+        seed1, seed2 = positions[2 * leaf], positions[2 * leaf + 1]
+        match.team1 = teams[seed1 - 1] if seed1 <= nbTeams else None
+        match.team2 = teams[seed2 - 1] if seed2 <= nbTeams else None
+
+        # bye : the team is automatically qualified for the next round
+        if match.team2 is None and match.idParent is not None:
+            parent = matches[match.idParent]
+            if match.idInTournament % 2 == 0:
+                parent.team1 = match.team1
+            else:
+                parent.team2 = match.team1
+
+    return matches[1:]
+
+
+def buildplayer(teamId, score, otherScore, teamNames):
+    return {
+        "id": teamId if teamId is not None else 0,
+        "name": teamNames.get(teamId, "tbd"),  # tbd : to be defined
+        "winner": score is None or otherScore is None or score >= otherScore,
+    }
+
+
+def buildrounds(tournamentId, request):
+    """
+        Assemble the bracket of a tournament as displayed by the client :
+        the rounds from the first one to the final (then the grand final of
+        a double elimination), each with its games (the match and its two
+        players with the team names inlined), and the rounds of the losers
+        bracket of a double elimination.
+        Return None if the tournament doesn't exist.
+    """
+    tournament = Tournament.objects.filter(pk=tournamentId).first()
+    if tournament is None:
+        return None
+
+    matches = Match.objects.filter(tournament=tournament).order_by("idInTournament")
+    teamNames = dict(Team.objects.filter(tournament=tournament).values_list("id", "name"))
+
+    rounds = {}
+    for match in MatchReadSerializer(request).serialize(matches):
+        rounds.setdefault((match["stage"], match["roundNb"]), []).append({
+            "match": match,
+            "player1": buildplayer(match["team1"], match["score1"], match["score2"], teamNames),
+            "player2": buildplayer(match["team2"], match["score2"], match["score1"], teamNames),
+        })
+
+    # the rounds of a bracket are numbered from the final, the others from the first one
+    isBracket = tournament.format in (Tournament.SINGLE_ELIMINATION, Tournament.DOUBLE_ELIMINATION)
+
+    def stagerounds(stage, reverse=False):
+        return [{"games": rounds[key]} for key in sorted(rounds, reverse=reverse) if key[0] == stage]
+
+    return {
+        "format": tournament.format,
+        "referees": list(tournament.referees.values("id", "username")),
+        "rounds": stagerounds("main", isBracket) + stagerounds("final"),
+        "losers": stagerounds("losers"),
+    }
+
+
+def getbracket(tournamentId, request):
+    """
+        Get the bracket of a tournament from the cache, build it if it's
+        not cached for the current version of the tournament bracket
+        (from the primary database, see cache.py).
+    """
+    key = versionedkey("bracket", tournamentId)
+    bracket = cache.get(key)
+    if bracket is None:
+        with primaryreading():
+            bracket = buildrounds(tournamentId, request)
+        if bracket is not None:
+            cache.set(key, bracket, BRACKET_TIMEOUT)
+    return bracket
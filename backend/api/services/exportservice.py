@@ -0,0 +1,293 @@
+"""
+    Export the data as NDJSON (one JSON object per line, every kind in a
+    single stream) or CSV (one kind per file), and import it back.
+
+    The export reads the rows with values_list().iterator(), so the memory
+    doesn't depend on the number of rows. The kinds are exported in the
+    order they're imported : a row only references the rows of the kinds
+    before it.
+
+    The import gives new ids to the rows (allocated after the current
+    greatest id so they're known without reading them back) and remaps the
+    references. The users and the teams are matched by their username and
+    name : the existing ones are kept. The rows are written with bulk_create,
+    which doesn't send the model signals, the cached responses are
+    invalidated and the rows are indexed for the search once at the end.
+"""
+
+import csv
+import json
+from datetime import date, datetime
+
+from django.contrib.auth.models import User
+from django.core.management.color import no_style
+from django.db import connection, transaction
+from django.db.models import Max
+
+from ..cache import bumpversion
+from ..models.imagemodel import Image
+from ..models.matchmodel import Match
+from ..models.notificationmodel import Notification
+from ..models.standingmodel import Standing
+from ..models.teammodel import Team
+from ..models.tournamentmodel import Tournament
+from .searchservice import indexobjects
+
+EXPORT_CHUNK_SIZE = 2000
+IMPORT_BATCH_SIZE = 1000
+
+# kind -> model and exported fields, in the import order
+KINDS = {
+    "users": (User, ["id", "username", "email", "first_name", "last_name", "is_active", "date_joined"]),
+    "teams": (Team, ["id", "name", "leader", "image"]),
+    "members": (Team.members.through, ["team", "user"]),
+    "tournaments": (Tournament, ["id", "organizer", "name", "gameName", "matchDuration", "breakDuration",
+                                 "deadLineDate", "nbTeam", "streamURL", "nbSlots", "format"]),
+    "tournamentteams": (Tournament.teams.through, ["tournament", "team"]),
+    "referees": (Tournament.referees.through, ["tournament", "user"]),
+    "matches": (Match, ["id", "tournament", "team1", "team2", "score1", "score2", "idInTournament", "roundNb",
+                        "idParent", "parentSide", "idLoserParent", "loserSide", "stage", "version",
+                        "startTime", "endTime", "slot", "referee"]),
+    "standings": (Standing, ["tournament", "team", "played", "wins", "draws", "losses", "points",
+                             "scoreFor", "scoreAgainst"]),
+    "notifications": (Notification, ["id", "user", "team", "seen", "notificationType", "message",
+                                     "creationDate"]),
+}
+
+# the fields referencing the ids of another kind (the usernames and the image hashes are kept)
+REFERENCES = {
+    "user": "users",
+    "team": "teams",
+    "team1": "teams",
+    "team2": "teams",
+    "tournament": "tournaments",
+    "referee": "users",
+}
+
+# the kinds restricted to the exported tournaments
+TOURNAMENT_KINDS = {"tournaments": "pk__in", "tournamentteams": "tournament__in", "referees": "tournament__in",
+                    "matches": "tournament__in", "standings": "tournament__in"}
+
+
+class ImportDataError(Exception):
+    pass
+
+
+def columns(kind):
+    model, fields = KINDS[kind]
+    return [model._meta.get_field(name).attname for name in fields]
+
+
+def exportrows(kind, tournaments=None):
+    """
+        The rows of a kind, as lists of JSON values.
+        tournaments : a queryset restricting the tournaments and their rows.
+    """
+    model, fields = KINDS[kind]
+    queryset = model.objects.order_by("pk")
+    if tournaments is not None and kind in TOURNAMENT_KINDS:
+        queryset = queryset.filter(**{TOURNAMENT_KINDS[kind]: tournaments.values("pk")})
+
+    for row in queryset.values_list(*columns(kind)).iterator(chunk_size=EXPORT_CHUNK_SIZE):
+        yield [value.isoformat() if isinstance(value, (date, datetime)) else value for value in row]
+
+
+def exportndjson(kinds, tournaments=None):
+    """
+        Yield the lines of the NDJSON export : {"kind": ..., field: value}.
+    """
+    for kind in kinds:
+        fields = KINDS[kind][1]
+        for row in exportrows(kind, tournaments):
+            yield json.dumps(dict(zip(fields, row), kind=kind), separators=(",", ":")) + "\n"
+
+
+class Echo:
+    """
+        A file which returns what is written, for csv.writer.
+    """
+
+    def write(self, value):
+        return value
+
+
+def exportcsv(kind, tournaments=None):
+    """
+        Yield the lines of the CSV export of a kind, with a header.
+    """
+    writer = csv.writer(Echo())
+    yield writer.writerow(KINDS[kind][1])
+    for row in exportrows(kind, tournaments):
+        yield writer.writerow(["" if value is None else value for value in row])
+
+
+class Importer:
+    """
+        Import the rows of every kind in the order of KINDS : the rows are
+        buffered per kind and written by batches, the rows of a kind being
+        written before the rows of the next kinds are.
+    """
+
+    def __init__(self, batchSize=IMPORT_BATCH_SIZE):
+        self.batchSize = batchSize
+        self.ids = {kind: {} for kind in KINDS}  # kind -> old id -> new id
+        self.nextIds = {}
+        self.pending = {kind: [] for kind in KINDS}
+        self.counts = {kind: 0 for kind in KINDS}
+        self.kindIndex = 0
+        self.usernames = None
+        self.teamNames = None
+        self.images = None
+
+    def add(self, kind, row):
+        """
+            Add a row ({field: value}, the values as JSON or CSV strings).
+        """
+        if kind not in KINDS:
+            raise ImportDataError(f"unknown kind : {kind}")
+        index = list(KINDS).index(kind)
+        if index < self.kindIndex:
+            raise ImportDataError(f"the {kind} must be imported before the {list(KINDS)[self.kindIndex]}")
+        if index > self.kindIndex:
+            # the rows referenced by this kind are written first
+            for previous in list(KINDS)[:index]:
+                self.flush(previous)
+            self.kindIndex = index
+
+        self.pending[kind].append(self.build(kind, row))
+        if len(self.pending[kind]) >= self.batchSize:
+            self.flush(kind)
+
+    def convert(self, model, name, value):
+        field = model._meta.get_field(name)
+        if value == "" and field.get_internal_type() not in ("CharField", "TextField"):
+            value = None
+        if value is None:
+            return None
+        if field.is_relation:
+            field = field.target_field
+        return field.to_python(value)
+
+    def newid(self, kind):
+        model = KINDS[kind][0]
+        if kind not in self.nextIds:
+            self.nextIds[kind] = (model.objects.aggregate(id=Max("pk"))["id"] or 0) + 1
+        self.nextIds[kind] += 1
+        return self.nextIds[kind] - 1
+
+    def build(self, kind, row):
+        model, fields = KINDS[kind]
+        values = {}
+        for name in fields:
+            value = self.convert(model, name, row.get(name))
+            if name in REFERENCES and value is not None:
+                try:
+                    value = self.ids[REFERENCES[name]][value]
+                except KeyError:
+                    raise ImportDataError(f"{kind} : unknown {name} {value}")
+            values[model._meta.get_field(name).attname] = value
+
+        oldId = values.pop("id", None)
+        if kind == "users":
+            if self.usernames is None:
+                self.usernames = dict(User.objects.values_list("username", "id"))
+            if values["username"] in self.usernames:
+                self.ids[kind][oldId] = self.usernames[values["username"]]
+                return None
+        elif kind == "teams":
+            if self.teamNames is None:
+                self.teamNames = dict(Team.objects.values_list("name", "id"))
+                self.images = set(Image.objects.values_list("hash", flat=True))
+            if values["name"] in self.teamNames:
+                self.ids[kind][oldId] = self.teamNames[values["name"]]
+                return None
+            if values["image_id"] not in self.images:
+                # the image files aren't exported
+                values["image_id"] = None
+
+        instance = model(**values)
+        if oldId is not None:
+            instance.pk = self.newid(kind)
+            self.ids[kind][oldId] = instance.pk
+        if kind == "users":
+            instance.set_unusable_password()
+            self.usernames[instance.username] = instance.pk
+        elif kind == "teams":
+            self.teamNames[instance.name] = instance.pk
+        return instance
+
+    def newlinks(self, model, fields, instances):
+        """
+            The instances of a kind without id (a unique pair of references)
+            whose pair isn't in the database nor earlier in the batch.
+        """
+        attnames = [model._meta.get_field(name).attname for name in fields]
+        firstIds = {getattr(instance, attnames[0]) for instance in instances}
+        existing = set(model.objects.filter(**{f"{attnames[0]}__in": firstIds}).values_list(*attnames))
+        links = []
+        for instance in instances:
+            key = tuple(getattr(instance, attname) for attname in attnames)
+            if key not in existing:
+                existing.add(key)
+                links.append(instance)
+        return links
+
+    def flush(self, kind):
+        model, fields = KINDS[kind]
+        instances = [instance for instance in self.pending[kind] if instance is not None]
+        self.pending[kind] = []
+        if instances and "id" not in fields:
+            # the through tables may already link the existing users and teams, these rows
+            # aren't written nor counted
+            instances = self.newlinks(model, fields[:2], instances)
+        if instances:
+            model.objects.bulk_create(instances, batch_size=self.batchSize, ignore_conflicts="id" not in fields)
+            self.counts[kind] += len(instances)
+
+    def finish(self):
+        for kind in KINDS:
+            self.flush(kind)
+
+        # the sequences of the databases which have some continue after the imported ids
+        with connection.cursor() as cursor:
+            for sql in connection.ops.sequence_reset_sql(no_style(), [model for model, fields in KINDS.values()]):
+                cursor.execute(sql)
+
+        # bulk_create doesn't send the post_save signals
+        for kind in ("users", "teams", "tournaments"):
+            indexobjects(kind, self.ids[kind].values())
+        bumpversion("users", "all")
+        bumpversion("teams", "all")
+        bumpversion("tournaments", "all")
+        for tournamentId in self.ids["tournaments"].values():
+            bumpversion("bracket", tournamentId)
+        return self.counts
+
+
+def importrows(rows, batchSize=IMPORT_BATCH_SIZE):
+    """
+        Import the (kind, {field: value}) rows in a single transaction.
+        Return the number of rows written per kind.
+        Raise ImportDataError.
+    """
+    with transaction.atomic():
+        importer = Importer(batchSize)
+        for kind, row in rows:
+            importer.add(kind, row)
+        return importer.finish()
+
+
+def readndjson(file):
+    for number, line in enumerate(file, start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError:
+            raise ImportDataError(f"line {number} : invalid JSON")
+        yield row.pop("kind", None), row
+
+
+def readcsv(file, kind):
+    for row in csv.DictReader(file):
+        yield kind, row
@@ -0,0 +1,394 @@
+"""
+    The tournament formats : the matches of every format and the standings
+    of the round robin and swiss tournaments.
+
+    Single elimination : the bracket of bracketservice (a binary heap).
+    Double elimination : the same bracket (stage "main", the winners
+    bracket) whose losers play the losers bracket (stage "losers"), the
+    winners of both brackets meet in the grand final (stage "final"). If
+    the winner of the losers bracket wins it, the final is replayed (the
+    reset, round 1 of the stage "final") so every team is out after two
+    losses, otherwise the reset has no teams and isn't played.
+    The loser of a match goes to the match idLoserParent (team loserSide),
+    the winner to the match idParent (team parentSide).
+    Round robin : every team meets every other team once, all the rounds
+    are generated at once (circle method).
+    Swiss : ceil(log2(teams)) rounds, each round pairs the teams with the
+    same number of points without rematches, once the previous round is over.
+
+    The standings are a table updated with the delta of every result, the
+    pairing only reads the standings and the pairs already played.
+"""
+
+import math
+
+from django.db import transaction
+from django.db.models import F, Max
+
+from ..cache import bumpversion
+from ..models.matchmodel import Match
+from ..models.standingmodel import Standing
+from ..models.tournamentmodel import Tournament
+from .bracketservice import buildbracket
+
+WIN_POINTS = 3
+DRAW_POINTS = 1
+
+ROUND_FORMATS = (Tournament.ROUND_ROBIN, Tournament.SWISS)
+
+MAIN = "main"
+LOSERS = "losers"
+FINAL = "final"
+
+MAX_BACKTRACKS = 100000  # swiss pairing : give up avoiding the rematches after
+
+
+class FormatError(Exception):
+    pass
+
+
+def playorder(match):
+    """
+        Sort key of the matches in the order they can be played : the
+        main stage from its deepest round, the losers bracket from its
+        first round, then the grand final (round robin and swiss rounds are
+        independent).
+    """
+    if match.stage == LOSERS:
+        return (1, match.roundNb)
+    if match.stage == FINAL:
+        return (2, match.roundNb)
+    return (0, -match.roundNb)
+
+
+def isgrandfinal(match):
+    """
+        True for the first grand final of a double elimination, whose
+        teams play the reset only if the winner of the losers bracket
+        (team2) wins it.
+    """
+    return match.stage == FINAL and match.idParent is not None
+
+
+def roundrobinpairings(teams):
+    """
+        Return the rounds of a round robin (circle method) : the first team
+        is fixed and the others rotate. With an odd number of teams, the
+        team paired with None has no match on this round.
+    """
+    teams = list(teams)
+    if len(teams) % 2:
+        teams.append(None)
+    nbTeams = len(teams)
+    half = nbTeams // 2
+
+    rounds = []
+    for roundNb in range(nbTeams - 1):
+        pairs = []
+        for index in range(half):
+            team1, team2 = teams[index], teams[nbTeams - 1 - index]
+            # alternate the sides of the fixed team
+            if index == 0 and roundNb % 2:
+                team1, team2 = team2, team1
+            if team1 is not None and team2 is not None:
+                pairs.append((team1, team2))
+        rounds.append(pairs)
+        teams = [teams[0], teams[-1]] + teams[1:-1]
+    return rounds
+
+
+def buildroundrobin(tournament, teams):
+    matches = []
+    for roundNb, pairs in enumerate(roundrobinpairings(teams), start=1):
+        for team1, team2 in pairs:
+            matches.append(Match(tournament=tournament, idInTournament=len(matches) + 1,
+                                 roundNb=roundNb, team1=team1, team2=team2))
+    return matches
+
+
+def builddoubleelimination(tournament, teams):
+    """
+        Create (without saving them) the winners bracket, the losers bracket
+        and the grand final with its reset. The losers of the first round of the winners
+        bracket play each other, then every round of the losers bracket
+        alternates between its winners against the losers of the next round
+        of the winners bracket and its winners against each other.
+        The matches with a single team (because of the byes) are not
+        created, this team goes directly to the next match.
+    """
+    winners = {match.idInTournament: match for match in buildbracket(tournament, teams)}
+    nbSlots = len(winners) + 1
+    nbRounds = (nbSlots - 1).bit_length()
+
+    # a source is ("loser", idInTournament) or ("winner", losers match index)
+    losers = []  # [roundNb, [source1, source2]]
+
+    def play(roundNb, pairs):
+        result = []
+        for source1, source2 in pairs:
+            losers.append([roundNb, [source1, source2]])
+            result.append(("winner", len(losers) - 1))
+        return result
+
+    current = [("loser", idInTournament) for idInTournament in range(nbSlots // 2, nbSlots)]
+    roundNb = 0
+    if nbRounds > 1:
+        roundNb += 1
+        current = play(roundNb, zip(current[0::2], current[1::2]))
+    for depth in range(nbRounds - 1, 0, -1):
+        # the losers of the winners bracket come in reverse order to delay the rematches
+        dropped = [("loser", idInTournament) for idInTournament in range(2 ** (depth - 1), 2 ** depth)]
+        if depth % 2:
+            dropped.reverse()
+        roundNb += 1
+        current = play(roundNb, zip(current, dropped))
+        if depth > 1:
+            roundNb += 1
+            current = play(roundNb, zip(current[0::2], current[1::2]))
+
+    # the byes of the first round have no loser, remove the matches missing a team
+    def resolve(source):
+        if source is None:
+            return None
+        kind, key = source
+        if kind == "loser":
+            match = winners[key]
+            isBye = match.roundNb == nbRounds and (match.team1 is None or match.team2 is None)
+            return None if isBye else source
+        return resolved[key]
+
+    resolved = {}
+    kept = []
+    for index, (roundNb, sources) in enumerate(losers):
+        sources = [resolve(source) for source in sources]
+        alive = [source for source in sources if source is not None]
+        if len(alive) == 2:
+            match = Match(tournament=tournament, idInTournament=nbSlots + 1 + len(kept),
+                          roundNb=roundNb, stage=LOSERS)
+            kept.append((match, sources))
+            resolved[index] = ("winner", match)
+        else:
+            resolved[index] = alive[0] if alive else None
+
+    final = Match(tournament=tournament, idInTournament=nbSlots, roundNb=0, stage=FINAL)
+    winners[1].idParent = final.idInTournament
+    winners[1].parentSide = 1
+    # both teams of the final play the reset, on the same sides (see isgrandfinal)
+    reset = Match(tournament=tournament, idInTournament=nbSlots + 1 + len(kept), roundNb=1, stage=FINAL)
+    final.idParent, final.parentSide = reset.idInTournament, 2
+    final.idLoserParent, final.loserSide = reset.idInTournament, 1
+    kept.append((final, [None, resolve(current[0])]))
+    kept.append((reset, [None, None]))
+
+    for match, sources in kept:
+        for side, source in enumerate(sources, start=1):
+            if source is None:
+                continue
+            kind, origin = source
+            if kind == "loser":
+                winners[origin].idLoserParent = match.idInTournament
+                winners[origin].loserSide = side
+            else:
+                origin.idParent = match.idInTournament
+                origin.parentSide = side
+
+    return [winners[idInTournament] for idInTournament in sorted(winners)] + [match for match, sources in kept]
+
+
+def swissrounds(nbTeams):
+    return max(1, math.ceil(math.log2(max(nbTeams, 2))))
+
+
+def pairswiss(ranking, played):
+    """
+        Pair the teams of the ranking (best first) : every team meets the
+        best ranked team it hasn't played yet, backtracking when the last
+        teams can only be paired with rematches. played is a set of
+        (teamId, teamId) with the smallest id first.
+        Return the pairs, with rematches if they can't be avoided.
+    """
+    nbTeams = len(ranking)
+    partner = [None] * nbTeams
+    choices = []  # (index, partner index) in the order they were made
+    backtracks = 0
+    index, start = 0, 1
+
+    while True:
+        while index < nbTeams and partner[index] is not None:
+            index += 1
+        if index == nbTeams:
+            return [(ranking[first], ranking[second]) for first, second in choices]
+
+        team = ranking[index]
+        other = next((candidate for candidate in range(max(start, index + 1), nbTeams)
+                      if partner[candidate] is None
+                      and (min(team, ranking[candidate]), max(team, ranking[candidate])) not in played),
+                     None)
+        if other is not None:
+            partner[index], partner[other] = other, index
+            choices.append((index, other))
+            index, start = index + 1, 1
+            continue
+
+        # undo the last pair and try its next candidate
+        backtracks += 1
+        if not choices or backtracks > MAX_BACKTRACKS:
+            return pairswiss(ranking, set())
+        index, other = choices.pop()
+        partner[index] = partner[other] = None
+        start = other + 1
+
+
+def ranking(tournamentId):
+    """
+        The standings of a tournament, best first : the points, then the
+        score difference.
+    """
+    return Standing.objects.filter(tournament=tournamentId).order_by(
+        "-points", (F("scoreFor") - F("scoreAgainst")).desc(), "id")
+
+
+def buildswissround(tournament, roundNb, firstId, rankedTeamIds, played, byes):
+    """
+        Create (without saving them) the matches of a swiss round. With an
+        odd number of teams, the lowest ranked team without a bye gets one
+        (a match without opponent, counted as a win).
+    """
+    rankedTeamIds = list(rankedTeamIds)
+    bye = None
+    if len(rankedTeamIds) % 2:
+        bye = next((teamId for teamId in reversed(rankedTeamIds) if teamId not in byes), rankedTeamIds[-1])
+        rankedTeamIds.remove(bye)
+
+    matches = [Match(tournament=tournament, idInTournament=firstId + index, roundNb=roundNb,
+                     team1_id=team1, team2_id=team2)
+               for index, (team1, team2) in enumerate(pairswiss(rankedTeamIds, played))]
+    if bye is not None:
+        matches.append(Match(tournament=tournament, idInTournament=firstId + len(matches),
+                             roundNb=roundNb, team1_id=bye))
+    return matches, bye
+
+
+def contribution(score, otherScore):
+    """
+        The standing fields given by a result to a team.
+    """
+    return {
+        "played": 1,
+        "wins": int(score > otherScore),
+        "draws": int(score == otherScore),
+        "losses": int(score < otherScore),
+        "points": WIN_POINTS if score > otherScore else DRAW_POINTS if score == otherScore else 0,
+        "scoreFor": score,
+        "scoreAgainst": otherScore,
+    }
+
+
+def addcontribution(deltas, teamId, values, sign=1):
+    delta = deltas.setdefault(teamId, {})
+    for name, value in values.items():
+        delta[name] = delta.get(name, 0) + sign * value
+
+
+def updatestandings(tournamentId, results):
+    """
+        Apply the results (team1, team2, previous scores or None, scores)
+        to the standings : only the rows of their teams are read (locked)
+        and written, with a single bulk update.
+        A corrected result removes the previous one first.
+    """
+    deltas = {}
+    for team1, team2, previous, scores in results:
+        if team1 is None or team2 is None:
+            continue
+        if previous is not None:
+            addcontribution(deltas, team1, contribution(previous[0], previous[1]), -1)
+            addcontribution(deltas, team2, contribution(previous[1], previous[0]), -1)
+        addcontribution(deltas, team1, contribution(scores[0], scores[1]))
+        addcontribution(deltas, team2, contribution(scores[1], scores[0]))
+
+    if not deltas:
+        return []
+
+    standings = list(Standing.objects.select_for_update().filter(tournament=tournamentId, team__in=deltas))
+    for standing in standings:
+        for name, value in deltas[standing.team_id].items():
+            setattr(standing, name, getattr(standing, name) + value)
+    Standing.objects.bulk_update(standings, list(contribution(0, 0)), batch_size=500)
+    return standings
+
+
+def recordbye(tournamentId, teamId):
+    Standing.objects.filter(tournament=tournamentId, team=teamId).update(
+        played=F("played") + 1, wins=F("wins") + 1, points=F("points") + WIN_POINTS)
+
+
+def creatematches(tournament, teams):
+    """
+        Create the matches of a tournament (the first round of a swiss
+        tournament) and its standings, with a single insert each.
+        The teams are seeded in the given order.
+    """
+    bye = None
+    if tournament.format == Tournament.DOUBLE_ELIMINATION:
+        matches = builddoubleelimination(tournament, teams)
+    elif tournament.format == Tournament.ROUND_ROBIN:
+        matches = buildroundrobin(tournament, teams)
+    elif tournament.format == Tournament.SWISS:
+        matches, bye = buildswissround(tournament, 1, 1, [team.id for team in teams], set(), set())
+    else:
+        matches = buildbracket(tournament, teams)
+
+    Match.objects.bulk_create(matches, batch_size=1000)
+    if tournament.format in ROUND_FORMATS:
+        Standing.objects.bulk_create([Standing(tournament=tournament, team=team) for team in teams],
+                                     batch_size=1000)
+        if bye is not None:
+            recordbye(tournament.id, bye)
+
+    # bulk_create doesn't send the post_save signals
+    bumpversion("bracket", tournament.id)
+    return matches
+
+
+def nextswissround(tournamentId):
+    """
+        Pair the next round of a swiss tournament once every match of the
+        current round has a result.
+        Return the new matches.
+        Raise Tournament.DoesNotExist or FormatError.
+    """
+    with transaction.atomic():
+        # lock the tournament so concurrent calls create the round only once
+        tournament = Tournament.objects.select_for_update().get(pk=tournamentId)
+        if tournament.format != Tournament.SWISS:
+            raise FormatError("This tournament isn't a swiss tournament.")
+
+        matches = Match.objects.filter(tournament=tournament)
+        last = matches.aggregate(roundNb=Max("roundNb"), idInTournament=Max("idInTournament"))
+        if last["roundNb"] is None:
+            raise FormatError("The bracket of this tournament isn't generated.")
+        if matches.filter(roundNb=last["roundNb"], team2__isnull=False, score1__isnull=True).exists():
+            raise FormatError("The current round isn't over.")
+
+        rankedTeamIds = list(ranking(tournament.id).values_list("team_id", flat=True))
+        if last["roundNb"] >= swissrounds(len(rankedTeamIds)):
+            raise FormatError("Every round of this tournament has been played.")
+
+        played = set()
+        byes = set()
+        for team1, team2 in matches.values_list("team1_id", "team2_id"):
+            if team2 is None:
+                byes.add(team1)
+            else:
+                played.add((min(team1, team2), max(team1, team2)))
+
+        newMatches, bye = buildswissround(tournament, last["roundNb"] + 1, last["idInTournament"] + 1,
+                                          rankedTeamIds, played, byes)
+        Match.objects.bulk_create(newMatches, batch_size=1000)
+        if bye is not None:
+            recordbye(tournament.id, bye)
+        # bulk_create doesn't send the post_save signals
+        bumpversion("bracket", tournament.id)
+
+    return newMatches
@@ -0,0 +1,165 @@
+"""
+    Record match results, propagate the winners (and the losers of a double
+    elimination) in the bracket and update the standings and the team
+    statistics.
+"""
+
+from django.db import transaction
+from django.utils import timezone
+
+from ..cache import bumpversion
+from ..models.matchmodel import Match
+from ..models.tournamentmodel import Tournament
+from ..push import publishmatch
+from .formatservice import ROUND_FORMATS, isgrandfinal, playorder, updatestandings
+from .scheduleservice import scheduletournament
+from .statsservice import updateteamstats
+
+
+# the reasons of the rejected results
+NOT_FOUND = "notfound"
+DUPLICATE = "duplicate"
+STALE = "stale"
+INVALID = "invalid"
+
+
+def conflict(result, reason, message, match=None):
+    return {
+        "id": result.get("id") if isinstance(result, dict) else None,
+        "reason": reason,
+        "message": message,
+        "version": match.version if match is not None else None,
+    }
+
+
+def parsescore(value):
+    score = int(value)
+    if score < 0:
+        raise ValueError("negative score")
+    return score
+
+
+def updatescores(tournamentId, results):
+    """
+        Apply the results ({"id", "score1", "score2"} and optionally the
+        "version" of the match read by the client) to the matches of a
+        tournament in a single transaction.
+
+        The matches and their parents are locked, the winners and the
+        losers are propagated in the order the matches are played (so a
+        batch can contain consecutive rounds) and every modified match is
+        written with one bulk update. The standings of a round robin or
+        swiss tournament and the statistics of the teams are updated with
+        the delta of the results.
+        Return the modified matches and the conflicts (the results that
+        were rejected, with the reason : NOT_FOUND, DUPLICATE, STALE or
+        INVALID, a message and the current version).
+        If the tournament is scheduled, the next matches are rescheduled.
+    """
+    conflicts = []
+    accepted = []
+
+    with transaction.atomic():
+        ids = [result.get("id") for result in results if isinstance(result, dict)]
+        matches = Match.objects.select_for_update().filter(tournament=tournamentId).in_bulk(
+            [id for id in ids if isinstance(id, int)])
+
+        # the parents, sharing the instance when the parent is also in the batch
+        byIdInTournament = {match.idInTournament: match for match in matches.values()}
+        parentIds = {parentId for match in matches.values() for parentId in (match.idParent, match.idLoserParent)
+                     if parentId is not None}
+        parents = {
+            parent.idInTournament: byIdInTournament.get(parent.idInTournament, parent)
+            for parent in Match.objects.select_for_update().filter(
+                tournament=tournamentId, idInTournament__in=parentIds)
+        }
+
+        seen = set()
+        for result in results:
+            resultId = result.get("id") if isinstance(result, dict) else None
+            # the ids of the body may be any JSON value
+            match = matches.get(resultId) if isinstance(resultId, int) else None
+            if match is None:
+                conflicts.append(conflict(result, NOT_FOUND, "match not found in this tournament"))
+                continue
+            if match.id in seen:
+                conflicts.append(conflict(result, DUPLICATE, "several results for this match", match))
+                continue
+            seen.add(match.id)
+
+            try:
+                score1 = parsescore(result.get("score1"))
+                score2 = parsescore(result.get("score2"))
+            except (TypeError, ValueError):
+                conflicts.append(conflict(result, INVALID, "the scores must be positive integers", match))
+                continue
+
+            # a JSON number or the string of a form
+            version = result.get("version", None)
+            try:
+                version = int(version) if version is not None else None
+            except (TypeError, ValueError):
+                conflicts.append(conflict(result, INVALID, "the version must be an integer", match))
+                continue
+            if version is not None and version != match.version:
+                conflicts.append(conflict(result, STALE, "the match has been modified since it was read", match))
+                continue
+
+            accepted.append((match, score1, score2))
+
+        modified = {}
+        recorded = []
+        now = timezone.now()
+        accepted.sort(key=lambda item: playorder(item[0]))
+        for match, score1, score2 in accepted:
+            previous = None if match.score1 is None or match.score2 is None else (match.score1, match.score2)
+            recorded.append((match.id, match.team1_id, match.team2_id, previous, (score1, score2)))
+            match.score1 = score1
+            match.score2 = score2
+            if match.endTime is None:
+                match.endTime = now
+            modified[match.id] = match
+
+            # update parent
+            winner, loser = ((match.team1_id, match.team2_id) if score1 > score2
+                             else (match.team2_id, match.team1_id))
+            if isgrandfinal(match) and score1 > score2:
+                # the winner of the winners bracket wins the tournament, the reset isn't played
+                winner = loser = None
+            if match.idParent is not None and match.idParent in parents:
+                parent = parents[match.idParent]
+                side = match.parentSide or (1 if parent.idInTournament * 2 == match.idInTournament else 2)
+                setattr(parent, "team1_id" if side == 1 else "team2_id", winner)
+                modified[parent.id] = parent
+            if match.idLoserParent is not None and match.idLoserParent in parents:
+                parent = parents[match.idLoserParent]
+                setattr(parent, "team1_id" if match.loserSide == 1 else "team2_id", loser)
+                modified[parent.id] = parent
+
+        for match in modified.values():
+            match.version += 1
+
+        # the ratings are updated in the order of the command rebuildteamstats (by id for
+        # the same end time), before the results are saved to find the first result of a
+        # team in the tournament
+        recorded = [result[1:] for result in sorted(recorded, key=lambda result: result[0])]
+        updateteamstats(tournamentId, recorded)
+
+        if modified:
+            Match.objects.bulk_update(
+                modified.values(), ["team1", "team2", "score1", "score2", "version", "endTime"], batch_size=500)
+            # bulk_update doesn't send the post_save signals
+            bumpversion("bracket", tournamentId)
+            for match in modified.values():
+                publishmatch(match)
+
+        # only the matches of the round formats (and the final of a bracket) have no parent
+        if (any(match.idParent is None and match.idLoserParent is None for match, score1, score2 in accepted)
+                and Tournament.objects.filter(pk=tournamentId, format__in=ROUND_FORMATS).exists()):
+            updatestandings(tournamentId, recorded)
+
+    # the matches not played yet are rescheduled from the real end of these ones
+    if any(match.startTime is not None for match in modified.values()):
+        scheduletournament(tournamentId)
+
+    return list(modified.values()), conflicts
@@ -0,0 +1,68 @@
+"""
+    Send notifications to many users at once.
+"""
+
+from django.db import connection
+from django.utils import timezone
+
+from ..models.notificationmodel import Notification
+from ..models.teammodel import Team
+from ..push import publishnotification
+
+
+def send(notifications):
+    notifications = Notification.objects.bulk_create(notifications)
+    if notifications and not connection.features.can_return_rows_from_bulk_insert:
+        # the ids aren't set by bulk_create (MySQL, SQLite), the pushed notifications are
+        # read back : the last rows of these users with these messages and creation dates
+        notifications = list(Notification.objects.filter(
+            user_id__in={notification.user_id for notification in notifications},
+            creationDate__in={notification.creationDate for notification in notifications},
+            message__in={notification.message for notification in notifications},
+        ).order_by("-id")[:len(notifications)])[::-1]
+
+    # bulk_create doesn't send the post_save signals
+    for notification in notifications:
+        publishnotification(notification)
+
+    return notifications
+
+
+def notify(userIds, message, team=None, notificationType="MESSAGE"):
+    """
+        Send the same notification to every user of userIds.
+        All the notifications are written with a single insert.
+    """
+    creationDate = timezone.now()
+    return send([
+        Notification(message=message,
+                     seen=False,
+                     notificationType=notificationType,
+                     user_id=userId,
+                     team=team,
+                     creationDate=creationDate)
+        for userId in userIds
+    ])
+
+
+def notifyteams(teams, message, notificationType="MESSAGE"):
+    """
+        Send a notification to every member of several teams, message(team)
+        gives the message of a team. The members of every team are loaded
+        with a single query and the notifications written with a single insert.
+    """
+    teams = {team.id: team for team in teams}
+    Membership = Team.members.through
+    memberships = Membership.objects.filter(team_id__in=teams).values_list("team_id", "user_id")
+
+    creationDate = timezone.now()
+    messages = {teamId: message(team) for teamId, team in teams.items()}
+    return send([
+        Notification(message=messages[teamId],
+                     seen=False,
+                     notificationType=notificationType,
+                     user_id=userId,
+                     team=teams[teamId],
+                     creationDate=creationDate)
+        for teamId, userId in memberships
+    ])
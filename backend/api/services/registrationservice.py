@@ -0,0 +1,65 @@
+"""
+    Register teams to a tournament without exceeding its number of teams.
+"""
+
+from datetime import date
+
+from django.db import transaction
+
+from ..models.matchmodel import Match
+from ..models.teammodel import Team
+from ..models.tournamentmodel import Tournament
+from .notificationservice import notifyteams
+
+
+class RegistrationError(Exception):
+    pass
+
+
+def registerteams(tournamentId, teamIds):
+    """
+        Register the teams (ids) to a tournament in a single transaction :
+        either every team is registered or none. The teams already
+        registered are ignored.
+
+        The tournament row is locked while the registered teams are counted,
+        so the concurrent registrations are serialized on it and can't
+        exceed nbTeam. The teams are inserted with a single insert and their
+        members notified with a single insert.
+        Return the tournament and the newly registered teams.
+        Raise Tournament.DoesNotExist or RegistrationError.
+    """
+    teamIds = list(dict.fromkeys(teamIds))
+
+    with transaction.atomic():
+        tournament = Tournament.objects.select_for_update().get(pk=tournamentId)
+        # the registrations are open until the deadline day included, the bracket is
+        # generated afterwards (see generatebracket) under the same lock
+        if tournament.deadLineDate < date.today():
+            raise RegistrationError("The registration deadline of this tournament is over.")
+        if Match.objects.filter(tournament=tournament).exists():
+            raise RegistrationError("The bracket of this tournament is already generated.")
+
+        teams = Team.objects.in_bulk(teamIds)
+        unknown = [teamId for teamId in teamIds if teamId not in teams]
+        if unknown:
+            raise RegistrationError(f"Unknown teams : {', '.join(map(str, unknown))}.")
+
+        registered = set(Tournament.teams.through.objects.filter(
+            tournament=tournament).values_list("team_id", flat=True))
+        newTeams = [teams[teamId] for teamId in teamIds if teamId not in registered]
+        if len(registered) + len(newTeams) > tournament.nbTeam:
+            raise RegistrationError(
+                f"Unable to connect to this team. This tournament is full "
+                f"({tournament.nbTeam - len(registered)} places left).")
+
+        if newTeams:
+            # a single insert, the m2m_changed signals invalidate the caches
+            tournament.teams.add(*newTeams)
+
+            # send a notification to every member of the teams
+            notifyteams(newTeams, lambda team:
+                        f"""[Tournament] Your team {team.name} participates to the tournament {tournament.name}
+                                    of {tournament.gameName} the {tournament.deadLineDate}.""")
+
+    return tournament, newTeams
@@ -0,0 +1,87 @@
+"""
+    Retention of the notifications : the seen notifications older than
+    the retention delay are moved to the table NotificationArchive (or
+    appended to a gzipped NDJSON file) then deleted from Notification.
+
+    The notifications are processed by batches of ids (keyset on the
+    primary key), each batch in its own short transaction : a batch is
+    archived then deleted with a DELETE on its ids, so the locks are held
+    for one batch only. An interrupted run is resumed by running it again :
+    the archived notifications are no longer in Notification and an archived
+    id is ignored if it's archived again.
+"""
+
+import gzip
+import json
+from datetime import timedelta
+
+from django.db import transaction
+from django.utils import timezone
+
+from ..models.notificationarchivemodel import NotificationArchive
+from ..models.notificationmodel import Notification
+
+RETENTION_DAYS = 90
+BATCH_SIZE = 1000
+
+FIELDS = ["id", "user_id", "team_id", "notificationType", "message", "creationDate"]
+
+
+class TableArchive:
+    def write(self, rows):
+        NotificationArchive.objects.bulk_create([
+            NotificationArchive(id=id, userId=userId, teamId=teamId, notificationType=notificationType,
+                                message=message, creationDate=creationDate)
+            for id, userId, teamId, notificationType, message, creationDate in rows
+        ], ignore_conflicts=True)
+
+    def close(self):
+        pass
+
+
+class FileArchive:
+    """
+        Append the notifications to a gzipped NDJSON file (a new gzip member
+        per run, read as a single stream).
+    """
+
+    def __init__(self, path):
+        self.file = gzip.open(path, "at", encoding="utf-8")
+
+    def write(self, rows):
+        for row in rows:
+            values = dict(zip(FIELDS, row))
+            values["creationDate"] = values["creationDate"].isoformat()
+            self.file.write(json.dumps(values, separators=(",", ":")) + "\n")
+        # the batch is on disk before it's deleted
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+
+def expired(days=RETENTION_DAYS, now=None):
+    """
+        The notifications to archive : seen and older than days.
+    """
+    cutoff = (now or timezone.now()) - timedelta(days=days)
+    return Notification.objects.filter(seen=True, creationDate__lt=cutoff)
+
+
+def archivenotifications(archive, days=RETENTION_DAYS, batchSize=BATCH_SIZE, fromId=0, now=None):
+    """
+        Archive then delete the expired notifications, batch by batch from
+        the id fromId. Yield (number of notifications, last id) after every
+        batch, so the caller can report the progress or stop.
+    """
+    queryset = expired(days, now).order_by("id")
+    lastId = fromId
+    while True:
+        with transaction.atomic():
+            rows = list(queryset.filter(id__gt=lastId).values_list(*FIELDS)[:batchSize])
+            if not rows:
+                return
+            archive.write(rows)
+            Notification.objects.filter(id__in=[row[0] for row in rows]).delete()
+        lastId = rows[-1][0]
+        yield len(rows), lastId
@@ -0,0 +1,239 @@
+"""
+    Schedule the matches of a tournament : the start time, the slot (the
+    matches played at the same time) and the referee of every match.
+
+    A match can start once the matches giving its teams are over (its
+    children in the bracket, or the previous match of its teams in a round
+    robin or swiss round) and their teams had their break. Every slot and
+    every referee plays one match at a time, with a break between two
+    matches. The durations being the same for every match, the list
+    scheduling giving the priority to the matches followed by the longest
+    chain of matches (Hu's algorithm, the deepest rounds of a bracket)
+    gives the shortest schedule for the in-tree of a bracket.
+
+    The matches already played or being played are kept, the others are
+    rescheduled when a result is recorded earlier or later than planned.
+"""
+
+import heapq
+from datetime import datetime, time, timedelta
+
+from django.db import transaction
+from django.utils import timezone
+
+from ..cache import bumpversion
+from ..models.matchmodel import Match
+from ..models.tournamentmodel import Tournament
+from ..push import publishmatch
+from .formatservice import ROUND_FORMATS
+
+START_HOUR = 9  # default start of a tournament, on its deadline date
+
+
+def dependencies(matches, byRound):
+    """
+        Return {idInTournament: idInTournament of the matches it waits for}.
+        The winners (and losers) come from the matches whose idParent (or
+        idLoserParent) is the match. byRound : the matches of the previous
+        round of its teams, for the round robin and swiss tournaments.
+    """
+    depends = {match.idInTournament: [] for match in matches}
+    for match in matches:
+        for parentId in (match.idParent, match.idLoserParent):
+            if parentId in depends:
+                depends[parentId].append(match.idInTournament)
+
+    if byRound:
+        previous = {}  # team id -> its last match
+        for match in sorted(matches, key=lambda match: (match.roundNb, match.idInTournament)):
+            for teamId in (match.team1_id, match.team2_id):
+                if teamId is None:
+                    continue
+                if teamId in previous:
+                    depends[match.idInTournament].append(previous[teamId])
+                previous[teamId] = match.idInTournament
+    return depends
+
+
+def isbye(match, fed):
+    # a team without opponent, and no match to give it one, is directly qualified
+    return match.idInTournament not in fed and (match.team1_id is None or match.team2_id is None)
+
+
+def computeschedule(matches, start, now, matchDuration, breakDuration, nbSlots, refereeIds, byRound=False):
+    """
+        Compute the schedule of the matches (of one tournament), in minutes.
+        Return {idInTournament: (start, slot, refereeId)} for the matches to
+        (re)schedule, the byes are not scheduled.
+
+        start and now are minutes : nothing is scheduled before start, the
+        matches not started before now are rescheduled from now on.
+        The matches already over (end) or started (begin <= now and the
+        matches they wait for are over) are kept and their slot and referee
+        are busy until their end. Every match has the attributes begin and
+        end (minutes or None) besides its fields.
+    """
+    if not matches:
+        return {}
+
+    byId = {match.idInTournament: match for match in matches}
+    fed = {parentId for match in matches for parentId in (match.idParent, match.idLoserParent)}
+    byes = {match.idInTournament for match in matches if isbye(match, fed)}
+    depends = {idInTournament: [child for child in children if child not in byes]
+               for idInTournament, children in dependencies(matches, byRound).items()}
+    step = matchDuration + breakDuration
+
+    # the priority : the number of matches following a match (its level in the tree)
+    followers = {idInTournament: [] for idInTournament in byId}
+    for idInTournament, children in depends.items():
+        for child in children:
+            followers[child].append(idInTournament)
+    order = topologicalorder(depends, followers)
+    level = {}
+    for idInTournament in reversed(order):
+        level[idInTournament] = 1 + max((level[follower] for follower in followers[idInTournament]), default=0)
+
+    slots = [(start, slot) for slot in range(max(nbSlots, 1))]
+    referees = {refereeId: start for refereeId in refereeIds}
+
+    ready = {}  # idInTournament -> minute from which the match can start
+    pending = {}  # idInTournament -> number of matches waited for, not scheduled yet
+    toSchedule = []
+
+    for idInTournament in order:
+        match = byId[idInTournament]
+        if idInTournament in byes:
+            continue
+        # a match can't have started before the end of the matches it waits for
+        started = (match.begin is not None and match.begin <= now
+                   and all(byId[child].end is not None for child in depends[idInTournament]))
+        if match.end is not None or started:
+            # over or being played : kept, its teams are free at its (expected) end
+            end = match.end if match.end is not None else max(match.begin + matchDuration, now)
+            if match.end is None:
+                slots.append((end + breakDuration, match.slot))
+                if match.referee_id in referees:
+                    referees[match.referee_id] = max(referees[match.referee_id], end + breakDuration)
+            ready[idInTournament] = end + breakDuration
+            continue
+        toSchedule.append(match)
+
+    # the slots kept by the started matches replace the free ones
+    busy = {}
+    for freeAt, slot in slots:
+        busy[slot] = max(busy.get(slot, start), freeAt)
+    slots = [(freeAt, slot) for slot, freeAt in busy.items() if slot is not None and slot < max(nbSlots, 1)]
+    heapq.heapify(slots)
+    refereeHeap = [(freeAt, 0, refereeId) for refereeId, freeAt in referees.items()]
+    heapq.heapify(refereeHeap)
+
+    # the matches wait for the ones which are rescheduled
+    schedulable = {match.idInTournament for match in toSchedule}
+    waiting = []
+    for match in toSchedule:
+        children = depends[match.idInTournament]
+        pending[match.idInTournament] = sum(1 for child in children if child in schedulable)
+        ready[match.idInTournament] = max([start, now] + [ready[child] for child in children if child in ready])
+        if not pending[match.idInTournament]:
+            heapq.heappush(waiting, (ready[match.idInTournament], -level[match.idInTournament],
+                                     match.idInTournament))
+
+    schedule = {}
+    available = []  # (-level, idInTournament) : the longest chains first
+    clock = start
+    while available or waiting:
+        # the next moment a slot and a referee are free, and a match is ready
+        clock = max(clock, slots[0][0], refereeHeap[0][0] if refereeHeap else clock)
+        if not available:
+            clock = max(clock, waiting[0][0])
+        while waiting and waiting[0][0] <= clock:
+            earliest, priority, idInTournament = heapq.heappop(waiting)
+            heapq.heappush(available, (priority, idInTournament))
+
+        priority, idInTournament = heapq.heappop(available)
+        slotFree, slot = heapq.heappop(slots)
+        refereeId = None
+        if refereeHeap:
+            refereeFree, count, refereeId = heapq.heappop(refereeHeap)
+            heapq.heappush(refereeHeap, (clock + step, count + 1, refereeId))
+        heapq.heappush(slots, (clock + step, slot))
+        schedule[idInTournament] = (clock, slot, refereeId)
+
+        for follower in followers[idInTournament]:
+            if follower in pending:
+                ready[follower] = max(ready[follower], clock + step)
+                pending[follower] -= 1
+                if pending[follower] == 0:
+                    heapq.heappush(waiting, (ready[follower], -level[follower], follower))
+
+    return schedule
+
+
+def topologicalorder(depends, followers):
+    """
+        The matches ordered so every match comes after the ones it waits for.
+    """
+    remaining = {idInTournament: len(children) for idInTournament, children in depends.items()}
+    order = [idInTournament for idInTournament, count in remaining.items() if count == 0]
+    for idInTournament in order:
+        for follower in followers[idInTournament]:
+            remaining[follower] -= 1
+            if remaining[follower] == 0:
+                order.append(follower)
+    return order
+
+
+def tominutes(value, origin):
+    return None if value is None else (value - origin) // timedelta(minutes=1)
+
+
+def scheduletournament(tournamentId, nbSlots=None, start=None):
+    """
+        (Re)schedule the matches of a tournament which are not over or being
+        played, and save the start time, slot and referee of the matches
+        which changed. nbSlots and start are kept on the tournament (the
+        start as the start time of the first match).
+        Return the modified matches.
+    """
+    now = timezone.now()
+
+    with transaction.atomic():
+        tournament = Tournament.objects.select_for_update().get(pk=tournamentId)
+        if nbSlots is not None:
+            tournament.nbSlots = nbSlots
+            tournament.save(update_fields=["nbSlots"])
+
+        matches = list(Match.objects.filter(tournament=tournament))
+        if start is None:
+            planned = [match.startTime for match in matches if match.startTime is not None]
+            start = min(planned) if planned else timezone.make_aware(
+                datetime.combine(tournament.deadLineDate, time(START_HOUR)))
+
+        # the times are computed in minutes from the start
+        for match in matches:
+            match.begin = tominutes(match.startTime, start)
+            match.end = tominutes(match.endTime, start)
+
+        refereeIds = sorted(tournament.referees.values_list("id", flat=True))
+        schedule = computeschedule(matches, 0, tominutes(now, start), tournament.matchDuration,
+                                   tournament.breakDuration, tournament.nbSlots, refereeIds,
+                                   tournament.format in ROUND_FORMATS)
+
+        modified = []
+        for match in matches:
+            if match.idInTournament not in schedule:
+                continue
+            minute, slot, refereeId = schedule[match.idInTournament]
+            startTime = start + timedelta(minutes=minute)
+            if (match.startTime, match.slot, match.referee_id) != (startTime, slot, refereeId):
+                match.startTime, match.slot, match.referee_id = startTime, slot, refereeId
+                modified.append(match)
+
+        if modified:
+            Match.objects.bulk_update(modified, ["startTime", "slot", "referee"], batch_size=500)
+            # bulk_update doesn't send the post_save signals
+            bumpversion("bracket", tournament.id)
+            for match in modified:
+                publishmatch(match)
+
+    return modified
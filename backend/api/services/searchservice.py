@@ -0,0 +1,159 @@
+"""
+    Full-text search of the teams (name), the tournaments (name and game
+    name) and the users (username) in a single index, the table
+    SearchEntry : a FTS5 table with SQLite and a FULLTEXT index with MySQL.
+
+    Every term of a query is a prefix ("rock lea" finds "Rocket League") and
+    every term must match. The results are ranked by relevance (bm25 with
+    SQLite, the FULLTEXT score with MySQL), the name weighing more than the
+    detail with SQLite. With SQLite, only the RANKED_MATCHES oldest entries
+    matching a query are ranked, the next ones follow in the order they were
+    indexed, so a short prefix matching a large part of the index still
+    takes a few milliseconds.
+
+    The index is kept in sync by the signals of the models (see
+    models/searchentrymodel.py). The rows written with bulk_create or
+    update() are indexed with indexobjects(), the whole index is rebuilt by
+    the command rebuildsearchindex.
+
+    MySQL doesn't index the words shorter than innodb_ft_min_token_size
+    (3 by default) nor its stopwords. The other databases are searched with
+    LIKE, without index.
+"""
+
+import re
+from itertools import islice
+
+from django.db import connection, transaction
+from django.db.models import Q
+
+from ..models.searchentrymodel import SearchEntry
+
+KINDS = list(SearchEntry.SOURCES)
+MAX_TERMS = 8
+INDEX_BATCH_SIZE = 1000
+
+# the weights of the columns kind, name and detail in the bm25 ranking
+SQLITE_WEIGHTS = (0.0, 10.0, 1.0)
+# the entries ranked with SQLite when a query (a short prefix) matches more
+RANKED_MATCHES = 2000
+MAX_ROWID = 2 ** 63 - 1
+
+
+class SearchError(Exception):
+    pass
+
+
+def terms(query):
+    """
+        The words of a query (letters, digits and underscores).
+    """
+    return re.findall(r"\w+", query)[:MAX_TERMS]
+
+
+def sqlitesearch(words, kinds, offset, limit):
+    # every word is a quoted prefix
+    match = " ".join(f'"{word}"*' for word in words)
+    # the kind is read from the rowid, faster than from a column of the index
+    kindFilter = ""
+    if kinds != KINDS:
+        kindFilter = "AND rowid %% %d IN (%s) " % (len(KINDS), ", ".join(str(KINDS.index(kind)) for kind in kinds))
+    matches = f"FROM api_searchindex WHERE api_searchindex MATCH %s {kindFilter}"
+
+    # only the first RANKED_MATCHES entries are ranked (the ranking computes the score of
+    # every entry), the range of rowids is read from the index
+    with connection.cursor() as cursor:
+        cursor.execute(f"SELECT rowid {matches}ORDER BY rowid LIMIT 1 OFFSET %s", [match, RANKED_MATCHES - 1])
+        row = cursor.fetchone()
+    lastRanked = row[0] if row is not None else MAX_ROWID
+
+    entries = list(SearchEntry.objects.raw(
+        f"SELECT rowid, kind, name, detail {matches}AND rowid <= %s "
+        "ORDER BY bm25(api_searchindex, %s, %s, %s), rowid LIMIT %s OFFSET %s",
+        [match, lastRanked, *SQLITE_WEIGHTS, limit, offset]))
+    if len(entries) < limit and lastRanked != MAX_ROWID:
+        # the next matches follow the ranked ones in the order they were indexed
+        entries += SearchEntry.objects.raw(
+            f"SELECT rowid, kind, name, detail {matches}AND rowid > %s ORDER BY rowid LIMIT %s OFFSET %s",
+            [match, lastRanked, limit - len(entries), max(offset - RANKED_MATCHES, 0)])
+    return entries
+
+
+def mysqlsearch(words, kinds, offset, limit):
+    match = " ".join(f"+{word}*" for word in words)
+    return SearchEntry.objects.raw(
+        "SELECT rowid, kind, name, detail, MATCH (name, detail) AGAINST (%s IN BOOLEAN MODE) AS score "
+        "FROM api_searchindex WHERE MATCH (name, detail) AGAINST (%s IN BOOLEAN MODE) "
+        f"AND kind IN ({', '.join(['%s'] * len(kinds))}) "
+        "ORDER BY score DESC, rowid LIMIT %s OFFSET %s",
+        [match, match, *kinds, limit, offset])
+
+
+def likesearch(words, kinds, offset, limit):
+    condition = Q()
+    for word in words:
+        condition &= Q(name__icontains=word) | Q(detail__icontains=word)
+    return SearchEntry.objects.filter(condition, kind__in=kinds).order_by("name", "id")[offset:offset + limit]
+
+
+def search(query, kinds=None, offset=0, limit=20):
+    """
+        The entries matching every word of the query (as prefixes) in the
+        given kinds (all by default), the most relevant first.
+        Raise SearchError if the query has no word or a kind doesn't exist.
+    """
+    words = terms(query)
+    if not words:
+        raise SearchError("the query must contain a word")
+    kinds = KINDS if kinds is None else [kind for kind in KINDS if kind in kinds]
+    if not kinds:
+        raise SearchError(f"the kinds must be in {', '.join(KINDS)}")
+
+    if connection.vendor == "sqlite":
+        return list(sqlitesearch(words, kinds, offset, limit))
+    if connection.vendor == "mysql":
+        return list(mysqlsearch(words, kinds, offset, limit))
+    return list(likesearch(words, kinds, offset, limit))
+
+
+def indexobjects(kind, ids=None, batchSize=INDEX_BATCH_SIZE):
+    """
+        (Re)index the objects of a kind (all of them if ids is None), batch
+        by batch. Return the number of objects indexed.
+    """
+    model, name, detail = SearchEntry.SOURCES[kind]
+    fields = ["pk", name] + ([detail] if detail else [])
+    queryset = model.objects.order_by("pk").values_list(*fields)
+
+    if ids is None:
+        batches = chunks(queryset.iterator(chunk_size=batchSize), batchSize)
+    else:
+        # a batch of ids per query (the number of query parameters is limited)
+        batches = (queryset.filter(pk__in=batchIds) for batchIds in chunks(sorted(ids), batchSize))
+
+    count = 0
+    for rows in batches:
+        entries = [SearchEntry.build(kind, *row) for row in rows]
+        with transaction.atomic():
+            SearchEntry.objects.filter(pk__in=[entry.pk for entry in entries]).delete()
+            SearchEntry.objects.bulk_create(entries)
+        count += len(entries)
+    return count
+
+
+def chunks(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def rebuildsearchindex(batchSize=INDEX_BATCH_SIZE):
+    """
+        Rebuild the whole index. Return the number of entries per kind.
+    """
+    with transaction.atomic():
+        SearchEntry.objects.all().delete()
+        return {kind: indexobjects(kind, batchSize=batchSize) for kind in KINDS}
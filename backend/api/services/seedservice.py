@@ -0,0 +1,125 @@
+"""
+    Seed a synthetic dataset (users, teams, tournaments with their brackets
+    and notifications) with bulk inserts, for the benchmarks and the load tests.
+    Every seeded user has the password "password" and an authentication token.
+"""
+
+import random
+from datetime import date, timedelta
+from itertools import islice
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+
+from ..models.matchmodel import Match
+from ..models.notificationmodel import Notification
+from ..models.teammodel import Team
+from ..models.tournamentmodel import Tournament
+from .bracketservice import buildbracket
+from .searchservice import indexobjects
+
+BATCH_SIZE = 5000
+PASSWORD = "password"
+
+
+def chunks(iterable, size=BATCH_SIZE):
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def bulkinsert(model, rows):
+    """
+        Insert the rows (a generator) by batches, without keeping them in memory.
+    """
+    count = 0
+    for chunk in chunks(rows):
+        model.objects.bulk_create(chunk)
+        count += len(chunk)
+    return count
+
+
+def seed(users=100, teams=50, members=4, tournaments=20, teamsPerTournament=16, referees=2,
+         notifications=10000, prefix="seed", randomSeed=0, progress=lambda message: None):
+    """
+        Create the dataset and return the number of rows created per model.
+        The names are prefixed (users, teams and tournaments) so several
+        datasets can be seeded in the same database. The same randomSeed
+        always gives the same dataset.
+    """
+    rng = random.Random(randomSeed)
+    password = make_password(PASSWORD)  # hashed once for every user
+    teamsPerTournament = min(teamsPerTournament, teams)
+    counts = {}
+
+    with transaction.atomic():
+        counts["users"] = bulkinsert(User, (
+            User(username=f"{prefix}user{i}", email=f"{prefix}user{i}@example.com", password=password)
+            for i in range(users)))
+        userIds = list(User.objects.filter(username__startswith=f"{prefix}user")
+                       .order_by("id").values_list("id", flat=True))
+        bulkinsert(Token, (Token(key=Token.generate_key(), user_id=userId) for userId in userIds))
+        # bulk_create doesn't send the post_save signals indexing the rows
+        indexobjects("users", userIds)
+        progress(f"{counts['users']} users")
+
+    with transaction.atomic():
+        counts["teams"] = bulkinsert(Team, (
+            Team(name=f"{prefix}team{i}", leader_id=f"{prefix}user{i % users}") for i in range(teams)))
+        teamIds = list(Team.objects.filter(name__startswith=f"{prefix}team")
+                       .order_by("id").values_list("id", flat=True))
+        indexobjects("teams", teamIds)
+
+        # the leader and random members (distinct) in every team
+        Membership = Team.members.through
+        counts["members"] = bulkinsert(Membership, (
+            Membership(team_id=teamId, user_id=userId)
+            for index, teamId in enumerate(teamIds)
+            for userId in {userIds[index % users], *rng.sample(userIds, max(min(members, users) - 1, 0))}))
+        progress(f"{counts['teams']} teams, {counts['members']} members")
+
+    with transaction.atomic():
+        today = date.today()
+        counts["tournaments"] = bulkinsert(Tournament, (
+            Tournament(organizer_id=f"{prefix}user{rng.randrange(users)}",
+                       name=f"{prefix}tournament{i}", gameName=rng.choice(("chess", "go", "quake", "dota")),
+                       matchDuration=30, breakDuration=10, nbTeam=teamsPerTournament, streamURL="",
+                       deadLineDate=today + timedelta(days=rng.randint(-365, 30)))
+            for i in range(tournaments)))
+        tournamentRows = list(Tournament.objects.filter(name__startswith=f"{prefix}tournament").order_by("id"))
+        indexobjects("tournaments", [tournament.id for tournament in tournamentRows])
+
+        registrations = {tournament.id: rng.sample(teamIds, teamsPerTournament) for tournament in tournamentRows}
+        Registration = Tournament.teams.through
+        bulkinsert(Registration, (
+            Registration(tournament_id=tournamentId, team_id=teamId)
+            for tournamentId, registered in registrations.items() for teamId in registered))
+        Referee = Tournament.referees.through
+        bulkinsert(Referee, (
+            Referee(tournament_id=tournament.id, user_id=userId)
+            for tournament in tournamentRows for userId in rng.sample(userIds, min(referees, users))))
+
+        # a bracket for every tournament whose registration deadline is over
+        counts["matches"] = bulkinsert(Match, (
+            match
+            for tournament in tournamentRows
+            if tournament.deadLineDate <= today and teamsPerTournament >= 2
+            for match in buildbracket(tournament, [Team(id=teamId) for teamId in registrations[tournament.id]])))
+        progress(f"{counts['tournaments']} tournaments, {counts['matches']} matches")
+
+    with transaction.atomic():
+        now = timezone.now()
+        counts["notifications"] = bulkinsert(Notification, (
+            Notification(message=f"[Seed] notification {i}", seen=rng.random() < 0.8,
+                         notificationType="MESSAGE", user_id=rng.choice(userIds),
+                         creationDate=now - timedelta(seconds=i))
+            for i in range(notifications)))
+        progress(f"{counts['notifications']} notifications")
+
+    return counts
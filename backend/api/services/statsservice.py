@@ -0,0 +1,124 @@
+"""
+    The statistics of the teams over every tournament (TeamStats), so the
+    results of a team aren't counted from its matches on every request.
+
+    The rating is an Elo rating : after a match, a team wins
+    K_FACTOR * (result - expected result) points, the result being 1 for a
+    win, 0.5 for a draw and 0 for a loss. The expected result depends on
+    the difference between the ratings of the two teams.
+"""
+
+from django.db import transaction
+from django.db.models import Q
+
+from ..models.matchmodel import Match
+from ..models.teammodel import Team
+from ..models.teamstatsmodel import TeamStats
+
+K_FACTOR = 32
+
+
+def expectedresult(rating, otherRating):
+    return 1 / (1 + 10 ** ((otherRating - rating) / 400))
+
+
+def elodelta(rating1, rating2, score1, score2):
+    """
+        The rating change of the team 1 (the opposite for the team 2).
+    """
+    result = 1.0 if score1 > score2 else 0.5 if score1 == score2 else 0.0
+    return K_FACTOR * (result - expectedresult(rating1, rating2))
+
+
+def addresult(stats, score, otherScore, sign=1):
+    stats.played += sign
+    stats.wins += sign * (score > otherScore)
+    stats.draws += sign * (score == otherScore)
+    stats.losses += sign * (score < otherScore)
+    stats.scoreFor += sign * score
+    stats.scoreAgainst += sign * otherScore
+
+
+def updateteamstats(tournamentId, results):
+    """
+        Apply the results (team1, team2, previous scores or None, scores)
+        of a tournament, before they're saved, to the statistics of their
+        teams : only the rows of these teams are read (locked) and written,
+        in the transaction recording the results.
+
+        A corrected result replaces the previous one in the counts and its
+        rating change by the new one, computed with the current ratings
+        (the command rebuildteamstats replays every result in order).
+    """
+    results = [result for result in results if result[0] is not None and result[1] is not None]
+    if not results:
+        return []
+
+    teamIds = {teamId for team1, team2, previous, scores in results for teamId in (team1, team2)}
+    # the teams which have their first result in this tournament
+    newTeamIds = {teamId for team1, team2, previous, scores in results
+                  for teamId in (team1, team2) if previous is None}
+    if newTeamIds:
+        scored = Match.objects.filter(Q(team1__in=newTeamIds) | Q(team2__in=newTeamIds), tournament=tournamentId,
+                                      score1__isnull=False, score2__isnull=False)
+        for team1, team2 in scored.values_list("team1_id", "team2_id"):
+            newTeamIds.discard(team1)
+            newTeamIds.discard(team2)
+
+    TeamStats.objects.bulk_create([TeamStats(team_id=teamId) for teamId in teamIds], ignore_conflicts=True)
+    stats = TeamStats.objects.select_for_update().in_bulk(teamIds)
+
+    for team1, team2, previous, scores in results:
+        stats1, stats2 = stats[team1], stats[team2]
+        delta = elodelta(stats1.rating, stats2.rating, *scores)
+        if previous is not None:
+            addresult(stats1, previous[0], previous[1], -1)
+            addresult(stats2, previous[1], previous[0], -1)
+            delta -= elodelta(stats1.rating, stats2.rating, *previous)
+        addresult(stats1, scores[0], scores[1])
+        addresult(stats2, scores[1], scores[0])
+        stats1.rating += delta
+        stats2.rating -= delta
+
+    for teamId in newTeamIds:
+        stats[teamId].tournaments += 1
+
+    TeamStats.objects.bulk_update(stats.values(), ["played", "wins", "draws", "losses", "scoreFor",
+                                                   "scoreAgainst", "tournaments", "rating"], batch_size=500)
+    return list(stats.values())
+
+
+def rebuildteamstats(batchSize=1000):
+    """
+        Rebuild the statistics of every team from the results : a single
+        query reads the results in the order they were recorded, a single
+        pass counts them and replays the ratings, and the table is rewritten
+        with bulk inserts.
+        Return the number of results.
+    """
+    stats = {teamId: TeamStats(team_id=teamId) for teamId in Team.objects.values_list("id", flat=True)}
+    tournaments = set()
+
+    results = Match.objects.filter(
+        team1__isnull=False, team2__isnull=False, score1__isnull=False, score2__isnull=False
+    ).order_by("endTime", "id").values_list("tournament_id", "team1_id", "team2_id", "score1", "score2")
+
+    count = 0
+    for tournamentId, team1, team2, score1, score2 in results.iterator(chunk_size=batchSize):
+        stats1, stats2 = stats[team1], stats[team2]
+        addresult(stats1, score1, score2)
+        addresult(stats2, score2, score1)
+        delta = elodelta(stats1.rating, stats2.rating, score1, score2)
+        stats1.rating += delta
+        stats2.rating -= delta
+        tournaments.add((tournamentId, team1))
+        tournaments.add((tournamentId, team2))
+        count += 1
+
+    for tournamentId, teamId in tournaments:
+        stats[teamId].tournaments += 1
+
+    with transaction.atomic():
+        TeamStats.objects.all().delete()
+        TeamStats.objects.bulk_create(stats.values(), batch_size=batchSize)
+    return count
@@ -1,3 +0,0 @@
-from django.test import TestCase
-
-# Add tests here if necessary. For the first tag, there's no test.
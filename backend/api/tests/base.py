@@ -0,0 +1,39 @@
+from datetime import date, timedelta
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from ..authentication import tokens
+from ..models.teammodel import Team
+from ..models.tournamentmodel import Tournament
+
+
+class ApiTestCase(TestCase):
+    """
+        A user "org" with a token and an API client authenticated with it.
+        The cache (cached responses, versions, throttling buckets) and the
+        tokens cached by the process are emptied before every test.
+    """
+
+    def setUp(self):
+        cache.clear()
+        tokens.clear()
+        self.user = User.objects.create_user("org", password="password")
+        self.token = Token.objects.create(user=self.user)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION="Token " + self.token.key)
+
+    def maketournament(self, nbTeam, deadLineDate=None, **fields):
+        """
+            A tournament organized by self.user with nbTeam registered teams.
+        """
+        tournament = Tournament.objects.create(
+            organizer=self.user, name="Tournament", gameName="Game", matchDuration=10,
+            breakDuration=5, deadLineDate=deadLineDate or date.today() - timedelta(days=1),
+            nbTeam=nbTeam, streamURL="", **fields)
+        teams = [Team.objects.create(name=f"team {tournament.id}-{i}", leader=self.user) for i in range(nbTeam)]
+        tournament.teams.add(*teams)
+        return tournament, teams
@@ -0,0 +1,41 @@
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from ..authentication import TokenCache, gettokenuser, tokens
+from .base import ApiTestCase
+
+
+class CachedTokenTest(ApiTestCase):
+    def test_token_is_cached(self):
+        self.assertEqual(self.client.get("/api/notifications/unreadcount/").status_code, 200)
+        # the unread count only
+        with self.assertNumQueries(1):
+            self.assertEqual(self.client.get("/api/notifications/unreadcount/").status_code, 200)
+
+    def test_invalid_token(self):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION="Token invalid")
+        self.assertEqual(client.get("/api/notifications/unreadcount/").status_code, 401)
+
+    def test_deleted_token_in_another_process(self):
+        other = TokenCache()
+        other.set(self.token.key, self.user)
+        self.assertEqual(other.get(self.token.key), self.user)
+
+        Token.objects.filter(key=self.token.key).delete()
+
+        self.assertIsNone(other.get(self.token.key))
+        self.assertIsNone(gettokenuser(self.token.key))
+        self.assertEqual(self.client.get("/api/notifications/unreadcount/").status_code, 401)
+
+    def test_deactivated_user_in_another_process(self):
+        other = TokenCache()
+        other.set(self.token.key, self.user)
+        self.client.get("/api/notifications/unreadcount/")
+
+        self.user.is_active = False
+        self.user.save()
+
+        self.assertIsNone(other.get(self.token.key))
+        self.assertIsNone(tokens.get(self.token.key))
+        self.assertEqual(self.client.get("/api/notifications/unreadcount/").status_code, 401)
@@ -0,0 +1,43 @@
+from ..models.matchmodel import Match
+from .base import ApiTestCase
+
+
+class BatchTest(ApiTestCase):
+    def setUp(self):
+        super().setUp()
+        self.tournament, self.teams = self.maketournament(2)
+        self.client.post(f"/api/tournaments/{self.tournament.id}/generatebracket/")
+        self.match = Match.objects.get(tournament=self.tournament)
+        self.url = f"/api/matchs/{self.match.id}/updatematchscores/"
+
+    def batch(self, requests, **data):
+        return self.client.post("/api/batch/", {"requests": requests, **data}, format="json")
+
+    def test_subrequests(self):
+        response = self.batch([
+            {"method": "PUT", "url": self.url, "body": {"score1": 2, "score2": 1}},
+            {"method": "GET", "url": f"/api/tournaments/{self.tournament.id}/"},
+        ])
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([subresponse["status"] for subresponse in response.data["responses"]], [200, 200])
+        self.assertNotIn("rolledBack", response.data)
+
+    def test_atomic_rollback(self):
+        response = self.batch([
+            {"method": "PUT", "url": self.url, "body": {"score1": 2, "score2": 1}},
+            {"method": "PUT", "url": self.url, "body": {"score1": -1, "score2": 1}},
+            {"method": "GET", "url": f"/api/tournaments/{self.tournament.id}/"},
+        ], atomic=True)
+
+        self.assertEqual([subresponse["status"] for subresponse in response.data["responses"]], [200, 400])
+        self.assertTrue(response.data["rolledBack"])
+        self.match.refresh_from_db()
+        self.assertIsNone(self.match.score1)
+
+    def test_invalid_batch(self):
+        request = {"method": "GET", "url": f"/api/tournaments/{self.tournament.id}/"}
+        for atomic in ("false", "true", 1, None):
+            self.assertEqual(self.batch([request], atomic=atomic).status_code, 400, atomic)
+        self.assertEqual(self.batch([]).status_code, 400)
+        self.assertEqual(self.batch([{"method": "TRACE", "url": "/api/teams/"}]).status_code, 400)
@@ -0,0 +1,43 @@
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+from django.test import SimpleTestCase
+
+from ..management.commands.benchmarkapi import ServerRunner, percentile
+
+
+class Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        self.send_response(429 if self.path == "/throttled/" else 200)
+        self.send_header("X-Queries", "3")
+        self.end_headers()
+        self.wfile.write(b"{}")
+
+    def log_message(self, *args):
+        pass
+
+
+class ServerRunnerTest(SimpleTestCase):
+    def setUp(self):
+        self.server = HTTPServer(("127.0.0.1", 0), Handler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.runner = ServerRunner("token", f"http://127.0.0.1:{self.server.server_port}/")
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_statuses(self):
+        status, elapsed, queries = self.runner.get("/ok/")
+        self.assertEqual((status, queries), (200, 3))
+
+        status, elapsed, queries = self.runner.get("/throttled/")
+        self.assertEqual((status, queries), (429, 3))
+        self.assertGreater(elapsed, 0)
+
+
+class PercentileTest(SimpleTestCase):
+    def test_percentile(self):
+        values = list(range(101))
+        self.assertEqual(percentile(values, 0.5), 50)
+        self.assertEqual(percentile(values, 0.99), 99)
@@ -0,0 +1,39 @@
+from ..models.matchmodel import Match
+from .base import ApiTestCase
+
+
+class BracketTest(ApiTestCase):
+    def test_generate(self):
+        for nbTeam in (2, 3, 5, 8):
+            tournament, teams = self.maketournament(nbTeam)
+            response = self.client.post(f"/api/tournaments/{tournament.id}/generatebracket/")
+            self.assertEqual(response.status_code, 200, response.content)
+
+            size = 2 ** max(1, (nbTeam - 1).bit_length())
+            matches = Match.objects.filter(tournament=tournament)
+            self.assertEqual(matches.count(), size - 1)
+            firstRound = matches.filter(roundNb=(size - 1).bit_length())
+            placed = {teamId for match in firstRound for teamId in (match.team1_id, match.team2_id)} - {None}
+            self.assertEqual(placed, {team.id for team in teams})
+
+    def test_bracket_is_cached_until_a_match_changes(self):
+        tournament, teams = self.maketournament(4)
+        self.client.post(f"/api/tournaments/{tournament.id}/generatebracket/")
+
+        # the token is cached by the first request
+        first = self.client.get(f"/api/tournaments/{tournament.id}/bracket/")
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get(f"/api/tournaments/{tournament.id}/bracket/").data, first.data)
+
+        match = Match.objects.filter(tournament=tournament, team1__isnull=False).first()
+        match.score1 = 3
+        match.save()
+        bracket = self.client.get(f"/api/tournaments/{tournament.id}/bracket/").data
+        scores = [game["match"]["score1"] for round in bracket["rounds"] for game in round["games"]]
+        self.assertIn(3, scores)
+
+    def test_unknown_tournament(self):
+        self.assertEqual(self.client.get("/api/tournaments/999/bracket/").status_code, 404)
+        self.assertEqual(self.client.get("/api/tournaments/abc/bracket/").status_code, 404)
+        self.assertEqual(self.client.post("/api/tournaments/999/generatebracket/").status_code, 404)
+        self.assertEqual(self.client.post("/api/tournaments/abc/generatebracket/").status_code, 404)
@@ -0,0 +1,42 @@
+from django.contrib.auth.models import User
+from django.utils import timezone
+
+from ..cache import getversion
+from .base import ApiTestCase
+
+
+class CachedResponseTest(ApiTestCase):
+    def setUp(self):
+        super().setUp()
+        self.tournament, self.teams = self.maketournament(2)
+        self.referee = User.objects.create_user("referee", password="password")
+        self.tournament.referees.add(self.referee)
+        self.url = f"/api/users/{self.tournament.id}/gettournamentreferees/"
+
+    def test_hit_until_the_referees_change(self):
+        self.assertEqual(self.client.get(self.url)["X-Cache"], "MISS")
+        response = self.client.get(self.url)
+        self.assertEqual(response["X-Cache"], "HIT")
+        self.assertEqual([user["username"] for user in response.data], ["referee"])
+
+        self.tournament.referees.add(self.user)
+        response = self.client.get(self.url)
+        self.assertEqual(response["X-Cache"], "MISS")
+        self.assertEqual(len(response.data), 2)
+
+    def test_renamed_user(self):
+        self.client.get(self.url)
+        self.referee.username = "renamed"
+        self.referee.save()
+
+        self.assertEqual([user["username"] for user in self.client.get(self.url).data], ["renamed"])
+
+    def test_login_keeps_the_users_cached(self):
+        version = getversion("users", "all")
+        self.referee.last_login = timezone.now()
+        self.referee.save(update_fields=["last_login"])
+        self.assertEqual(getversion("users", "all"), version)
+
+        self.referee.email = "referee@example.com"
+        self.referee.save(update_fields=["email"])
+        self.assertNotEqual(getversion("users", "all"), version)
@@ -0,0 +1,38 @@
+import io
+
+from django.contrib.auth.models import User
+
+from ..models.tournamentmodel import Tournament
+from ..services import KINDS, ImportDataError, exportndjson, importrows, readndjson
+from .base import ApiTestCase
+
+
+class ImportTest(ApiTestCase):
+    def setUp(self):
+        super().setUp()
+        self.tournament, self.teams = self.maketournament(2)
+        self.member = User.objects.create_user("member")
+        self.teams[0].members.add(self.user, self.member)
+        self.export = "".join(exportndjson(KINDS))
+
+    def test_existing_rows_are_not_counted(self):
+        counts = importrows(readndjson(io.StringIO(self.export)))
+
+        # the users, the teams and their members already exist, the tournament is copied
+        self.assertEqual((counts["users"], counts["teams"], counts["members"]), (0, 0, 0))
+        self.assertEqual((counts["tournaments"], counts["tournamentteams"]), (1, 2))
+        self.assertEqual(Tournament.objects.count(), 2)
+        self.assertEqual(self.teams[0].members.count(), 2)
+
+    def test_new_members_are_counted(self):
+        self.teams[0].members.remove(self.member)
+
+        counts = importrows(readndjson(io.StringIO(self.export)))
+
+        self.assertEqual(counts["members"], 1)
+        self.assertEqual(self.teams[0].members.count(), 2)
+
+    def test_unknown_reference(self):
+        rows = io.StringIO('{"kind":"members","team":999,"user":1}\n')
+        with self.assertRaises(ImportDataError):
+            importrows(readndjson(rows))
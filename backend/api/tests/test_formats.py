@@ -0,0 +1,140 @@
+from collections import Counter
+
+from ..models.matchmodel import Match
+from ..models.tournamentmodel import Tournament
+from ..services.formatservice import FINAL
+from ..services.matchservice import updatescores
+from .base import ApiTestCase
+
+
+class DoubleEliminationTest(ApiTestCase):
+    def generate(self, nbTeam):
+        tournament, teams = self.maketournament(nbTeam, format=Tournament.DOUBLE_ELIMINATION)
+        response = self.client.post(f"/api/tournaments/{tournament.id}/generatebracket/")
+        self.assertEqual(response.status_code, 200, response.content)
+        return tournament
+
+    def play(self, tournament, finalWinner):
+        """
+            Play every match with two teams until none is left (the best
+            seed wins, the first grand final is won by the side finalWinner).
+            Return the losses of every team and the reset.
+        """
+        losses = Counter()
+        while True:
+            matches = Match.objects.filter(tournament=tournament, team1__isnull=False, team2__isnull=False,
+                                           score1__isnull=True)
+            if not matches:
+                break
+            results = []
+            for match in matches:
+                if match.stage == FINAL and match.roundNb == 0:
+                    team1Wins = finalWinner == 1
+                else:
+                    team1Wins = match.team1_id < match.team2_id
+                results.append({"id": match.id, "score1": int(team1Wins), "score2": int(not team1Wins)})
+                losses[match.team2_id if team1Wins else match.team1_id] += 1
+            updatescores(tournament.id, results)
+        return losses, Match.objects.get(tournament=tournament, stage=FINAL, roundNb=1)
+
+    def test_winners_bracket_champion_wins_the_final(self):
+        tournament = self.generate(4)
+        losses, reset = self.play(tournament, finalWinner=1)
+
+        self.assertEqual(sorted(losses.values()), [2, 2, 2])
+        self.assertIsNone(reset.team1_id)
+        self.assertIsNone(reset.team2_id)
+
+    def test_reset_when_the_losers_bracket_team_wins_the_final(self):
+        for nbTeam in (4, 5):
+            tournament = self.generate(nbTeam)
+            losses, reset = self.play(tournament, finalWinner=2)
+
+            # the champion lost once at most, every other team twice
+            self.assertEqual(len(losses), nbTeam)
+            self.assertEqual(sorted(losses.values())[1:], [2] * (nbTeam - 1))
+            self.assertEqual(sorted(losses.values())[0], 1)
+            self.assertIsNotNone(reset.score1)
+
+    def test_corrected_final_empties_the_reset(self):
+        tournament = self.generate(4)
+        self.play(tournament, finalWinner=2)
+        final = Match.objects.get(tournament=tournament, stage=FINAL, roundNb=0)
+
+        updatescores(tournament.id, [{"id": final.id, "score1": 2, "score2": 0}])
+
+        reset = Match.objects.get(tournament=tournament, stage=FINAL, roundNb=1)
+        self.assertEqual((reset.team1_id, reset.team2_id), (None, None))
+
+    def test_bracket_shows_the_reset_after_the_final(self):
+        tournament = self.generate(4)
+        rounds = self.client.get(f"/api/tournaments/{tournament.id}/bracket/").data["rounds"]
+
+        self.assertEqual([game["match"]["stage"] for game in rounds[-2]["games"] + rounds[-1]["games"]],
+                         [FINAL, FINAL])
+        self.assertEqual(rounds[-1]["games"][0]["match"]["roundNb"], 1)
+
+
+class RoundRobinTest(ApiTestCase):
+    def test_every_team_meets_every_other_once(self):
+        tournament, teams = self.maketournament(5, format=Tournament.ROUND_ROBIN)
+        self.client.post(f"/api/tournaments/{tournament.id}/generatebracket/")
+
+        pairs = [frozenset(pair) for pair in Match.objects.filter(tournament=tournament).values_list("team1", "team2")]
+        self.assertEqual(len(pairs), 10)
+        self.assertEqual(len(set(pairs)), 10)
+
+    def test_standings(self):
+        tournament, teams = self.maketournament(3, format=Tournament.ROUND_ROBIN)
+        self.client.post(f"/api/tournaments/{tournament.id}/generatebracket/")
+        results = []
+        for match in Match.objects.filter(tournament=tournament):
+            # the first team wins its matches, the others draw
+            score1, score2 = (1, 1) if teams[0].id not in (match.team1_id, match.team2_id) else (
+                (2, 0) if match.team1_id == teams[0].id else (0, 2))
+            results.append({"id": match.id, "score1": score1, "score2": score2})
+        updatescores(tournament.id, results)
+
+        standings = self.client.get(f"/api/tournaments/{tournament.id}/standings/").data
+        self.assertEqual([(row["team"], row["points"]) for row in standings][0], (teams[0].id, 6))
+        self.assertEqual([row["points"] for row in standings][1:], [1, 1])
+
+        # a corrected result replaces the previous one
+        first = Match.objects.filter(tournament=tournament).exclude(team1=teams[0]).exclude(team2=teams[0]).get()
+        updatescores(tournament.id, [{"id": first.id, "score1": 3, "score2": 0}])
+        standings = self.client.get(f"/api/tournaments/{tournament.id}/standings/").data
+        self.assertEqual([row["points"] for row in standings], [6, 3, 0])
+
+
+class SwissTest(ApiTestCase):
+    def test_rounds_without_rematch(self):
+        tournament, teams = self.maketournament(4, format=Tournament.SWISS)
+        self.client.post(f"/api/tournaments/{tournament.id}/generatebracket/")
+        url = f"/api/tournaments/{tournament.id}/nextround/"
+        self.assertEqual(self.client.post(url).status_code, 400)
+
+        for roundNb, expected in ((1, 200), (2, 400)):
+            matches = Match.objects.filter(tournament=tournament, roundNb=roundNb)
+            updatescores(tournament.id, [{"id": match.id, "score1": 1, "score2": 0} for match in matches])
+            self.assertEqual(self.client.post(url).status_code, expected)
+
+        # ceil(log2(4)) rounds, the winners of the first round meet
+        pairs = [frozenset(pair) for pair in Match.objects.filter(tournament=tournament).order_by(
+            "idInTournament").values_list("team1", "team2")]
+        self.assertEqual(len(set(pairs)), 4)
+        firstWinners = set(Match.objects.filter(tournament=tournament, roundNb=1).values_list("team1", flat=True))
+        self.assertIn(firstWinners, [set(pair) for pair in pairs[2:]])
+
+    def test_odd_number_of_teams(self):
+        tournament, teams = self.maketournament(3, format=Tournament.SWISS)
+        self.client.post(f"/api/tournaments/{tournament.id}/generatebracket/")
+
+        bye = Match.objects.get(tournament=tournament, team2__isnull=True)
+        standings = {row["team"]: row["points"] for row in
+                     self.client.get(f"/api/tournaments/{tournament.id}/standings/").data}
+        self.assertEqual(standings[bye.team1_id], 3)
+
+    def test_unknown_tournament(self):
+        for pk in ("abc", "999"):
+            self.assertEqual(self.client.post(f"/api/tournaments/{pk}/nextround/").status_code, 404, pk)
+            self.assertEqual(self.client.get(f"/api/tournaments/{pk}/standings/").status_code, 404, pk)
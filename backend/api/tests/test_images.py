@@ -0,0 +1,64 @@
+import base64
+import shutil
+import tempfile
+from io import BytesIO
+
+from django.test import override_settings
+from PIL import Image as PillowImage
+
+from ..models.imagemodel import Image
+from ..models.teammodel import Team
+from .base import ApiTestCase
+
+
+def dataurl(color="red"):
+    output = BytesIO()
+    PillowImage.new("RGB", (300, 200), color).save(output, format="PNG")
+    return "data:image/png;base64," + base64.b64encode(output.getvalue()).decode()
+
+
+class TeamImageTest(ApiTestCase):
+    def setUp(self):
+        super().setUp()
+        self.media = tempfile.mkdtemp()
+        self.settings = override_settings(MEDIA_ROOT=self.media)
+        self.settings.enable()
+
+    def tearDown(self):
+        self.settings.disable()
+        shutil.rmtree(self.media)
+        super().tearDown()
+
+    def test_create_and_round_trip(self):
+        response = self.client.post("/api/teams/", {"name": "team", "leader": "org", "image": dataurl()},
+                                    format="json")
+        self.assertEqual(response.status_code, 200, response.content)
+        team = Team.objects.get(name="team")
+        self.assertIsNotNone(team.image_id)
+        self.assertEqual(set(response.data["thumbnails"]), {"64", "256"})
+
+        # the data read is sent back unchanged with a new name
+        data = self.client.get(f"/api/teams/{team.id}/").data
+        data["name"] = "renamed"
+        response = self.client.put(f"/api/teams/{team.id}/", data, format="json")
+
+        self.assertEqual(response.status_code, 200, response.content)
+        team.refresh_from_db()
+        self.assertEqual((team.name, team.image_id), ("renamed", data["image"].rsplit("/", 1)[1].split(".")[0]))
+
+        # the hash alone
+        response = self.client.patch(f"/api/teams/{team.id}/", {"image": team.image_id}, format="json")
+        self.assertEqual(response.status_code, 200, response.content)
+
+    def test_same_image_is_stored_once(self):
+        self.client.post("/api/teams/", {"name": "first", "leader": "org", "image": dataurl()}, format="json")
+        self.client.post("/api/teams/", {"name": "second", "leader": "org", "image": dataurl()}, format="json")
+
+        self.assertEqual(Image.objects.count(), 1)
+
+    def test_invalid_image(self):
+        for image in ("abc", "data:image/png;base64,aGVsbG8=", "http://testserver/media/images/ab/" + "ab" * 32 + ".png"):
+            response = self.client.post("/api/teams/", {"name": "team", "leader": "org", "image": image},
+                                        format="json")
+            self.assertEqual(response.status_code, 400, image)
+        self.assertFalse(Team.objects.exists())
@@ -0,0 +1,72 @@
+from ..models.matchmodel import Match
+from .base import ApiTestCase
+
+
+class UpdateScoresTest(ApiTestCase):
+    def setUp(self):
+        super().setUp()
+        self.tournament, self.teams = self.maketournament(4)
+        self.client.post(f"/api/tournaments/{self.tournament.id}/generatebracket/")
+        self.match = Match.objects.filter(tournament=self.tournament, roundNb=2).order_by("idInTournament").first()
+
+    def update(self, **data):
+        return self.client.put(f"/api/matchs/{self.match.id}/updatematchscores/", data, format="json")
+
+    def test_winner_is_propagated(self):
+        response = self.update(score1=3, score2=1, version=self.match.version)
+
+        self.assertEqual(response.status_code, 200, response.content)
+        final = Match.objects.get(tournament=self.tournament, idInTournament=self.match.idParent)
+        self.assertIn(self.match.team1_id, (final.team1_id, final.team2_id))
+        self.match.refresh_from_db()
+        self.assertEqual((self.match.score1, self.match.score2, self.match.version), (3, 1, 1))
+
+    def test_version_of_a_form(self):
+        response = self.client.put(f"/api/matchs/{self.match.id}/updatematchscores/",
+                                   {"score1": "3", "score2": "1", "version": "0"})
+        self.assertEqual(response.status_code, 200, response.content)
+
+    def test_stale_version(self):
+        self.update(score1=3, score2=1, version=0)
+        response = self.update(score1=0, score2=2, version=0)
+
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.data["version"], 1)
+
+    def test_invalid_result(self):
+        self.assertEqual(self.update(score1=-1, score2=2).status_code, 400)
+        self.assertEqual(self.update(score1="a", score2=2).status_code, 400)
+        self.assertEqual(self.update(score1=1, score2=2, version="a").status_code, 400)
+        self.match.refresh_from_db()
+        self.assertIsNone(self.match.score1)
+
+    def test_batch(self):
+        other = Match.objects.filter(tournament=self.tournament, roundNb=2).exclude(id=self.match.id).first()
+        response = self.client.post("/api/matchs/updatescores/", {
+            "tournament": self.tournament.id,
+            "results": [
+                {"id": self.match.id, "score1": 2, "score2": 0},
+                {"id": other.id, "score1": 1, "score2": 0, "version": 5},
+                {"id": 999, "score1": 1, "score2": 0},
+                {"id": self.match.id, "score1": 1, "score2": 0},
+            ],
+        }, format="json")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([match["id"] for match in response.data["updated"] if match["id"] == self.match.id],
+                         [self.match.id])
+        self.assertEqual([conflict["reason"] for conflict in response.data["conflicts"]],
+                         ["stale", "notfound", "duplicate"])
+
+    def test_invalid_batch(self):
+        url = "/api/matchs/updatescores/"
+        response = self.client.post(url, {"tournament": "abc", "results": []}, format="json")
+        self.assertEqual(response.status_code, 400)
+
+        response = self.client.post(url, {"tournament": self.tournament.id, "results": [
+            {"id": [self.match.id], "score1": 1, "score2": 0},
+            {"id": {"id": self.match.id}, "score1": 1, "score2": 0},
+            "match",
+        ]}, format="json")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([conflict["reason"] for conflict in response.data["conflicts"]], ["notfound"] * 3)
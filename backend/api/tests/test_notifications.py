@@ -0,0 +1,71 @@
+import base64
+import json
+
+from django.contrib.auth.models import User
+from django.utils import timezone
+
+from ..models.notificationmodel import Notification
+from .base import ApiTestCase
+
+
+class InboxTest(ApiTestCase):
+    def setUp(self):
+        super().setUp()
+        now = timezone.now()
+        Notification.objects.bulk_create([
+            Notification(message=f"message {i}", seen=i % 2 == 0, user=self.user,
+                         creationDate=now - timezone.timedelta(minutes=i))
+            for i in range(5)
+        ])
+        self.other = User.objects.create_user("other", password="password")
+        Notification.objects.create(message="other", user=self.other, creationDate=now)
+
+    def test_pages(self):
+        response = self.client.get("/api/notifications/inbox/?page_size=2")
+        self.assertEqual(response.status_code, 200)
+        messages = [notification["message"] for notification in response.data["results"]]
+        # the unseen first, the most recent first
+        self.assertEqual(messages, ["message 1", "message 3"])
+
+        response = self.client.get(response.data["next"])
+        self.assertEqual([notification["message"] for notification in response.data["results"]],
+                         ["message 0", "message 2"])
+
+        response = self.client.get(response.data["next"])
+        self.assertEqual([notification["message"] for notification in response.data["results"]], ["message 4"])
+        self.assertIsNone(response.data["next"])
+
+    def test_unread_count_and_mark_all_seen(self):
+        self.assertEqual(self.client.get(f"/api/notifications/unreadcount/?uid={self.user.id}").data["count"], 2)
+
+        response = self.client.post("/api/notifications/markallseen/")
+        self.assertEqual(response.data["updated"], 2)
+        self.assertEqual(self.client.get("/api/notifications/unreadcount/").data["count"], 0)
+        self.assertFalse(Notification.objects.get(message="other").seen)
+
+    def test_invalid_uid(self):
+        # the async view (in a thread of the pool, outside the transaction of the test) is
+        # reached last, with the token cached by the other requests, and answers before any query
+        for url in ("/api/notifications/inbox/?uid=abc", "/api/notifications/unreadcount/?uid=abc",
+                    "/api/notifications/?uid=abc", "/api/async/notifications/inbox/?uid=abc"):
+            self.assertEqual(self.client.get(url).status_code, 400, url)
+
+    def test_notifications_of_another_user(self):
+        for method, url in (("get", "/api/notifications/inbox/"), ("get", "/api/notifications/unreadcount/"),
+                            ("post", "/api/notifications/markallseen/"),
+                            ("get", "/api/async/notifications/inbox/")):
+            response = getattr(self.client, method)(f"{url}?uid={self.other.id}")
+            self.assertEqual(response.status_code, 403, url)
+        self.assertFalse(Notification.objects.get(message="other").seen)
+
+        self.user.is_staff = True
+        self.user.save()
+        response = self.client.get(f"/api/notifications/unreadcount/?uid={self.other.id}")
+        self.assertEqual(response.data["count"], 1)
+
+    def test_invalid_cursor(self):
+        self.assertEqual(self.client.get("/api/notifications/inbox/?cursor=abc").status_code, 404)
+        for values in (["x", "y", "z"], [False, "yesterday", 1], [False, "2020-01-01T00:00:00Z", [1]]):
+            cursor = base64.urlsafe_b64encode(json.dumps(values).encode()).decode()
+            response = self.client.get(f"/api/notifications/inbox/?cursor={cursor}")
+            self.assertEqual(response.status_code, 404, values)
@@ -0,0 +1,49 @@
+import time
+
+from django.test import override_settings
+from rest_framework.test import APIClient
+
+from .. import profiling
+from ..models.teammodel import Team
+from .base import ApiTestCase
+
+
+@override_settings(PROFILING=True)
+class ProfilingTest(ApiTestCase):
+    def setUp(self):
+        super().setUp()
+        profiling.store.reset()
+        self.user.is_staff = True
+        self.user.save()
+        # the middlewares are loaded by the first request of a client
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION="Token " + self.token.key)
+
+    def test_headers_and_report(self):
+        Team.objects.bulk_create([Team(name=f"team {i}", leader=self.user) for i in range(50)])
+        response = self.client.get("/api/teams/")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("X-Queries", response)
+        self.assertIn("render;dur=", response["Server-Timing"])
+
+        report = {row["endpoint"]: row for row in self.client.get("/api/profiling/").data}
+        self.assertEqual(report["TeamViewSet.list"]["requests"], 1)
+        self.assertGreater(report["TeamViewSet.list"]["render_mean"], 0)
+
+    def test_serialization_excludes_the_queries(self):
+        def serialize():
+            time.sleep(0.02)
+            list(Team.objects.all())
+
+        current = profiling.Profile()
+        token = profiling.profile.set(current)
+        try:
+            with profiling.connections["default"].execute_wrapper(current.recorder):
+                profiling.timeserialization(profiling.timeserialization(serialize))()
+        finally:
+            profiling.profile.reset(token)
+
+        self.assertEqual(current.recorder.count, 1)
+        self.assertGreaterEqual(current.serialization, 0.02)
+        self.assertLess(current.serialization, 0.02 + 0.015)
@@ -0,0 +1,42 @@
+import asyncio
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.test import SimpleTestCase
+
+from ..models.notificationmodel import Notification
+from ..push.brokers import InProcessBroker
+from ..services import notify
+from .base import ApiTestCase
+
+
+class InProcessBrokerTest(SimpleTestCase):
+    def test_publish(self):
+        broker = InProcessBroker()
+
+        async def receive():
+            subscription = await broker.subscribe("tournament.1")
+            other = await broker.subscribe("tournament.2")
+            broker.publish("tournament.1", {"type": "match", "id": 3})
+            message = await asyncio.wait_for(subscription.get(), 1)
+            self.assertTrue(other.queue.empty())
+            await subscription.close()
+            await other.close()
+            return message
+
+        self.assertEqual(asyncio.run(receive()), {"type": "match", "id": 3})
+        self.assertEqual(dict(broker.subscriptions), {})
+
+
+class PublishNotificationTest(ApiTestCase):
+    def test_pushed_notifications_have_their_id(self):
+        Notification.objects.create(message="hello", user=self.user, creationDate="2020-01-01T00:00:00Z")
+        users = [self.user] + [User.objects.create_user(f"user {i}") for i in range(3)]
+
+        with mock.patch("backend.api.services.notificationservice.publishnotification") as publish:
+            notify([user.id for user in users], "hello")
+
+        pushed = [(call.args[0].id, call.args[0].user_id) for call in publish.call_args_list]
+        self.assertEqual(sorted(pushed), sorted(Notification.objects.filter(
+            creationDate__gt="2020-01-01T00:00:00Z").values_list("id", "user_id")))
+        self.assertEqual(len(pushed), 4)
@@ -0,0 +1,71 @@
+from datetime import date, timedelta
+
+from ..models.notificationmodel import Notification
+from ..models.teammodel import Team
+from .base import ApiTestCase
+
+
+class RegistrationTest(ApiTestCase):
+    def setUp(self):
+        super().setUp()
+        self.tournament, self.registered = self.maketournament(1, deadLineDate=date.today())
+        self.tournament.nbTeam = 3
+        self.tournament.save()
+        self.teams = [Team.objects.create(name=f"new {i}", leader=self.user) for i in range(3)]
+        for team in self.teams:
+            team.members.add(self.user)
+
+    def register(self, teams):
+        return self.client.post(f"/api/tournaments/{self.tournament.id}/registerteams/",
+                                {"teamids": [team.id for team in teams]}, format="json")
+
+    def test_register_until_the_deadline_day(self):
+        response = self.register(self.teams[:2] + self.registered)
+
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertEqual([team["id"] for team in response.data["registered"]], [team.id for team in self.teams[:2]])
+        self.assertEqual(self.tournament.teams.count(), 3)
+        # the members of the new teams
+        self.assertEqual(Notification.objects.filter(user=self.user).count(), 2)
+
+    def test_full(self):
+        response = self.register(self.teams)
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.tournament.teams.count(), 1)
+
+    def test_deadline_over(self):
+        self.tournament.deadLineDate = date.today() - timedelta(days=1)
+        self.tournament.save()
+
+        self.assertEqual(self.register(self.teams[:1]).status_code, 400)
+
+    def test_bracket_generated_after_the_deadline_day(self):
+        self.register(self.teams[:1])
+        response = self.client.post(f"/api/tournaments/{self.tournament.id}/generatebracket/")
+        self.assertEqual(response.status_code, 400)
+
+        self.tournament.deadLineDate = date.today() - timedelta(days=1)
+        self.tournament.save()
+        self.assertEqual(self.client.post(f"/api/tournaments/{self.tournament.id}/generatebracket/").status_code, 200)
+
+        # even if the deadline is moved afterwards
+        self.tournament.deadLineDate = date.today()
+        self.tournament.save()
+        response = self.register(self.teams[1:2])
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data["message"], "The bracket of this tournament is already generated.")
+
+    def test_add_team(self):
+        response = self.client.post(f"/api/tournaments/{self.tournament.id}/addTeam/", {"teamid": self.teams[0].id},
+                                    format="json")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.client.post(f"/api/tournaments/{self.tournament.id}/addTeam/", {"teamid": "a"},
+                                          format="json").status_code, 400)
+
+    def test_unknown(self):
+        self.assertEqual(self.register([Team(id=999)]).status_code, 400)
+        self.assertEqual(self.client.post("/api/tournaments/999/registerteams/", {"teamids": []},
+                                          format="json").status_code, 404)
+        self.assertEqual(self.client.post("/api/tournaments/abc/registerteams/", {"teamids": []},
+                                          format="json").status_code, 404)
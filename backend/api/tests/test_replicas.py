@@ -0,0 +1,87 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.test import override_settings
+from rest_framework.response import Response
+from rest_framework.test import APIRequestFactory
+
+from ..cache import cachedresponse
+from ..dbrouter import ReplicaMiddleware, clientkey, replicareading, replicareads
+from ..services.bracketservice import getbracket
+from ..views.tournamentview import TournamentViewSet
+from .base import ApiTestCase
+
+
+class CachedView:
+    def __init__(self):
+        self.reads = []
+
+    @cachedresponse("CachedView.get", lambda request: [("tournaments", "all")])
+    def get(self, request):
+        self.reads.append(replicareads.get())
+        return Response({"replica": replicareads.get()})
+
+
+class ReplicaTest(ApiTestCase):
+    def setUp(self):
+        super().setUp()
+        self.request = APIRequestFactory().get("/api/tournaments/")
+
+    def test_cached_responses_are_read_from_the_primary(self):
+        view = CachedView()
+        token = replicareads.set(True)
+        try:
+            first = view.get(self.request)
+            second = view.get(self.request)
+        finally:
+            replicareads.reset(token)
+
+        self.assertEqual(view.reads, [False])
+        self.assertEqual((first["X-Cache"], second["X-Cache"]), ("MISS", "HIT"))
+
+    def test_bracket_is_built_from_the_primary(self):
+        tournament, teams = self.maketournament(2)
+        self.client.post(f"/api/tournaments/{tournament.id}/generatebracket/")
+        reads = []
+
+        def buildrounds(tournamentId, request):
+            reads.append(replicareads.get())
+            return {"rounds": []}
+
+        token = replicareads.set(True)
+        try:
+            with mock.patch("backend.api.services.bracketservice.buildrounds", buildrounds):
+                getbracket(tournament.id, self.request)
+        finally:
+            replicareads.reset(token)
+        self.assertEqual(reads, [False])
+
+    @override_settings(DATABASE_REPLICAS=["replica"])
+    def test_pinned_client_reads_from_the_primary(self):
+        with replicareading(self.request):
+            self.assertTrue(replicareads.get())
+
+        cache.set(clientkey(self.request), True)
+        with replicareading(self.request):
+            self.assertFalse(replicareads.get())
+
+    @override_settings(DATABASE_REPLICAS=["replica"])
+    def test_middleware_routes_the_reads_of_the_view(self):
+        view = TournamentViewSet.as_view({"get": "list", "post": "create"})
+        reads = []
+
+        def getresponse(request):
+            # Django calls the view after the process_view of every middleware
+            self.assertIsNone(middleware.process_view(request, view, (), {}))
+            reads.append(replicareads.get())
+            return HttpResponse()
+
+        middleware = ReplicaMiddleware(getresponse)
+        middleware(self.request)
+        middleware(APIRequestFactory().post("/api/tournaments/"))
+        # the client has written : pinned to the primary
+        middleware(self.request)
+
+        self.assertEqual(reads, [True, False, False])
+        self.assertFalse(replicareads.get())
@@ -0,0 +1,52 @@
+import gzip
+import json
+import os
+import tempfile
+from datetime import timedelta
+
+from django.utils import timezone
+
+from ..models.notificationarchivemodel import NotificationArchive
+from ..models.notificationmodel import Notification
+from ..services.retentionservice import FileArchive, TableArchive, archivenotifications
+from .base import ApiTestCase
+
+
+class RetentionTest(ApiTestCase):
+    def setUp(self):
+        super().setUp()
+        now = timezone.now()
+        old = now - timedelta(days=100)
+        Notification.objects.bulk_create(
+            [Notification(message=f"old {i}", seen=True, user=self.user, creationDate=old) for i in range(5)]
+            + [Notification(message="unseen", seen=False, user=self.user, creationDate=old),
+               Notification(message="recent", seen=True, user=self.user, creationDate=now)])
+
+    def test_table_archive(self):
+        progress = list(archivenotifications(TableArchive(), batchSize=2))
+
+        self.assertEqual([count for count, lastId in progress], [2, 2, 1])
+        self.assertEqual(sorted(Notification.objects.values_list("message", flat=True)), ["recent", "unseen"])
+        self.assertEqual(NotificationArchive.objects.count(), 5)
+        # a second run has nothing left to archive
+        self.assertEqual(list(archivenotifications(TableArchive())), [])
+
+    def test_resume(self):
+        run = archivenotifications(TableArchive(), batchSize=2)
+        count, lastId = next(run)
+        run.close()
+
+        self.assertEqual(sum(count for count, lastId in archivenotifications(TableArchive(), fromId=lastId)), 3)
+        self.assertEqual(NotificationArchive.objects.count(), 5)
+
+    def test_file_archive(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "notifications.ndjson.gz")
+            archive = FileArchive(path)
+            list(archivenotifications(archive))
+            archive.close()
+
+            with gzip.open(path, "rt", encoding="utf-8") as file:
+                rows = [json.loads(line) for line in file]
+        self.assertEqual(sorted(row["message"] for row in rows), [f"old {i}" for i in range(5)])
+        self.assertFalse(NotificationArchive.objects.exists())
@@ -0,0 +1,57 @@
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.utils import timezone
+
+from ..models.matchmodel import Match
+from .base import ApiTestCase
+
+
+class ScheduleTest(ApiTestCase):
+    def setUp(self):
+        super().setUp()
+        self.tournament, self.teams = self.maketournament(8)
+        self.referees = [User.objects.create_user(f"referee {i}") for i in range(2)]
+        self.tournament.referees.add(*self.referees)
+        self.client.post(f"/api/tournaments/{self.tournament.id}/generatebracket/")
+        self.start = (timezone.now() + timedelta(days=1)).replace(microsecond=0)
+
+    def schedule(self, **data):
+        return self.client.post(f"/api/tournaments/{self.tournament.id}/schedule/", data, format="json")
+
+    def test_schedule(self):
+        response = self.schedule(slots=2, start=self.start.isoformat())
+        self.assertEqual(response.status_code, 200, response.content)
+
+        matches = {match.idInTournament: match for match in Match.objects.filter(tournament=self.tournament)}
+        step = timedelta(minutes=self.tournament.matchDuration + self.tournament.breakDuration)
+        self.assertEqual(min(match.startTime for match in matches.values()), self.start)
+        for match in matches.values():
+            # a match starts after the matches of its teams
+            if match.idParent is not None:
+                self.assertGreaterEqual(matches[match.idParent].startTime, match.startTime + step)
+            # 2 matches at most at the same time, each with its slot and referee
+            concurrent = [other for other in matches.values() if other.startTime == match.startTime]
+            self.assertLessEqual(len(concurrent), 2)
+            self.assertEqual(len({other.slot for other in concurrent}), len(concurrent))
+            self.assertEqual(len({other.referee_id for other in concurrent}), len(concurrent))
+
+    def test_results_reschedule_the_next_matches(self):
+        self.schedule(slots=1, start=(timezone.now() - timedelta(hours=1)).isoformat())
+        first = Match.objects.filter(tournament=self.tournament, roundNb=3).order_by("startTime").first()
+        planned = Match.objects.get(tournament=self.tournament, idInTournament=first.idParent).startTime
+
+        self.client.put(f"/api/matchs/{first.id}/updatematchscores/", {"score1": 1, "score2": 0}, format="json")
+
+        # the matches not played yet start from now
+        self.assertNotEqual(Match.objects.get(tournament=self.tournament, idInTournament=first.idParent).startTime,
+                            planned)
+        self.assertTrue(all(match.startTime >= timezone.now() - timedelta(minutes=1) for match in
+                            Match.objects.filter(tournament=self.tournament, score1__isnull=True)))
+
+    def test_invalid_schedule(self):
+        self.assertEqual(self.schedule(slots=0).status_code, 400)
+        self.assertEqual(self.schedule(slots="a").status_code, 400)
+        self.assertEqual(self.schedule(start="tomorrow").status_code, 400)
+        self.assertEqual(self.client.post("/api/tournaments/999/schedule/").status_code, 404)
+        self.assertEqual(self.client.post("/api/tournaments/abc/schedule/").status_code, 404)
@@ -0,0 +1,36 @@
+from ..models.teammodel import Team
+from ..services.searchservice import RANKED_MATCHES, indexobjects, search
+from .base import ApiTestCase
+
+
+class SearchTest(ApiTestCase):
+    def setUp(self):
+        super().setUp()
+        Team.objects.bulk_create([Team(name=f"squad {i}", leader=self.user) for i in range(RANKED_MATCHES + 100)])
+        self.last = Team.objects.create(name="squad", leader=self.user)
+        indexobjects("teams")
+
+    def test_matches_past_the_ranked_ones(self):
+        found = []
+        while True:
+            entries = search("squad", ["teams"], len(found), 500)
+            found += [entry.objectId for entry in entries]
+            if len(entries) < 500:
+                break
+
+        self.assertEqual(len(found), RANKED_MATCHES + 101)
+        self.assertEqual(set(found), set(Team.objects.values_list("id", flat=True)))
+        self.assertIn(self.last.id, found)
+
+    def test_every_word_must_match(self):
+        self.assertEqual([entry.name for entry in search("squad 2050")], ["squad 2050"])
+        self.assertEqual(search("squad", ["users"]), [])
+
+    def test_view(self):
+        response = self.client.get("/api/search/?q=squad 20&page_size=5")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data["results"]), 5)
+        self.assertIsNotNone(response.data["next"])
+        self.assertEqual(self.client.get("/api/search/?q=!").status_code, 400)
+        self.assertEqual(self.client.get("/api/search/?q=squad&kinds=other").status_code, 400)
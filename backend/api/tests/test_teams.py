@@ -0,0 +1,64 @@
+from django.contrib.auth.models import User
+from django.utils import timezone
+
+from ..models.notificationmodel import Notification
+from ..models.teammodel import Team
+from ..models.teamstatsmodel import TeamStats
+from ..services.matchservice import updatescores
+from .base import ApiTestCase
+
+
+class AddUserTest(ApiTestCase):
+    def setUp(self):
+        super().setUp()
+        self.team = Team.objects.create(name="team", leader=self.user)
+        self.member = User.objects.create_user("member", password="password")
+        self.invitation = Notification.objects.create(
+            message="[Team] join team", notificationType="INVITATION", user=self.member, team=self.team,
+            creationDate=timezone.now())
+
+    def test_accept_invitation(self):
+        response = self.client.post(f"/api/teams/{self.team.id}/adduser/",
+                                    {"userid": self.member.id, "notificationid": self.invitation.id}, format="json")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(self.team.members.filter(id=self.member.id).exists())
+        self.invitation.refresh_from_db()
+        self.assertTrue(self.invitation.seen)
+        self.assertEqual(self.invitation.message, "[Accepted] [Team] join team")
+        # no other notification is sent
+        self.assertEqual(Notification.objects.count(), 1)
+
+    def test_invitation_of_another_user(self):
+        response = self.client.post(f"/api/teams/{self.team.id}/adduser/",
+                                    {"userid": self.user.id, "notificationid": self.invitation.id}, format="json")
+
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(self.team.members.filter(id=self.member.id).exists())
+
+
+class StatsTest(ApiTestCase):
+    def test_team_without_result(self):
+        team = Team.objects.create(name="team", leader=self.user)
+
+        response = self.client.get(f"/api/teams/{team.id}/stats/")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((response.data["teamName"], response.data["played"]), ("team", 0))
+        # reading the statistics doesn't create them
+        self.assertFalse(TeamStats.objects.exists())
+
+    def test_results_and_leaderboard(self):
+        tournament, teams = self.maketournament(2)
+        self.client.post(f"/api/tournaments/{tournament.id}/generatebracket/")
+        final = tournament.match_set.get()
+        updatescores(tournament.id, [{"id": final.id, "score1": 3, "score2": 1}])
+
+        stats = self.client.get(f"/api/teams/{final.team1_id}/stats/").data
+        self.assertEqual((stats["played"], stats["wins"], stats["scoreFor"]), (1, 1, 3))
+        self.assertGreater(stats["rating"], self.client.get(f"/api/teams/{final.team2_id}/stats/").data["rating"])
+        leaderboard = self.client.get("/api/teams/leaderboard/").data
+        self.assertEqual([row["team"] for row in leaderboard], [final.team1_id, final.team2_id])
+
+    def test_unknown_team(self):
+        self.assertEqual(self.client.get("/api/teams/999/stats/").status_code, 404)
@@ -0,0 +1,41 @@
+import time
+
+from django.test import override_settings
+from rest_framework.test import APIClient
+
+from .base import ApiTestCase
+
+HOME = "/api/tournaments/tournamentsforhome/"
+
+
+class ThrottlingTest(ApiTestCase):
+    def test_user_bucket(self):
+        statuses = [self.client.get(HOME).status_code for _ in range(11)]
+
+        # the burst of the expensive budget
+        self.assertEqual(statuses, [200] * 10 + [429])
+        response = self.client.get(HOME)
+        self.assertGreaterEqual(int(response["Retry-After"]), 1)
+        # the other actions have their own bucket
+        self.assertEqual(self.client.get("/api/tournaments/").status_code, 200)
+
+    def test_spoofed_forwarded_for(self):
+        client = APIClient()
+        statuses = [client.get(HOME, HTTP_X_FORWARDED_FOR=f"10.0.0.{i}").status_code for i in range(6)]
+
+        # the addresses sent by the client share the bucket of its address
+        self.assertEqual(statuses, [200] * 5 + [429])
+
+    @override_settings(THROTTLING=None)
+    def test_disabled(self):
+        self.assertEqual({self.client.get(HOME).status_code for _ in range(12)}, {200})
+
+
+class LoadSheddingTest(ApiTestCase):
+    def test_queued_too_long(self):
+        response = self.client.get("/api/tournaments/", HTTP_X_REQUEST_START=f"t={int((time.time() - 5) * 1000)}")
+
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response["Retry-After"], "1")
+        self.assertEqual(self.client.get("/api/tournaments/", HTTP_X_REQUEST_START=f"t={time.time()}").status_code,
+                         200)
@@ -0,0 +1,73 @@
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIRequestFactory
+
+from ..models.teammodel import Team
+from ..models.tournamentmodel import Tournament
+from ..readserializers import TournamentReadSerializer
+from ..serializers import TournamentSerializer
+from .base import ApiTestCase
+
+HOME = "/api/tournaments/tournamentsforhome/"
+
+
+class TournamentsForHomeTest(ApiTestCase):
+    def queries(self, url):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(context.captured_queries)
+
+    def test_constant_number_of_queries(self):
+        self.maketournament(2)
+        # the token is cached by the first request
+        self.queries(HOME)
+        few = self.queries(f"{HOME}?uid={self.user.id}")
+        for _ in range(4):
+            self.maketournament(3)
+        self.assertEqual(self.queries(f"{HOME}?uid={self.user.id}"), few)
+
+    def test_flags(self):
+        tournament, teams = self.maketournament(2)
+        teams[0].members.add(self.user)
+        Tournament.objects.filter(pk=tournament.pk).update(nbTeam=4)
+
+        data = self.client.get(f"{HOME}?uid={self.user.id}").data[0]
+        self.assertEqual((data["isLeader"], data["isParticipating"], data["isDeadLineOver"]), (True, True, True))
+        data = self.client.get(HOME).data[0]
+        self.assertEqual((data["isLeader"], data["isParticipating"]), (False, False))
+
+        # a tournament without a team of the user
+        other = User.objects.create_user("other")
+        tournament, teams = self.maketournament(2)
+        Team.objects.filter(id__in=[team.id for team in teams]).update(leader=other)
+        data = self.client.get(f"{HOME}?uid={self.user.id}").data
+        self.assertEqual([row["isLeader"] for row in data], [True, False])
+
+    def test_dates(self):
+        tournament, teams = self.maketournament(2)
+        day = tournament.deadLineDate.isoformat()
+
+        self.assertEqual(len(self.client.get(f"{HOME}?from={day}&to={day}").data), 1)
+        self.assertEqual(len(self.client.get(f"{HOME}?to=2000-01-01").data), 0)
+        self.assertEqual(self.client.get(f"{HOME}?from=yesterday").status_code, 400)
+
+
+class ReadSerializerTest(ApiTestCase):
+    def test_same_data_as_the_serializer(self):
+        self.maketournament(2)
+        self.maketournament(3)
+        request = APIRequestFactory().get("/api/tournaments/")
+        tournaments = Tournament.objects.order_by("id")
+
+        expected = [dict(data) for data in TournamentSerializer(tournaments, many=True,
+                                                                context={"request": request}).data]
+        self.assertEqual(TournamentReadSerializer(request).serialize(tournaments), expected)
+
+    def test_selected_fields(self):
+        self.maketournament(2)
+
+        response = self.client.get("/api/tournaments/?fields=id,name")
+        self.assertEqual(set(response.data[0]), {"id", "name"})
+        self.assertEqual(self.client.get("/api/tournaments/?fields=unknown").status_code, 400)
@@ -0,0 +1,192 @@
+"""
+    Throttling of the api with token buckets, and load shedding.
+
+    Every action of a view (e.g. "MatchViewSet.getmatchsbytournament") has a
+    bucket per authenticated user, the anonymous clients have a bucket per
+    IP (REMOTE_ADDR, or the address set by the proxies in X-Forwarded-For
+    with the setting NUM_PROXIES of REST_FRAMEWORK). The size of a bucket
+    (the burst) and the requests per second refilled come from the budget
+    of the action (setting THROTTLING) : the cheap reads, the writes or an
+    own budget for the expensive actions (e.g.
+    "TournamentViewSet.tournamentsforhome"). An empty bucket answers 429
+    with the seconds before the next token in the header Retry-After.
+
+    A bucket is a single value in the cache : the time it's full again (the
+    "generic cell rate algorithm"), which expires when the bucket is full.
+    The cache must be shared by the processes serving the api, the updates
+    of a bucket are atomic in a process only : the concurrent requests of a
+    client served by several processes may take a few more tokens.
+
+    The load shedding (setting LOAD_SHEDDING) answers 429 at once when the
+    process already serves too many requests or when a request waited too
+    long in the queue of the server, rather than queueing the requests of
+    the overloaded server.
+"""
+
+import asyncio
+import math
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import JsonResponse
+from rest_framework import status
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.throttling import BaseThrottle
+
+from .profiling import getendpoint
+
+lock = threading.Lock()
+
+
+def budgetof(endpoint, method):
+    """
+        Name of the budget of an endpoint : its own budget if it has one,
+        "read" or "write" otherwise.
+    """
+    budget = settings.THROTTLING.get("ACTIONS", {}).get(endpoint, None)
+    if budget is not None:
+        return budget
+    return "read" if method in SAFE_METHODS else "write"
+
+
+def take(key, rate, burst, now=None):
+    """
+        Take a token from the bucket "key" refilled with rate tokens per
+        second. Return 0 if a token was taken, else the seconds before the
+        next token.
+    """
+    cache = caches[settings.THROTTLING.get("CACHE", "default")]
+    now = time.time() if now is None else now
+    interval = 1 / rate
+    with lock:
+        full = max(cache.get(key, now), now)
+        # the bucket holds burst - (full - now) / interval tokens
+        wait = full - now - (burst - 1) * interval
+        if wait > 0:
+            return wait
+        full += interval
+        cache.set(key, full, math.ceil(full - now))
+    return 0
+
+
+def throttle(request, endpoint):
+    """
+        Take a token from the bucket of the client of a DRF request for the
+        endpoint. Return 0 if the request is allowed, else the seconds
+        before the client can retry.
+    """
+    config = getattr(settings, "THROTTLING", None)
+    if not config:
+        return 0
+    budget = budgetof(endpoint, request.method)
+    if request.user.is_authenticated:
+        scope, ident = "user", request.user.pk
+    else:
+        scope, ident = "ip", BaseThrottle().get_ident(request)
+
+    limit = config["BUDGETS"][budget].get(scope, None)
+    if limit is None:
+        return 0
+    rate, burst = limit
+    return take(f"throttle:{endpoint}:{scope}:{ident}", rate, burst)
+
+
+class BucketThrottle(BaseThrottle):
+    """
+        DRF throttle taking a token from the bucket of the client for the
+        action of the view (see DEFAULT_THROTTLE_CLASSES).
+    """
+
+    def allow_request(self, request, view):
+        self.delay = throttle(request, getendpoint(request))
+        return self.delay == 0
+
+    def wait(self):
+        # Retry-After is a number of seconds, at least 1
+        return math.ceil(self.delay)
+
+
+def queuetime(request):
+    """
+        Seconds the request waited in the server before Django, from the
+        header X-Request-Start set by the proxy ("t=<time>" in seconds,
+        milliseconds or microseconds), None without the header.
+    """
+    start = request.META.get("HTTP_X_REQUEST_START", "")
+    try:
+        start = float(start[2:] if start.startswith("t=") else start)
+    except ValueError:
+        return None
+    while start > 1e11:
+        start /= 1000
+    return max(time.time() - start, 0)
+
+
+class LoadSheddingMiddleware:
+    """
+        Answer 429 at once when the process serves MAX_CONCURRENT_REQUESTS
+        requests or when a request waited more than MAX_QUEUE_SECONDS in the
+        queue of the server. First of the middlewares, and async capable, so
+        under ASGI the requests are shed before they wait for a thread.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        config = getattr(settings, "LOAD_SHEDDING", None)
+        if not config:
+            raise MiddlewareNotUsed()
+        self.get_response = get_response
+        self.maxRequests = config.get("MAX_CONCURRENT_REQUESTS", None)
+        self.maxQueue = config.get("MAX_QUEUE_SECONDS", None)
+        self.retryAfter = config.get("RETRY_AFTER", 1)
+        self.lock = threading.Lock()
+        self.requests = 0
+        if asyncio.iscoroutinefunction(get_response):
+            # seen as a coroutine function by Django (like MiddlewareMixin)
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+
+    def admit(self, request):
+        """
+            Count the request in the requests served, return False if it's shed.
+        """
+        if self.maxQueue is not None:
+            queued = queuetime(request)
+            if queued is not None and queued > self.maxQueue:
+                return False
+        with self.lock:
+            if self.maxRequests is not None and self.requests >= self.maxRequests:
+                return False
+            self.requests += 1
+        return True
+
+    def release(self):
+        with self.lock:
+            self.requests -= 1
+
+    def shed(self):
+        response = JsonResponse({"message": "the server is overloaded, retry later"},
+                                status=status.HTTP_429_TOO_MANY_REQUESTS)
+        response["Retry-After"] = str(self.retryAfter)
+        return response
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self.get_response):
+            return self.acall(request)
+        if not self.admit(request):
+            return self.shed()
+        try:
+            return self.get_response(request)
+        finally:
+            self.release()
+
+    async def acall(self, request):
+        if not self.admit(request):
+            return self.shed()
+        try:
+            return await self.get_response(request)
+        finally:
+            self.release()
@@ -4,3 +4,10 @@ from .notificationview import NotificationViewSet
 from .teamview import TeamViewSet
 from .tournamentview import TournamentViewSet
 from .tokenview import TokenViewSet
+from .profilingview import ProfilingView
+from .cacheview import CacheView
+from .imageview import imagefile
+from .exportview import ExportView
+from .searchview import SearchView
+from .batchview import BatchView
+from .asyncview import asyncbracket, asyncinbox, asyncmatches, asynctournaments
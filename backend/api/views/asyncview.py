@@ -0,0 +1,158 @@
+"""
+    Async versions of the most requested read endpoints, for the ASGI
+    application (see backend/asgi.py). They return the same data as :
+      * /api/async/tournaments/ : TournamentViewSet.list
+      * /api/async/tournaments/<id>/bracket/ : TournamentViewSet.bracket
+      * /api/async/matchs/getmatchsbytournament/?tid=<id> : MatchViewSet.getmatchsbytournament
+      * /api/async/notifications/inbox/ : NotificationViewSet.inbox
+
+    The ORM is synchronous : every blocking call of a request (token, cache,
+    queries and serialization) is made by a single function run in the
+    thread pool, so a request hops to a thread once instead of once per
+    call, and no thread is held while the request waits for the database
+    pool or for the client. Under ASGI the synchronous views of Django run
+    one at a time in a single thread, these ones run in parallel.
+"""
+
+import math
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.db import close_old_connections
+from django.http import HttpResponseNotAllowed, JsonResponse
+from rest_framework import status
+from rest_framework.exceptions import APIException, NotAuthenticated, Throttled
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+
+from ..cache import RESPONSE_TIMEOUT, responsekey, stats
+from ..dbrouter import replicareading
+from ..models.matchmodel import Match
+from ..models.notificationmodel import Notification
+from ..models.tournamentmodel import Tournament
+from ..pagination import NotificationPagination
+from ..readserializers import MatchReadSerializer, TournamentReadSerializer
+from ..serializers import NotificationSerializer
+from ..services import getbracket
+from ..throttling import throttle
+from .notificationview import owneruserid
+
+
+def blocking(function):
+    """
+        Make an async view of function(request, ...), run in the thread pool
+        with a DRF request (query_params, authenticated user), throttled like
+        the other views (see throttling.py). The APIException are returned as
+        their DRF response.
+    """
+    endpoint = f"{function.__name__}.get"
+
+    def run(request, *args, **kwargs):
+        # the connections of the pool threads are closed or kept like at the end of a request
+        close_old_connections()
+        request = Request(request, authenticators=[authentication() for authentication
+                                                   in api_settings.DEFAULT_AUTHENTICATION_CLASSES])
+        try:
+            wait = throttle(request, endpoint)
+            if wait:
+                raise Throttled(math.ceil(wait))
+            return function(request, *args, **kwargs)
+        except APIException as error:
+            response = JsonResponse({"detail": error.detail}, status=error.status_code)
+            if error.status_code == status.HTTP_401_UNAUTHORIZED:
+                response["WWW-Authenticate"] = request.authenticators[0].authenticate_header(request)
+            if getattr(error, "wait", None):
+                response["Retry-After"] = "%d" % error.wait
+            return response
+        finally:
+            close_old_connections()
+
+    run = sync_to_async(run, thread_sensitive=False)
+
+    @wraps(function)
+    async def view(request, *args, **kwargs):
+        if request.method not in ("GET", "HEAD"):
+            return HttpResponseNotAllowed(["GET", "HEAD"])
+        return await run(request, *args, **kwargs)
+    return view
+
+
+def readserializer(request, serializerClass):
+    """
+        The read serializer of the fields selected with the GET parameter
+        "fields" (see ReadSerializerMixin).
+        Raise ValueError if a field doesn't exist.
+    """
+    fields = request.query_params.get("fields", None)
+    if fields is not None:
+        fields = [name.strip() for name in fields.split(",") if name.strip()]
+    return serializerClass(request, fields)
+
+
+@blocking
+def asynctournaments(request):
+    """
+        Get every tournament, cached until a tournament is modified.
+    """
+    key = responsekey("async.tournaments", request, [("tournaments", "all")])
+    data = cache.get(key)
+    stats.add("async.tournaments", data is not None)
+    hit = data is not None
+
+    if not hit:
+        try:
+            serializer = readserializer(request, TournamentReadSerializer)
+        except ValueError as error:
+            return JsonResponse({"message": str(error)}, status=status.HTTP_400_BAD_REQUEST)
+        # cached : read from the primary (see cache.py)
+        data = serializer.serialize(Tournament.objects.all())
+        cache.set(key, data, RESPONSE_TIMEOUT)
+
+    response = JsonResponse(data, safe=False)
+    response["X-Cache"] = "HIT" if hit else "MISS"
+    return response
+
+
+@blocking
+def asyncbracket(request, pk):
+    """
+        Get the bracket of a tournament (see TournamentViewSet.bracket).
+    """
+    bracket = getbracket(pk, request)
+    if bracket is None:
+        return JsonResponse({"message": "tournament not found"}, status=status.HTTP_404_NOT_FOUND)
+    return JsonResponse(bracket)
+
+
+@blocking
+def asyncmatches(request):
+    """
+        Get all matches of a tournament.
+        The tournament id is passed as GET parameter "tid".
+    """
+    tid = request.query_params.get("tid", None)
+    if tid is None:
+        return JsonResponse({"message": "tid is not defined"})
+
+    try:
+        serializer = readserializer(request, MatchReadSerializer)
+    except ValueError as error:
+        return JsonResponse({"message": str(error)}, status=status.HTTP_400_BAD_REQUEST)
+    with replicareading(request):
+        return JsonResponse(serializer.serialize(Match.objects.filter(tournament=tid)), safe=False)
+
+
+@blocking
+def asyncinbox(request):
+    """
+        Get a page of the notifications of a user, the unseen first
+        (see NotificationViewSet.inbox). Always read from the primary.
+    """
+    if not request.user.is_authenticated:
+        raise NotAuthenticated()
+
+    pagination = NotificationPagination()
+    page = pagination.paginate_queryset(Notification.objects.filter(user=owneruserid(request)), request)
+    data = NotificationSerializer(page, many=True, context={"request": request}).data
+    return JsonResponse({"next": pagination.get_next_link(), "results": data})
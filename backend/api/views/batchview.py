@@ -0,0 +1,144 @@
+import io
+import json
+import logging
+import time
+from contextlib import nullcontext
+from urllib.parse import urlsplit
+
+from django.core.handlers.wsgi import WSGIRequest
+from django.db import transaction
+from django.urls import Resolver404, resolve
+from rest_framework import status
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from rest_framework.permissions import AllowAny
+from rest_framework.viewsets import ViewSetMixin
+
+logger = logging.getLogger(__name__)
+
+MAX_BATCH_SIZE = 20
+METHODS = ("GET", "POST", "PUT", "PATCH", "DELETE")
+
+
+class BatchError(Exception):
+    pass
+
+
+class BatchView(APIView):
+    """
+        Several requests to the routes of the router (/api/tournaments/...,
+        /api/teams/..., see backend/urls.py) in a single round trip.
+    """
+    permission_classes = (AllowAny,)
+
+    def post(self, request):
+        """
+            Run the sub-requests passed in the field "requests", in order :
+            [{"method": "GET", "url": "/api/tournaments/3/"},
+             {"method": "POST", "url": "/api/...", "body": {...}}, ...]
+            The url is a path or an absolute url (its host is ignored).
+            The client is authenticated once, every sub-request is run as
+            this client.
+
+            With "atomic": true (a JSON boolean), the sub-requests run in a
+            single transaction which is rolled back if one of them fails
+            (status 400 or more), the following ones aren't run.
+
+            Return the response of every sub-request run (status, headers,
+            body and duration in ms) and the total duration.
+        """
+        data = request.data
+        if isinstance(data, list):
+            data = {"requests": data}
+        try:
+            subrequests = [self.parse(item) for item in data.get("requests", None) or []]
+        except (AttributeError, BatchError) as error:
+            message = str(error) if isinstance(error, BatchError) else "requests must be a list of sub-requests"
+            return Response({"message": message}, status=status.HTTP_400_BAD_REQUEST)
+        if not subrequests:
+            return Response({"message": "requests must be a list of sub-requests"},
+                            status=status.HTTP_400_BAD_REQUEST)
+        if len(subrequests) > MAX_BATCH_SIZE:
+            return Response({"message": f"a batch has {MAX_BATCH_SIZE} sub-requests at most"},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        atomic = data.get("atomic", False)
+        if not isinstance(atomic, bool):
+            return Response({"message": "atomic must be true or false"}, status=status.HTTP_400_BAD_REQUEST)
+        started = time.perf_counter()
+        responses = []
+        rolledBack = False
+        with transaction.atomic() if atomic else nullcontext():
+            for subrequest in subrequests:
+                responses.append(self.run(request, *subrequest))
+                if atomic and responses[-1]["status"] >= status.HTTP_400_BAD_REQUEST:
+                    transaction.set_rollback(True)
+                    rolledBack = True
+                    break
+
+        response = {
+            "responses": responses,
+            "duration": round((time.perf_counter() - started) * 1000, 3),
+        }
+        if atomic:
+            response["rolledBack"] = rolledBack
+        return Response(response, status=status.HTTP_200_OK)
+
+    def parse(self, item):
+        """
+            Return the method, the path, the query string, the body and the
+            view of a sub-request.
+            Raise BatchError.
+        """
+        if not isinstance(item, dict) or not isinstance(item.get("url", None), str):
+            raise BatchError("every sub-request must have an url")
+        method = str(item.get("method", "GET")).upper()
+        if method not in METHODS:
+            raise BatchError(f"the method must be in {', '.join(METHODS)}")
+
+        url = urlsplit(item["url"])
+        try:
+            match = resolve(url.path)
+        except Resolver404:
+            raise BatchError(f"{url.path} : not found")
+        # the viewsets of the router only (not the batch itself, the exports...)
+        if not issubclass(getattr(match.func, "cls", object), ViewSetMixin):
+            raise BatchError(f"{url.path} : not a route of the router")
+        return method, url.path, url.query, item.get("body", None), match
+
+    def run(self, request, method, path, query, body, match):
+        """
+            Run a sub-request with the view of its route, as the client of
+            the batch.
+        """
+        content = json.dumps(body).encode() if body is not None else b""
+        environ = {key: value for key, value in request.META.items() if not key.startswith("wsgi.")}
+        environ.update({
+            "REQUEST_METHOD": method,
+            "PATH_INFO": path,
+            "SCRIPT_NAME": "",
+            "QUERY_STRING": query,
+            "CONTENT_TYPE": "application/json",
+            "CONTENT_LENGTH": str(len(content)),
+            "wsgi.input": io.BytesIO(content),
+            "wsgi.url_scheme": request.scheme,
+        })
+        subrequest = WSGIRequest(environ)
+        subrequest.resolver_match = match
+        if request.user.is_authenticated:
+            # authenticated once : DRF uses this user instead of the authenticators
+            subrequest._force_auth_user = request.user
+            subrequest._force_auth_token = request.auth
+
+        started = time.perf_counter()
+        try:
+            response = match.func(subrequest, *match.args, **match.kwargs)
+            # the body is embedded in the response of the batch, not rendered
+            headers = {key: value for key, value in response.items() if key != "Content-Type"}
+            result = {"status": response.status_code, "headers": headers, "body": getattr(response, "data", None)}
+        except Exception:
+            logger.exception("Batch sub-request %s %s failed", method, path)
+            result = {"status": status.HTTP_500_INTERNAL_SERVER_ERROR, "headers": {},
+                      "body": {"message": "server error"}}
+        result["duration"] = round((time.perf_counter() - started) * 1000, 3)
+        return {"method": method, "url": path + (f"?{query}" if query else ""), **result}
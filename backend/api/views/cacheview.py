@@ -0,0 +1,24 @@
+from rest_framework import status
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from rest_framework.permissions import IsAdminUser
+
+from ..cache import stats
+
+
+class CacheView(APIView):
+    permission_classes = (IsAdminUser,)
+
+    def get(self, request):
+        """
+            Get the hits, the misses and the hit ratio of the cached
+            responses per view and action (in this process).
+        """
+        return Response(stats.report(), status=status.HTTP_200_OK)
+
+    def delete(self, request):
+        """
+            Reset the counters.
+        """
+        stats.reset()
+        return Response(status=status.HTTP_204_NO_CONTENT)
@@ -0,0 +1,53 @@
+from django.http import StreamingHttpResponse
+from django.utils.dateparse import parse_date
+from rest_framework import status
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from rest_framework.permissions import IsAdminUser
+
+from ..models.tournamentmodel import Tournament
+from ..services import KINDS, exportcsv, exportndjson
+
+
+class ExportView(APIView):
+    permission_classes = (IsAdminUser,)
+
+    def perform_content_negotiation(self, request, force=False):
+        # the export isn't rendered, whatever the client accepts
+        return super().perform_content_negotiation(request, force=True)
+
+    def get(self, request, kind, extension):
+        """
+            Export the data as a stream, without loading it in memory :
+            all.ndjson gives every kind of rows (users, teams, members,
+            tournaments, tournamentteams, referees, matches, standings and
+            notifications) in the order the command importdata loads them,
+            <kind>.ndjson and <kind>.csv give one kind.
+            The tournaments (and their rows) can be restricted to a season
+            with the GET parameters "since" and "until" (deadline dates).
+        """
+        kinds = list(KINDS) if kind == "all" and extension == "ndjson" else [kind]
+        if kinds[0] not in KINDS or extension not in ("ndjson", "csv"):
+            return Response({"message": "unknown export"}, status=status.HTTP_404_NOT_FOUND)
+
+        tournaments = None
+        dates = {}
+        for name, lookup in (("since", "deadLineDate__gte"), ("until", "deadLineDate__lte")):
+            value = request.query_params.get(name, None)
+            if value is not None:
+                try:
+                    dates[lookup] = parse_date(value)
+                except ValueError:
+                    dates[lookup] = None
+                if dates[lookup] is None:
+                    return Response({"message": f"{name} must be a date (YYYY-MM-DD)"},
+                                    status=status.HTTP_400_BAD_REQUEST)
+        if dates:
+            tournaments = Tournament.objects.filter(**dates)
+
+        if extension == "ndjson":
+            response = StreamingHttpResponse(exportndjson(kinds, tournaments), content_type="application/x-ndjson")
+        else:
+            response = StreamingHttpResponse(exportcsv(kind, tournaments), content_type="text/csv")
+        response["Content-Disposition"] = f'attachment; filename="{kind}.{extension}"'
+        return response
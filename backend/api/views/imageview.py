@@ -0,0 +1,16 @@
+"""
+    Serve the stored images. The files are content-addressed (their name is
+    the hash of their content) so they can be cached forever by the browsers
+    and the proxies.
+"""
+
+from django.conf import settings
+from django.views.static import serve
+
+CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
+def imagefile(request, path):
+    response = serve(request, f"images/{path}", document_root=settings.MEDIA_ROOT)
+    response["Cache-Control"] = CACHE_CONTROL
+    return response
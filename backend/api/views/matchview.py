@@ -2,14 +2,19 @@ from rest_framework import status, viewsets
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework.decorators import action
+from django.shortcuts import get_object_or_404
 
 from ..models.matchmodel import Match
 from ..serializers import MatchSerializer
+from ..readserializers import MatchReadSerializer, ReadSerializerMixin
+from ..services import updatescores
+from ..services.matchservice import INVALID
 
 
-class MatchViewSet(viewsets.ModelViewSet):
+class MatchViewSet(ReadSerializerMixin, viewsets.ModelViewSet):
     queryset = Match.objects.all()
     serializer_class = MatchSerializer
+    read_serializer_class = MatchReadSerializer
     permission_classes = (AllowAny,)
 
     @action(methods=["GET"], detail=False)
@@ -24,49 +29,69 @@ class MatchViewSet(viewsets.ModelViewSet):
         # get all matches of a tournament
         if(tid is not None):
             matchs = queryset.filter(tournament=tid)
-            data = self.get_serializer(matchs, many=True).data
-            return Response(data)
+            return self.readresponse(matchs)
 
         return Response({"message": "tid is not defined"})
 
-    @action(methods=["PUT"], detail=True)
+    @action(methods=["PUT"], detail=True, permission_classes=(IsAuthenticated,))
     def updatematchscores(self, request, pk=None):
         """
             Update a match score1 and score2 fields. 
             If the matchs has a parent node in the tournament brackets,
             it's parent team1 or team2 is udpated automatically.
+            If the version of the match is passed, the update is refused when
+            the match has been modified since it was read.
         """
-        permission_classes = (IsAuthenticated,)
+        match = get_object_or_404(Match, pk=pk)
+        result = {
+            "id": match.id,
+            "score1": request.data.get("score1"),
+            "score2": request.data.get("score2"),
+            "version": request.data.get("version"),
+        }
 
-        queryset = Match.objects.all()
-        data = request.data
-
-        if pk is not None:
-
-            serializer = self.serializer_class(
-                data=data, context={'request': request})
-            serializer.is_valid(raise_exception=True)
+        modified, conflicts = updatescores(match.tournament_id, [result])
+        if conflicts:
+            response = {
+                "message": "unable to update match : " + conflicts[0]["message"],
+                "version": conflicts[0]["version"]
+            }
+            # an invalid result is the client's fault, a stale version a concurrent update
+            code = status.HTTP_400_BAD_REQUEST if conflicts[0]["reason"] == INVALID else status.HTTP_409_CONFLICT
+            return Response(response, status=code)
 
-            if serializer.is_valid():
-                match, created = queryset.filter(pk=pk).update_or_create(serializer.validated_data)
-                
-                print("idInTournament = ", match.idInTournament)
+        match = next(m for m in modified if m.id == match.id)
+        return Response(self.get_serializer(match).data, status=status.HTTP_200_OK)
 
-                # update parent
-                if match.idParent is not None:
-                    parent = queryset.filter(tournament=match.tournament).filter(
-                        idInTournament=int(match.idParent))[0]
-                    
-                    if parent.idInTournament * 2 == match.idInTournament:
-                        parent.team1 = match.team1 if match.score1 > match.score2 else match.team2
-                    else:
-                        parent.team2 = match.team1 if match.score1 > match.score2 else match.team2
+    @action(methods=["POST"], detail=False, permission_classes=(IsAuthenticated,))
+    def updatescores(self, request, pk=None):
+        """
+            Update the scores of many matches of a tournament at once.
+            The request contains the field "tournament" (id) and the field
+            "results" : a list of {"id", "score1", "score2", "version"}
+            (the version is optional).
+            Everything is applied in a single transaction and the winners are
+            propagated in the bracket. The rejected results are returned in
+            "conflicts" with the reason ("notfound", "duplicate", "stale" or
+            "invalid"), a message and the current version of the match.
+        """
+        tournament = request.data.get("tournament", None)
+        results = request.data.get("results", None)
 
-                    parent.save()
+        if tournament is None or not isinstance(results, list):
+            response = {
+                "message": "tournament and results are required"
+            }
+            return Response(response, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            tournament = int(tournament)
+        except (TypeError, ValueError):
+            return Response({"message": "tournament must be the id of a tournament"},
+                            status=status.HTTP_400_BAD_REQUEST)
 
-                return Response(self.get_serializer(match).data, status=status.HTTP_200_OK)
-            else:
-                response = {
-                    "message": "unable to update match"
-                }
-                return Response(response, status=status.HTTP_400_BAD_REQUEST)
+        modified, conflicts = updatescores(tournament, results)
+        response = {
+            "updated": self.get_serializer(modified, many=True).data,
+            "conflicts": conflicts
+        }
+        return Response(response, status=status.HTTP_200_OK)
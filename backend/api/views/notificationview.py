@@ -2,17 +2,51 @@ from rest_framework import viewsets, status
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework.decorators import action
+from rest_framework.exceptions import ParseError, PermissionDenied
 from rest_framework.response import Response
 
 from ..models.notificationmodel import Notification
 from ..serializers import NotificationSerializer
+from ..readserializers import NotificationReadSerializer, ReadSerializerMixin
+from ..pagination import NotificationPagination
 from django.utils import timezone 
 
 
-class NotificationViewSet(viewsets.ModelViewSet):
+def userid(request, default=None):
+    """
+        The user id passed as GET parameter "uid" (default if there's none).
+        Raise ParseError (400) if it isn't a number.
+    """
+    uid = request.query_params.get("uid", None)
+    if uid is None:
+        return default
+    try:
+        return int(uid)
+    except ValueError:
+        raise ParseError("uid must be the id of a user")
+
+
+def owneruserid(request):
+    """
+        The user id passed as GET parameter "uid" (the logged user by
+        default) : only the logged user, or an admin, reads and modifies
+        its notifications.
+        Raise ParseError (400) or PermissionDenied (403).
+    """
+    uid = userid(request, request.user.id)
+    if uid != request.user.id and not request.user.is_staff:
+        raise PermissionDenied("the notifications of another user are private")
+    return uid
+
+
+class NotificationViewSet(ReadSerializerMixin, viewsets.ModelViewSet):
     queryset = Notification.objects.all()
     serializer_class = NotificationSerializer
+    read_serializer_class = NotificationReadSerializer
     permission_classes = (IsAuthenticated,)
+    # the notifications are pushed as soon as they're written, the inbox
+    # must not lag behind (see backend/api/dbrouter.py)
+    replica_reads = False
 
     def create(self, request):
         """
@@ -38,9 +72,45 @@ class NotificationViewSet(viewsets.ModelViewSet):
             The user id is passed as GET parameter.
         """
         queryset = Notification.objects.all()
-        uid = self.request.query_params.get("uid", None)
+        uid = userid(self.request)
         if(uid is not None):
             queryset = queryset.filter(user=uid)
             queryset = queryset.order_by("seen")
             
         return queryset
+
+    def get_user_notifications(self):
+        """
+            Get the notifications of the user passed as GET parameter "uid"
+            (the logged user by default, see owneruserid).
+        """
+        return Notification.objects.filter(user=owneruserid(self.request))
+
+    @action(methods=["GET"], detail=False, pagination_class=NotificationPagination)
+    def inbox(self, request, pk=None):
+        """
+            Get a page of the notifications of a user, the unseen first.
+            The next page is read from the "next" link (keyset pagination).
+            The page size is passed as GET parameter "page_size".
+        """
+        page = self.paginate_queryset(self.get_user_notifications())
+        data = self.get_serializer(page, many=True).data
+        return self.get_paginated_response(data)
+
+    @action(methods=["GET"], detail=False)
+    def unreadcount(self, request, pk=None):
+        """
+            Get the number of unseen notifications of a user.
+        """
+        count = self.get_user_notifications().filter(seen=False).count()
+        return Response({"count": count}, status=status.HTTP_200_OK)
+
+    @action(methods=["POST"], detail=False)
+    def markallseen(self, request, pk=None):
+        """
+            Mark every notification of a user as seen with a single update.
+            The invitations stay unseen until they're accepted or declined.
+        """
+        updated = self.get_user_notifications().filter(seen=False).exclude(
+            notificationType="INVITATION").update(seen=True)
+        return Response({"updated": updated}, status=status.HTTP_200_OK)
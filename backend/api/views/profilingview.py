@@ -0,0 +1,29 @@
+from rest_framework import status
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from rest_framework.permissions import IsAdminUser
+
+from django.conf import settings
+from ..profiling import store
+
+
+class ProfilingView(APIView):
+    permission_classes = (IsAdminUser,)
+
+    def get(self, request):
+        """
+            Get the profiling report : per view and action, the number of
+            requests and the mean and max of the queries, duplicated queries,
+            database time, rendering time and total time (ms).
+        """
+        if not getattr(settings, "PROFILING", False):
+            return Response({"message": "profiling is disabled"}, status=status.HTTP_404_NOT_FOUND)
+
+        return Response(store.report(), status=status.HTTP_200_OK)
+
+    def delete(self, request):
+        """
+            Reset the profiling report.
+        """
+        store.reset()
+        return Response(status=status.HTTP_204_NO_CONTENT)
@@ -0,0 +1,46 @@
+from rest_framework import status
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from rest_framework.permissions import AllowAny
+from rest_framework.utils.urls import replace_query_param
+
+from ..services import SearchError, search
+
+
+class SearchView(APIView):
+    permission_classes = (AllowAny,)
+    page_size = 20
+    max_page_size = 100
+
+    def get(self, request):
+        """
+            Search the teams, the tournaments and the users, the most
+            relevant first. Every word of the GET parameter "q" is a prefix
+            (e.g. ?q=rock lea). The kinds can be restricted with the GET
+            parameter "kinds" (e.g. ?kinds=teams,users).
+            The page size is passed as GET parameter "page_size" and the
+            next page is read from the "next" link.
+        """
+        try:
+            pageSize = min(max(int(request.query_params.get("page_size", self.page_size)), 1), self.max_page_size)
+            page = max(int(request.query_params.get("page", 1)), 1)
+        except ValueError:
+            return Response({"message": "page and page_size must be numbers"}, status=status.HTTP_400_BAD_REQUEST)
+
+        kinds = request.query_params.get("kinds", None)
+        if kinds is not None:
+            kinds = [kind.strip() for kind in kinds.split(",") if kind.strip()]
+
+        try:
+            # one more entry tells if there's a next page
+            entries = search(request.query_params.get("q", ""), kinds, (page - 1) * pageSize, pageSize + 1)
+        except SearchError as error:
+            return Response({"message": str(error)}, status=status.HTTP_400_BAD_REQUEST)
+
+        response = {
+            "next": replace_query_param(request.build_absolute_uri(), "page", page + 1)
+            if len(entries) > pageSize else None,
+            "results": [{"kind": entry.kind, "id": entry.objectId, "name": entry.name, "detail": entry.detail}
+                        for entry in entries[:pageSize]],
+        }
+        return Response(response, status=status.HTTP_200_OK)
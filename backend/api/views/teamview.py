@@ -3,16 +3,23 @@ from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework.decorators import action
 
+from django.db import transaction
 from django.contrib.auth.models import User
 from ..models.teammodel import Team
 from ..models.notificationmodel import Notification
 from ..models.tournamentmodel import Tournament
-from ..serializers import TeamSerializer
+from ..serializers import TeamSerializer, TeamStatsSerializer
+from ..models.teamstatsmodel import TeamStats
+from ..readserializers import ReadSerializerMixin, TeamReadSerializer, TeamStatsReadSerializer
+from ..pagination import OptionalPageNumberPagination
+from ..services import notify
+from ..cache import cachedresponse
 
 
-class TeamViewSet(viewsets.ModelViewSet):
-    queryset = Team.objects.all()
+class TeamViewSet(ReadSerializerMixin, viewsets.ModelViewSet):
+    queryset = Team.objects.select_related("image")
     serializer_class = TeamSerializer
+    read_serializer_class = TeamReadSerializer
     permission_classes = (AllowAny,)
 
     def create(self, request):
@@ -47,7 +54,6 @@ class TeamViewSet(viewsets.ModelViewSet):
             A notification is automatically sended to the member to inform
             him that he's been fired.
         """
-        from django.utils import timezone # for the notification
         permission_classes = (IsAuthenticated,)
 
         if "userid" in request.data:
@@ -55,15 +61,10 @@ class TeamViewSet(viewsets.ModelViewSet):
             user = User.objects.get(id=userid)
             team = Team.objects.get(id=pk)
 
-            notification = Notification(message="[Team] You have been fired from " + team.name,
-                                        seen=False,
-                                        notificationType="MESSAGE",
-                                        user=user,
-                                        team=team,
-                                        creationDate=timezone.now())
-            notification.save()
+            with transaction.atomic():
+                notify([user.id], "[Team] You have been fired from " + team.name, team=team)
+                team.members.remove(user)
 
-            team.members.remove(user)
             response = {
                 "message": "user removed successfuly"
             }
@@ -87,17 +88,19 @@ class TeamViewSet(viewsets.ModelViewSet):
         permission_classes = (IsAuthenticated,)
 
         if "userid" and "notificationid" in request.data:
-            notification = Notification.objects.get(
+            notification = Notification.objects.select_related("user", "team").get(
                 id=request.data["notificationid"])
             userid = request.data["userid"]
-            if notification.user.id == userid and notification.team.id == int(pk):
-                user = User.objects.get(id=userid)
-                team = Team.objects.get(id=pk)
-                team.members.add(user)
-                notification.seen = True
-                notification.message = "[Accepted] " + notification.message
-                notification.notificationType = "MESSAGE"
-                notification.save()
+            if notification.user_id == userid and notification.team_id == int(pk):
+                user = notification.user
+                team = notification.team
+
+                with transaction.atomic():
+                    team.members.add(user)
+                    notification.seen = True
+                    notification.message = "[Accepted] " + notification.message
+                    notification.notificationType = "MESSAGE"
+                    notification.save()
                 response = {
                     "message": "user added successfuly"
                 }
@@ -114,22 +117,28 @@ class TeamViewSet(viewsets.ModelViewSet):
             return Response(response, status=status.HTTP_400_BAD_REQUEST)
 
     @action(methods=["GET"], detail=True)
+    @cachedresponse("TeamViewSet.getteamsbymember",
+                    lambda request, pk=None: [("memberteams", pk), ("teams", "all")])
     def getteamsbymember(self, request, pk=None):
         """
             Get all teams which the member belongs to .
+            The response is cached until the teams of the member change.
         """
         permission_classes = (IsAuthenticated,)
 
         if(pk is not None):
             teams = Team.objects.filter(members__id=pk)
-            data = self.get_serializer(teams, many=True).data
-            return Response(data)
+            return self.readresponse(teams)
 
     @action(methods=["GET"], detail=False)
+    @cachedresponse("TeamViewSet.getteamsbytournament",
+                    lambda request, pk=None: [("tournamentteams", request.query_params.get("tid")),
+                                              ("teams", "all")])
     def getteamsbytournament(self, request, pk=None):
         """
             Get all teams which participate to a tournament.
             The tournament id is passed as GET parameter.
+            The response is cached until the teams of the tournament change.
         """
         permission_classes = (AllowAny,)
 
@@ -140,8 +149,7 @@ class TeamViewSet(viewsets.ModelViewSet):
         if(tid is not None):
             tournament = Tournament.objects.filter(pk=tid)
             teams = queryset.filter(tournament__in=tournament)
-            data = self.get_serializer(teams, many=True).data
-            return Response(data)
+            return self.readresponse(teams)
 
         return Response({"message": "tid is not defined"})
 
@@ -154,5 +162,36 @@ class TeamViewSet(viewsets.ModelViewSet):
         permission_classes = (IsAuthenticated,)
         if(pk is not None):
             teams = Team.objects.filter(leader__id=pk)
-            data = self.get_serializer(teams, many=True).data
-            return Response(data)
+            return self.readresponse(teams)
+
+    @action(methods=["GET"], detail=True)
+    def stats(self, request, pk=None):
+        """
+            Get the statistics of a team over every tournament : its results,
+            the number of tournaments where it played and its Elo rating.
+        """
+        team = Team.objects.filter(pk=pk).first()
+        if team is None:
+            return Response({"message": "team not found"}, status=status.HTTP_404_NOT_FOUND)
+
+        rows = TeamStatsReadSerializer(request).serialize(TeamStats.objects.filter(team=team))
+        if rows:
+            return Response(rows[0], status=status.HTTP_200_OK)
+        # a team without result has no statistics yet : the default ones, without creating them
+        data = dict(TeamStatsSerializer(TeamStats(team=team)).data, teamName=team.name)
+        return Response(data, status=status.HTTP_200_OK)
+
+    @action(methods=["GET"], detail=False, pagination_class=OptionalPageNumberPagination)
+    def leaderboard(self, request, pk=None):
+        """
+            Get the statistics of the teams, the best rating first.
+            The teams with less than "minplayed" matches (GET parameter,
+            1 by default) are ignored.
+        """
+        try:
+            minPlayed = int(request.query_params.get("minplayed", 1))
+        except ValueError:
+            return Response({"message": "minplayed must be a number"}, status=status.HTTP_400_BAD_REQUEST)
+
+        teamStats = TeamStats.objects.filter(played__gte=minPlayed).order_by("-rating", "team_id")
+        return self.readresponse(teamStats, TeamStatsReadSerializer)
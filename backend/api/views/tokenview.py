@@ -2,18 +2,22 @@ from rest_framework.authtoken.views import ObtainAuthToken
 from rest_framework.authtoken.models import Token
 from rest_framework.response import Response
 
+from ..authentication import tokens
+
 
 class TokenViewSet(ObtainAuthToken):
     def post(self, request, *args, **kwargs):
         """
             Get an authentication token. 
-            Create it if necessary.
+            Create it if necessary. The token is cached, so the next
+            authenticated requests don't query it.
         """
         serializer = self.serializer_class(
             data=request.data, context={'request': request})
         serializer.is_valid(raise_exception=True)
         user = serializer.validated_data['user']
         token, created = Token.objects.get_or_create(user=user)
+        tokens.set(token.key, user)
         return Response({
             'token': token.key,
             'user_id': user.pk,
@@ -3,18 +3,30 @@ from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework.decorators import action
 
-from django.utils import timezone
+from django.db import transaction
+from django.db.models import BooleanField, Count, Exists, OuterRef, Value
+from django.shortcuts import get_object_or_404
 from django.contrib.auth.models import User
 from ..models.tournamentmodel import Tournament
 from ..models.teammodel import Team
-from ..models.notificationmodel import Notification
+from ..models.matchmodel import Match
 from ..serializers import TournamentSerializer
 from ..serializers import TeamSerializer
+from ..serializers import MatchSerializer
+from ..readserializers import (MatchReadSerializer, ReadSerializerMixin, StandingReadSerializer,
+                               TeamReadSerializer, TournamentForHomeReadSerializer, TournamentReadSerializer)
+from ..services import (FormatError, RegistrationError, creatematches, getbracket, nextswissround, notify,
+                        ranking, registerteams, scheduletournament)
+from ..pagination import OptionalPageNumberPagination
+from ..cache import cachedresponse
 from datetime import date
+from django.utils.dateparse import parse_datetime
+from django.utils import timezone
 
-class TournamentViewSet(viewsets.ModelViewSet):
+class TournamentViewSet(ReadSerializerMixin, viewsets.ModelViewSet):
     queryset = Tournament.objects.all()
     serializer_class = TournamentSerializer
+    read_serializer_class = TournamentReadSerializer
     permission_classes = (AllowAny,)
 
     def create(self, request):
@@ -30,25 +42,18 @@ class TournamentViewSet(viewsets.ModelViewSet):
         serializer.is_valid(raise_exception=True)
 
         if serializer.is_valid():
-            tournament = Tournament.objects.create(**serializer.validated_data)
-
-            for referee in data["referees"]:
-                user = User.objects.get(id=referee)
-                tournament.referees.add(user)
-
-                # send a notification to the user
-                notification = Notification(
-                    message=f"""[Referee] You've been assigned as referee for the tournament {tournament.name} 
-                                of {tournament.gameName} the {tournament.deadLineDate}""",
-                    seen=False,
-                    notificationType="MESSAGE",
-                    user=user,
-                    team=None,
-                    creationDate=timezone.now())
+            with transaction.atomic():
+                tournament = Tournament.objects.create(**serializer.validated_data)
 
-                notification.save()
+                # load every referee with a single query
+                refereeIds = list(User.objects.filter(
+                    id__in=data["referees"]).values_list("id", flat=True))
+                tournament.referees.add(*refereeIds)
 
-            tournament.save()
+                # send a notification to the referees
+                notify(refereeIds,
+                       f"""[Referee] You've been assigned as referee for the tournament {tournament.name} 
+                                of {tournament.gameName} the {tournament.deadLineDate}""")
 
             return Response(self.get_serializer(tournament).data, status=status.HTTP_200_OK)
         else:
@@ -57,6 +62,12 @@ class TournamentViewSet(viewsets.ModelViewSet):
             }
             return Response(response, status=status.HTTP_400_BAD_REQUEST)
 
+    @cachedresponse("TournamentViewSet.list", lambda request: [("tournaments", "all")])
+    def list(self, request, *args, **kwargs):
+        """
+            Get every tournament, cached until a tournament is modified.
+        """
+        return super().list(request, *args, **kwargs)
 
     @action(methods=["POST"], detail=True)
     def addTeam(self, request, pk=None):
@@ -64,37 +75,21 @@ class TournamentViewSet(viewsets.ModelViewSet):
             Add a team to a tournament.
             The tournament id is the pk parameter.
             The team id is passed in the request with the field "teamid"
+            (see registerteams).
         """
         permission_classes = (IsAuthenticated,)
         
         if "teamid" in request.data and pk is not None:
+            try:
+                registerteams(int(pk), [int(request.data["teamid"])])
+            except (TypeError, ValueError):
+                return Response({"message": "teamid must be a team id"}, status=status.HTTP_400_BAD_REQUEST)
+            except Tournament.DoesNotExist:
+                return Response({"message": "tournament not found"}, status=status.HTTP_404_NOT_FOUND)
+            except RegistrationError as error:
+                return Response({"message": str(error)}, status=status.HTTP_400_BAD_REQUEST)
 
             team = Team.objects.get(id=request.data["teamid"])
-            tournament = Tournament.objects.get(pk=int(pk))
-            tournament.teams.add(team)
-
-            teams = Team.objects.all().filter(tournament__id=tournament.id)
-
-            if len(teams) >= tournament.nbTeam and tournament.deadLineDate < date.today():
-                response = {
-                    "message": "Unable to connect to this team. This tournament is full."
-                }
-                return Response(response, status=status.HTTP_400_BAD_REQUEST)
-
-            # send a notification to every memeber of the team
-            for member in team.members.all():
-                notification = Notification(
-                        message= f"""[Tournament] Your team {team.name} participates to the tournament {tournament.name} 
-                                    of {tournament.gameName} the {tournament.deadLineDate}.""",
-                        seen=False,
-                        notificationType="MESSAGE",
-                        user=member,
-                        team=team,
-                        creationDate=timezone.now())
-
-                notification.save()
-
-
             return Response(TeamSerializer(team, context={'request': request}).data, status=status.HTTP_200_OK)
         else:
             response = {
@@ -102,9 +97,164 @@ class TournamentViewSet(viewsets.ModelViewSet):
             }
             return Response(response, status=status.HTTP_400_BAD_REQUEST)
 
-    @action(methods=["GET"], detail=False)
-    def tournamentsforhome(self, request, pk=None):
+    @action(methods=["POST"], detail=True, permission_classes=(IsAuthenticated,))
+    def registerteams(self, request, pk=None):
+        """
+            Register several teams to a tournament at once.
+            The tournament id is the pk parameter.
+            The team ids are passed in the request with the field "teamids".
+            Either every team is registered or none (the tournament is full,
+            the deadline is over or a team doesn't exist). The teams already
+            registered are ignored.
+        """
+        teamIds = request.data.get("teamids", None)
+        try:
+            teamIds = [int(teamId) for teamId in teamIds]
+        except (TypeError, ValueError):
+            return Response({"message": "teamids must be a list of team ids"}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            if not pk.isdigit():
+                raise Tournament.DoesNotExist()
+            tournament, teams = registerteams(int(pk), teamIds)
+        except Tournament.DoesNotExist:
+            return Response({"message": "tournament not found"}, status=status.HTTP_404_NOT_FOUND)
+        except RegistrationError as error:
+            return Response({"message": str(error)}, status=status.HTTP_400_BAD_REQUEST)
+
+        registered = Team.objects.filter(id__in=[team.id for team in teams]).order_by("id")
+        response = {
+            "registered": TeamReadSerializer(request).serialize(registered),
+        }
+        return Response(response, status=status.HTTP_200_OK)
+
+    @action(methods=["POST"], detail=True, permission_classes=(IsAuthenticated,))
+    def generatebracket(self, request, pk=None):
+        """
+            Generate every match of the tournament bracket once the
+            registration deadline is over (the teams register until the
+            deadline day included, see registerteams), the first round of a
+            swiss tournament, according to the format of the tournament.
+            The matches are written with a single insert. If the bracket
+            already exists, it's returned unchanged.
+        """
+        if not pk.isdigit():
+            return Response({"message": "tournament not found"}, status=status.HTTP_404_NOT_FOUND)
+
+        with transaction.atomic():
+            # lock the tournament so concurrent calls create the bracket only once
+            tournament = get_object_or_404(Tournament.objects.select_for_update(), pk=int(pk))
+            matches = Match.objects.filter(tournament=tournament).order_by("idInTournament")
+
+            if not matches.exists():
+                if tournament.deadLineDate >= date.today():
+                    response = {
+                        "message": "The registration deadline of this tournament is not over."
+                    }
+                    return Response(response, status=status.HTTP_400_BAD_REQUEST)
+
+                teams = list(tournament.teams.order_by("id"))
+                if len(teams) < 2:
+                    response = {
+                        "message": "Not enough teams to generate the bracket."
+                    }
+                    return Response(response, status=status.HTTP_400_BAD_REQUEST)
+
+                creatematches(tournament, teams)
+
+        data = MatchSerializer(matches, many=True, context={'request': request}).data
+        return Response(data, status=status.HTTP_200_OK)
 
+    @action(methods=["GET"], detail=True)
+    def bracket(self, request, pk=None):
+        """
+            Get the bracket of a tournament : its referees and its rounds,
+            from the first one to the final. Each game of a round contains
+            the match and its two players (team id, name and winner flag).
+            The bracket is cached until a match of the tournament changes.
+        """
+        bracket = getbracket(int(pk), request) if pk.isdigit() else None
+        if bracket is None:
+            return Response({"message": "tournament not found"}, status=status.HTTP_404_NOT_FOUND)
+
+        return Response(bracket, status=status.HTTP_200_OK)
+
+    @action(methods=["POST"], detail=True, permission_classes=(IsAuthenticated,))
+    def nextround(self, request, pk=None):
+        """
+            Pair the next round of a swiss tournament once the current round
+            is over : the teams with the same points meet, without rematches.
+            Return the matches of the new round.
+        """
+        try:
+            if not pk.isdigit():
+                raise Tournament.DoesNotExist()
+            matches = nextswissround(int(pk))
+        except Tournament.DoesNotExist:
+            return Response({"message": "tournament not found"}, status=status.HTTP_404_NOT_FOUND)
+        except FormatError as error:
+            return Response({"message": str(error)}, status=status.HTTP_400_BAD_REQUEST)
+
+        if Match.objects.filter(tournament_id=pk, startTime__isnull=False).exists():
+            scheduletournament(pk)
+        matches = Match.objects.filter(tournament_id=pk, roundNb=matches[0].roundNb).order_by("idInTournament")
+        return Response(MatchReadSerializer(request).serialize(matches), status=status.HTTP_200_OK)
+
+    @action(methods=["GET"], detail=True, pagination_class=OptionalPageNumberPagination)
+    def standings(self, request, pk=None):
+        """
+            Get the standings of a round robin or swiss tournament, best
+            first : the points (3 for a win, 1 for a draw), then the score
+            difference.
+        """
+        if not pk.isdigit() or not Tournament.objects.filter(pk=pk).exists():
+            return Response({"message": "tournament not found"}, status=status.HTTP_404_NOT_FOUND)
+
+        return self.readresponse(ranking(pk), StandingReadSerializer)
+
+    @action(methods=["POST"], detail=True, permission_classes=(IsAuthenticated,))
+    def schedule(self, request, pk=None):
+        """
+            Schedule the matches of the tournament bracket : the start time,
+            the slot and the referee of every match.
+            The number of matches played at the same time is passed with the
+            field "slots" (the current one by default) and the start time of
+            the first match with the field "start" (ISO 8601, optional).
+            The matches already over or being played are kept.
+            Return every match of the tournament.
+        """
+        try:
+            nbSlots = request.data.get("slots", None)
+            nbSlots = None if nbSlots is None else int(nbSlots)
+        except (TypeError, ValueError):
+            nbSlots = 0
+        if nbSlots is not None and nbSlots < 1:
+            return Response({"message": "slots must be a positive number"}, status=status.HTTP_400_BAD_REQUEST)
+
+        start = request.data.get("start", None)
+        if start is not None:
+            try:
+                start = parse_datetime(start)
+            except (TypeError, ValueError):
+                start = None
+            if start is None:
+                return Response({"message": "start must be an ISO 8601 date and time"},
+                                status=status.HTTP_400_BAD_REQUEST)
+            if timezone.is_naive(start):
+                start = timezone.make_aware(start)
+
+        try:
+            if not pk.isdigit():
+                raise Tournament.DoesNotExist()
+            scheduletournament(int(pk), nbSlots, start)
+        except Tournament.DoesNotExist:
+            return Response({"message": "tournament not found"}, status=status.HTTP_404_NOT_FOUND)
+
+        matches = Match.objects.filter(tournament_id=pk).order_by("idInTournament")
+        return Response(MatchReadSerializer(request).serialize(matches), status=status.HTTP_200_OK)
+
+    @action(methods=["GET"], detail=False, pagination_class=OptionalPageNumberPagination)
+    def tournamentsforhome(self, request, pk=None):
         """
             Return every tournament with specific attributes added : 
               * isLeader : true if the logged user is the leader of at least one 
@@ -113,41 +263,37 @@ class TournamentViewSet(viewsets.ModelViewSet):
                            is participating to the tournament
               * isDeadLineOver : true if the tournament registration deadline has been reached
 
-        """        
-        tournaments = Tournament.objects.all()
-        teamQueryset = Team.objects.all()
-        response = []
+            The logged user id is passed as GET parameter "uid". The tournaments
+            can be filtered on their deadline with the GET parameters "from" and
+            "to" (YYYY-MM-DD) and paginated with "page" and "page_size".
+            Everything is computed with a single query.
+        """
+        tournaments = Tournament.objects.annotate(
+            nbRegisteredTeams=Count("teams", distinct=True)).order_by("id")
+
         userId = self.request.query_params.get("uid", None)
+        if userId is not None and userId.isnumeric():
+            tournaments = tournaments.annotate(
+                isLeader=Exists(Team.objects.filter(tournament=OuterRef("pk"), leader__id=userId)),
+                isMember=Exists(Team.objects.filter(
+                    tournament=OuterRef("pk"), members__id=userId)))
+        else:
+            tournaments = tournaments.annotate(
+                isLeader=Value(False, output_field=BooleanField()),
+                isMember=Value(False, output_field=BooleanField()))
 
-        for tournament in tournaments:
-            loggedUser = None
-            if userId is not None and userId.isnumeric():
-                loggedUser = User.objects.all().get(pk=userId)
+        try:
+            dateFrom = self.request.query_params.get("from", None)
+            if dateFrom is not None:
+                tournaments = tournaments.filter(deadLineDate__gte=date.fromisoformat(dateFrom))
 
-            teams = teamQueryset.filter(tournament__id=tournament.id)
+            dateTo = self.request.query_params.get("to", None)
+            if dateTo is not None:
+                tournaments = tournaments.filter(deadLineDate__lte=date.fromisoformat(dateTo))
+        except ValueError:
+            response = {
+                "message": "from and to must be dates (YYYY-MM-DD)"
+            }
+            return Response(response, status=status.HTTP_400_BAD_REQUEST)
 
-            isLeader = False
-            try:
-                isLeader = len(teamQueryset.filter(leader=loggedUser)) > 0
-            except:
-                pass
-
-            isParticipating = False
-            if len(teams) >= tournament.nbTeam:
-                isParticipating = True
-            else:
-                try:
-                    isParticipating = len(teams.filter(members__id=loggedUser.id)) > 0
-                except:
-                    pass
-
-            isDeadLineOver = tournament.deadLineDate < date.today()
-            
-            data = self.get_serializer(tournament).data
-            data["isLeader"] = isLeader
-            data["isParticipating"] = isParticipating
-            data["isDeadLineOver"] = isDeadLineOver
-
-            response.append(data)
-
-        return Response(response, status=status.HTTP_200_OK)
\ No newline at end of file
+        return self.readresponse(tournaments, TournamentForHomeReadSerializer)
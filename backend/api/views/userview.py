@@ -8,6 +8,7 @@ from django.contrib.auth.models import User
 from ..models.teammodel import Team
 from ..models.tournamentmodel import Tournament
 from ..serializers import UserSerializer
+from ..cache import cachedresponse
 
 
 class UserViewSet(viewsets.ModelViewSet):
@@ -30,10 +31,13 @@ class UserViewSet(viewsets.ModelViewSet):
             return Response(data)
 
     @action(methods=["GET"], detail=True)
+    @cachedresponse("UserViewSet.gettournamentreferees",
+                    lambda request, pk=None: [("referees", pk), ("users", "all")])
     def gettournamentreferees(self, request, pk=None):
         """
             Get all referees of a tournament.
             The tournament id the pk parameter.
+            The response is cached until the referees of the tournament change.
         """
         if pk is not None:
             tournament = Tournament.objects.get(id=pk)
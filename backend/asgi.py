@@ -13,4 +13,9 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.settings')
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+# the events (Server-Sent Events) are served next to the Django application
+from backend.api.push.events import EventsApplication
+
+application = EventsApplication(django_application)
@@ -52,11 +52,21 @@ REST_FRAMEWORK = {
         'rest_framework.permissions.IsAuthenticated',
     ],
     # 'DEFAULT_AUTHENTICATION_CLASSES': [
-    #     'rest_framework.authentication.TokenAuthentication',
+    #     'backend.api.authentication.CachedTokenAuthentication',
     # ],
+    # token buckets per action and per client (see THROTTLING)
+    'DEFAULT_THROTTLE_CLASSES': [
+        'backend.api.throttling.BucketThrottle',
+    ],
+    # the anonymous clients are throttled per address : the one added to X-Forwarded-For
+    # by the proxy in front of the server, the addresses before it are sent by the clients
+    'NUM_PROXIES': 1,
 }
 
 MIDDLEWARE = [
+    # first, so the requests are shed before any other work
+    'backend.api.throttling.LoadSheddingMiddleware',
+    'backend.api.profiling.ProfilingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
@@ -66,8 +76,66 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    # last, so the other middlewares have processed the view
+    'backend.api.dbrouter.ReplicaMiddleware',
 ]
 
+# Per-request profiling (queries, duplicated queries, db/render/total time)
+# in the response headers and aggregated at /api/profiling/. No overhead when False.
+PROFILING = False
+
+# Broker of the pushed events (see backend/api/push). The uwsgi workers are
+# several processes : an event published by a worker must reach the clients
+# connected to the others, so it goes through Redis (InProcessBroker would only
+# deliver it to the clients of the publishing worker).
+PUSH_BROKER = {
+    'BACKEND': 'backend.api.push.brokers.RedisBroker',
+    'OPTIONS': {'url': os.environ.get('REDIS_URL', 'redis://localhost:6379/0')},
+}
+
+# Cache of the brackets and of the read endpoints (see backend/api/cache.py),
+# shared by the uwsgi workers.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': BASE_DIR / 'cache',
+        'OPTIONS': {'MAX_ENTRIES': 10000},
+    }
+}
+
+# Token-bucket throttling of the api (see backend/api/throttling.py) : a bucket
+# per action of a view and per user (per IP for the anonymous clients). A budget
+# gives (requests per second refilled, size of the bucket) per scope, None for
+# no limit. The actions not listed in ACTIONS use the budget "read" or "write".
+# The buckets are stored in the cache CACHE, shared by the processes.
+THROTTLING = {
+    'CACHE': 'default',
+    'BUDGETS': {
+        'read': {'user': (20, 200), 'ip': (10, 100)},
+        'write': {'user': (2, 30), 'ip': (1, 20)},
+        'expensive': {'user': (0.5, 10), 'ip': (0.2, 5)},
+    },
+    'ACTIONS': {
+        'TournamentViewSet.tournamentsforhome': 'expensive',
+        'TournamentViewSet.addTeam': 'expensive',
+        'TournamentViewSet.registerteams': 'expensive',
+        'TournamentViewSet.generatebracket': 'expensive',
+        'ExportView.get': 'expensive',
+        # its sub-requests are throttled one by one
+        'BatchView.post': 'read',
+    },
+}
+
+# Load shedding (see backend/api/throttling.py) : 429 at once rather than queueing
+# when the process serves MAX_CONCURRENT_REQUESTS requests, or when a request
+# waited more than MAX_QUEUE_SECONDS in the server (header X-Request-Start set by
+# the proxy). None to disable a limit, LOAD_SHEDDING = None to disable both.
+LOAD_SHEDDING = {
+    'MAX_CONCURRENT_REQUESTS': 100,
+    'MAX_QUEUE_SECONDS': 2,
+    'RETRY_AFTER': 1,
+}
+
 CORS_ALLOWED_ORIGINS = [
     'http://localhost:8081',
     'http://localhost:8080',
@@ -120,6 +188,13 @@ DATABASES = {
     }
 }
 
+# Read replicas of the database (see backend/api/dbrouter.py), one per host of
+# MYSQL_REPLICA_HOSTS (comma separated), with the credentials of the primary.
+for index, host in enumerate(filter(None, os.environ.get('MYSQL_REPLICA_HOSTS', '').split(','))):
+    DATABASES[f'replica{index + 1}'] = dict(DATABASES['default'], HOST=host.strip(), TEST={'MIRROR': 'default'})
+DATABASE_REPLICAS = [alias for alias in DATABASES if alias != 'default']
+DATABASE_ROUTERS = ['backend.api.dbrouter.ReplicaRouter']
+
 
 # Password validation
 # https://docs.djangoproject.com/en/3.1/ref/settings/#auth-password-validators
@@ -161,3 +236,8 @@ USE_TZ = True
 
 STATIC_ROOT = "static/"
 STATIC_URL = '/static/'
+
+# Uploaded files (team images, see api/images.py)
+
+MEDIA_ROOT = BASE_DIR / 'media'
+MEDIA_URL = '/media/'
@@ -11,7 +11,7 @@ https://docs.djangoproject.com/en/3.1/ref/settings/
 """
 
 from pathlib import Path
-#import os
+import os
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -47,11 +47,22 @@ INSTALLED_APPS = [
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework.authentication.TokenAuthentication',
+        # TokenAuthentication with the tokens cached (see backend/api/authentication.py)
+        'backend.api.authentication.CachedTokenAuthentication',
     ],
+    # token buckets per action and per client (see THROTTLING)
+    'DEFAULT_THROTTLE_CLASSES': [
+        'backend.api.throttling.BucketThrottle',
+    ],
+    # the anonymous clients are throttled per address : REMOTE_ADDR, the header
+    # X-Forwarded-For is ignored (sent by the clients, it would give a new bucket per request)
+    'NUM_PROXIES': 0,
 }
 
 MIDDLEWARE = [
+    # first, so the requests are shed before any other work
+    'backend.api.throttling.LoadSheddingMiddleware',
+    'backend.api.profiling.ProfilingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
@@ -61,8 +72,65 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    # last, so the other middlewares have processed the view
+    'backend.api.dbrouter.ReplicaMiddleware',
 ]
 
+# Per-request profiling (queries, duplicated queries, db/render/total time)
+# in the response headers and aggregated at /api/profiling/. No overhead when False.
+PROFILING = False
+
+# Broker of the pushed events (see backend/api/push). With several nodes, use
+# 'backend.api.push.brokers.RedisBroker' with the OPTIONS {'url': 'redis://...'}
+PUSH_BROKER = {
+    'BACKEND': 'backend.api.push.brokers.InProcessBroker',
+    'OPTIONS': {},
+}
+
+# Cache of the brackets and of the read endpoints (see backend/api/cache.py).
+# The cache must be shared by the processes serving the api : with several
+# workers use the file backend (as in settings-deploy.py), Redis or Memcached.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'wtm',
+        'OPTIONS': {'MAX_ENTRIES': 10000},
+    }
+}
+
+# Token-bucket throttling of the api (see backend/api/throttling.py) : a bucket
+# per action of a view and per user (per IP for the anonymous clients). A budget
+# gives (requests per second refilled, size of the bucket) per scope, None for
+# no limit. The actions not listed in ACTIONS use the budget "read" or "write".
+# The buckets are stored in the cache CACHE, shared by the processes.
+THROTTLING = {
+    'CACHE': 'default',
+    'BUDGETS': {
+        'read': {'user': (20, 200), 'ip': (10, 100)},
+        'write': {'user': (2, 30), 'ip': (1, 20)},
+        'expensive': {'user': (0.5, 10), 'ip': (0.2, 5)},
+    },
+    'ACTIONS': {
+        'TournamentViewSet.tournamentsforhome': 'expensive',
+        'TournamentViewSet.addTeam': 'expensive',
+        'TournamentViewSet.registerteams': 'expensive',
+        'TournamentViewSet.generatebracket': 'expensive',
+        'ExportView.get': 'expensive',
+        # its sub-requests are throttled one by one
+        'BatchView.post': 'read',
+    },
+}
+
+# Load shedding (see backend/api/throttling.py) : 429 at once rather than queueing
+# when the process serves MAX_CONCURRENT_REQUESTS requests, or when a request
+# waited more than MAX_QUEUE_SECONDS in the server (header X-Request-Start set by
+# the proxy). None to disable a limit, LOAD_SHEDDING = None to disable both.
+LOAD_SHEDDING = {
+    'MAX_CONCURRENT_REQUESTS': 100,
+    'MAX_QUEUE_SECONDS': 2,
+    'RETRY_AFTER': 1,
+}
+
 CORS_ALLOWED_ORIGINS = [
     'http://localhost:8081',
     'http://localhost:8080',
@@ -115,6 +183,18 @@ DATABASES = {
     # }
 }
 
+# Read replicas of the database (see backend/api/dbrouter.py) : the aliases of
+# DATABASES other than "default". To try them locally with a copy of the database
+# (cp db.sqlite3 db-replica.sqlite3), set the environment variable SQLITE_REPLICA.
+if os.environ.get('SQLITE_REPLICA'):
+    DATABASES['replica'] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': BASE_DIR / 'db-replica.sqlite3',
+        'TEST': {'MIRROR': 'default'},
+    }
+DATABASE_REPLICAS = [alias for alias in DATABASES if alias != 'default']
+DATABASE_ROUTERS = ['backend.api.dbrouter.ReplicaRouter']
+
 
 # Password validation
 # https://docs.djangoproject.com/en/3.1/ref/settings/#auth-password-validators
@@ -153,3 +233,8 @@ USE_TZ = True
 # https://docs.djangoproject.com/en/3.1/howto/static-files/
 
 STATIC_URL = '/static/'
+
+# Uploaded files (team images, see api/images.py)
+
+MEDIA_ROOT = BASE_DIR / 'media'
+MEDIA_URL = '/media/'
@@ -13,6 +13,7 @@ Including another URLconf
     1. Import the include() function: from django.urls import include, path
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
+from django.conf import settings
 from django.contrib import admin
 from django.urls import path, include
 from rest_framework import routers
@@ -31,5 +32,16 @@ router.register(r'notifications', NotificationViewSet)
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/', include(router.urls)),
-    path('api/auth/', TokenViewSet.as_view())
+    path('api/auth/', TokenViewSet.as_view()),
+    path('api/profiling/', ProfilingView.as_view()),
+    path('api/cache/', CacheView.as_view()),
+    path('api/export/<str:kind>.<str:extension>', ExportView.as_view()),
+    path('api/search/', SearchView.as_view()),
+    path('api/batch/', BatchView.as_view()),
+    # async versions of the read endpoints for the ASGI application
+    path('api/async/tournaments/', asynctournaments),
+    path('api/async/tournaments/<int:pk>/bracket/', asyncbracket),
+    path('api/async/matchs/getmatchsbytournament/', asyncmatches),
+    path('api/async/notifications/inbox/', asyncinbox),
+    path(settings.MEDIA_URL.lstrip('/') + 'images/<path:path>', imagefile)
 ]
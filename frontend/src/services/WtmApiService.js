@@ -27,30 +27,60 @@ export default {
   },
 
   /**
-   * Request to get notifications and compute the number of unseen one
+   * Run several requests of the router in a single round trip
    *
-   * @param {String} url url of the API to call
+   * @param {String} apiUrl url of the API (this.$store.state.apiUrl)
+   * @param {Array} requests sub-requests ({ method: 'get', url: apiUrl + 'teams/', body: null })
    * @param {Object} header header to integrate the token to authorize methods in the API
+   * @param {Boolean} atomic run the sub-requests all or nothing, in a single transaction
    */
-  GetNotifications(url, header) {
+  Batch(apiUrl, requests, header, atomic = false) {
     return new Promise(resolve => {
       axios({
-        method: 'get',
-        url: url,
+        method: 'post',
+        url: apiUrl + 'batch/',
+        data: { requests: requests, atomic: atomic },
         headers: header
       })
         .then(response => {
-          let notifNumber = response.data.filter(n => n.seen == false).length
-
-          resolve({
-            isSuccess: true,
-            result: response.data,
-            counter: notifNumber
-          })
+          resolve({ isSuccess: true, result: response.data.responses })
         })
         .catch(error => {
           resolve({ isSuccess: false, result: error })
         })
     })
+  },
+
+  /**
+   * Request to get a page of notifications and the number of unseen one
+   *
+   * @param {String} apiUrl url of the API (this.$store.state.apiUrl)
+   * @param {Integer} uid id of the user
+   * @param {Object} header header to integrate the token to authorize methods in the API
+   * @param {String} pageUrl url of the page to get (next link of the previous page), the first page by default
+   */
+  GetNotifications(apiUrl, uid, header, pageUrl = null) {
+    return this.Batch(
+      apiUrl,
+      [
+        { method: 'GET', url: pageUrl || apiUrl + 'notifications/inbox/?uid=' + uid },
+        { method: 'GET', url: apiUrl + 'notifications/unreadcount/?uid=' + uid }
+      ],
+      header
+    ).then(response => {
+      if (!response.isSuccess) {
+        return response
+      }
+      const [page, counter] = response.result
+      if (page.status >= 400 || counter.status >= 400) {
+        return { isSuccess: false, result: page.status >= 400 ? page : counter }
+      }
+      return {
+        isSuccess: true,
+        result: page.body.results,
+        next: page.body.next,
+        counter: counter.body.count
+      }
+    })
   }
 }